@@ -0,0 +1,85 @@
+"""
+Benchmark for the SQLite insert loop, isolated from parsing and contraction.
+
+Usage::
+
+    python benchmarks/bench_insert.py [--rows 2000000] [--batch-size 1000000]
+
+Feeds synthetic statement rows into a fresh database, once with the streaming
+insert path used by SqliteBulkloader, and once with the previous approach of
+building a list of extended tuples per batch. Each mode runs in its own process,
+so that peak RSS can be reported for each.
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rdf_sql_bulkloader.loaders.sqlite3_bulkloader import COLS, SqliteBulkloader
+
+PREFIX_MAP = {"GO": "http://purl.obolibrary.org/obo/GO_"}
+
+
+def synthetic_rows(n: int):
+    for i in range(n):
+        s = f"GO:{i // 10:07d}"
+        if i % 3:
+            yield s, "rdfs:subClassOf", f"GO:{i % 50000:07d}", None, None, None
+        else:
+            yield s, "rdfs:label", None, f"label {i}", "xsd:string", None
+
+
+def legacy_insert(con, rows):
+    # previous implementation: one extended tuple per row, collected in a list
+    colstr = ",".join(COLS)
+    qs = ",".join(["?" for _ in COLS])
+    tuples = []
+    for t in rows:
+        tuples.append(t + (t[0],))
+    con.executemany(f"insert into statements({colstr},stanza) values ({qs},?)", tuples)
+    return len(tuples)
+
+
+def run(mode: str, num_rows: int, batch_size: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        loader = SqliteBulkloader(
+            database_path=str(Path(tmpdir) / "bench.db"),
+            named_prefix_maps=[],
+            prefix_map=PREFIX_MAP,
+            batch_size=batch_size,
+        )
+        loader.fast = True
+        # no input files; rows are supplied directly, in place of parsing
+        loader.task_statements = lambda *args, **kwargs: synthetic_rows(num_rows)
+        if mode == "legacy":
+            loader._insert = lambda rows: legacy_insert(loader.connection, rows)
+        start = time.perf_counter()
+        # the format is given, so that it is not inferred from the missing file
+        loader.bulkload([None], "application/n-triples")
+        elapsed = time.perf_counter() - start
+        rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{mode:<10} {num_rows / elapsed:12,.0f} rows/s   peak RSS {rss_mb:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch-size", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=["stream", "legacy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        run(args.mode, args.rows, args.batch_size)
+        return
+    for mode in ["legacy", "stream"]:
+        subprocess.run(
+            [sys.executable, __file__, "--mode", mode]
+            + ["--rows", str(args.rows), "--batch-size", str(args.batch_size)],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
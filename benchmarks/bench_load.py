@@ -0,0 +1,198 @@
+"""
+End-to-end load benchmarks on synthetic ontologies.
+
+Usage::
+
+    python benchmarks/bench_load.py [--sizes 10k,1m] [--formats nt,ttl,owl] [-o results.json]
+    python benchmarks/bench_load.py --compare results/old.json results/new.json
+
+For each size and format, a synthetic ontology is generated (see synthetic.py;
+files are cached in --data-dir) and the following are timed:
+
+- ``statements``: parsing and contraction, via ``BulkLoader.statements``
+- ``contract_uri``: contraction of every distinct IRI in the file, with an empty cache
+- ``bulkload``: ``SqliteBulkloader.bulkload`` into a fresh database file, end to end,
+  with the per-stage timings reported by the loader
+
+Each benchmark runs --repeat times and the best time is kept. Results are written
+as JSON, with the commit they were run on, so that runs on different commits can
+be compared with --compare.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from pyoxigraph import NamedNode, parse
+from synthetic import DEFAULT_SEED, FORMATS, PREFIX_MAP, SIZES, dataset_path
+
+from rdf_sql_bulkloader import SqliteBulkloader
+
+BENCHMARKS_DIR = Path(__file__).parent
+DEFAULT_DATA_DIR = BENCHMARKS_DIR / "data"
+
+
+def git_commit() -> Dict[str, Any]:
+    def git(*args) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=BENCHMARKS_DIR, capture_output=True, text=True
+        ).stdout.strip()
+
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "src"))}
+
+
+def new_loader(prefix_maps: List[str], **kwargs) -> SqliteBulkloader:
+    if prefix_maps:
+        return SqliteBulkloader(named_prefix_maps=prefix_maps, **kwargs)
+    return SqliteBulkloader(named_prefix_maps=[], prefix_map=dict(PREFIX_MAP), **kwargs)
+
+
+def best_of(repeat: int, fn: Callable[[], Optional[Dict]]) -> Dict[str, Any]:
+    """Run fn repeat times, and return the best time, with the details returned by that run."""
+    times = []
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        details = fn() or {}
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        if elapsed == min(times):
+            best = details
+    return {"seconds": min(times), "all_seconds": times, **best}
+
+
+def bench_statements(path: Path, mime_type: str, prefix_maps: List[str], repeat: int):
+    def run():
+        loader = new_loader(prefix_maps, database_path=":memory:")
+        return {"count": sum(1 for _ in loader.statements(path, mime_type))}
+
+    return best_of(repeat, run)
+
+
+def bench_contract_uri(path: Path, mime_type: str, prefix_maps: List[str], repeat: int):
+    iris = {
+        node.value
+        for triple in parse(str(path), mime_type)
+        for node in triple
+        if isinstance(node, NamedNode)
+    }
+    nodes = [NamedNode(iri) for iri in sorted(iris)]
+    loader = new_loader(prefix_maps, database_path=":memory:")
+
+    def run():
+        loader._reset_contraction_cache()
+        for node in nodes:
+            loader.contract_uri(node)
+        return {"count": len(nodes)}
+
+    return best_of(repeat, run)
+
+
+def bench_bulkload(path: Path, mime_type: str, prefix_maps: List[str], repeat: int):
+    def run():
+        with tempfile.TemporaryDirectory() as tmpdir:
+            loader = new_loader(prefix_maps, database_path=str(Path(tmpdir) / "bench.db"))
+            loader.bulkload(str(path), mime_type)
+            stats = loader.stats.as_dict(loader.contraction_cache_info())
+            return {"count": stats["rows"], "stages": stats["stages"]}
+
+    return best_of(repeat, run)
+
+
+BENCHMARKS = {
+    "statements": bench_statements,
+    "contract_uri": bench_contract_uri,
+    "bulkload": bench_bulkload,
+}
+
+
+def run_benchmarks(args) -> Dict[str, Any]:
+    results = []
+    for size in args.sizes.split(","):
+        for format in args.formats.split(","):
+            path = dataset_path(args.data_dir, size, format, args.seed)
+            mime_type = FORMATS[format]
+            for name in args.benchmarks.split(","):
+                # the loaders print each path; keep stdout for the results
+                with redirect_stdout(sys.stderr):
+                    result = BENCHMARKS[name](path, mime_type, args.prefix_maps, args.repeat)
+                result["per_second"] = result["count"] / result["seconds"]
+                results.append({"benchmark": name, "size": size, "format": format, **result})
+                print(
+                    f"{name:<13} {size:>4} {format:<4} {result['seconds']:9.3f}s "
+                    f"{result['per_second']:12,.0f}/s",
+                    file=sys.stderr,
+                )
+    return {
+        **git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pyoxigraph": version("pyoxigraph"),
+        "seed": args.seed,
+        "prefix_maps": args.prefix_maps,
+        "results": results,
+    }
+
+
+def compare(old_path: str, new_path: str):
+    """Print the speedup of each benchmark in new_path over old_path."""
+    old, new = (json.loads(Path(p).read_text()) for p in [old_path, new_path])
+
+    def key(r):
+        return r["benchmark"], r["size"], r["format"]
+
+    old_results = {key(r): r for r in old["results"]}
+    print(f"{'':<26} {old['commit'][:10]:>10} {new['commit'][:10]:>10}")
+    for result in new["results"]:
+        previous = old_results.get(key(result))
+        if previous is None:
+            continue
+        speedup = previous["seconds"] / result["seconds"]
+        print(
+            f"{' '.join(key(result)):<26} {previous['seconds']:9.3f}s {result['seconds']:9.3f}s "
+            f"{speedup:6.2f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", default="10k", help=f"comma-separated, from {list(SIZES)}")
+    parser.add_argument(
+        "--formats", default="nt,ttl,owl", help=f"comma-separated, from {list(FORMATS)}"
+    )
+    parser.add_argument("--benchmarks", default=",".join(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument(
+        "--prefix-map",
+        dest="prefix_maps",
+        action="append",
+        default=[],
+        help="named prefix map to load, e.g. merged (default: the prefixes of the synthetic data)",
+    )
+    parser.add_argument("-o", "--output", help="JSON results file (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+    report = json.dumps(run_benchmarks(args), indent=2)
+    if args.output:
+        Path(args.output).write_text(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Microbenchmark comparing PrefixIndex with curies.Converter for CURIE contraction.
+
+Usage::
+
+    python benchmarks/bench_prefix_index.py [--synthetic-size 1000000] [--prefix-map merged]
+
+Contracts every IRI in tests/input/go-nucleus.owl, plus a synthetic set of IRIs
+spread over the namespaces of the prefix map, and reports IRIs/sec for each.
+"""
+import argparse
+import random
+import time
+from pathlib import Path
+
+from curies import Converter
+from prefixmaps.io.parser import load_multi_context
+from pyoxigraph import NamedNode, parse
+
+from rdf_sql_bulkloader.prefix_index import PrefixIndex
+
+GO_NUCLEUS = Path(__file__).parent.parent / "tests" / "input" / "go-nucleus.owl"
+
+
+def go_nucleus_iris():
+    iris = []
+    for triple in parse(str(GO_NUCLEUS), "application/rdf+xml"):
+        iris.extend(node.value for node in triple if isinstance(node, NamedNode))
+    return iris
+
+
+def synthetic_iris(prefix_map, size: int, seed=42):
+    rng = random.Random(seed)
+    namespaces = sorted(prefix_map.values())
+    # mostly OBO-style IRIs, with some that match no namespace
+    obo = [ns for ns in namespaces if ns.startswith("http://purl.obolibrary.org/obo/")]
+    iris = []
+    for i in range(size):
+        r = rng.random()
+        if r < 0.7 and obo:
+            iris.append(f"{rng.choice(obo)}{rng.randrange(10_000_000):07d}")
+        elif r < 0.95:
+            iris.append(f"{rng.choice(namespaces)}term{i}")
+        else:
+            iris.append(f"http://unmapped.example.org/{i}")
+    return iris
+
+
+def timeit(label, fn, iris):
+    start = time.perf_counter()
+    results = fn(iris)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<12} {elapsed:8.3f}s {len(iris) / elapsed:14,.0f} IRIs/s")
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--synthetic-size", type=int, default=1_000_000)
+    parser.add_argument("--prefix-map", default="merged", help="name of a prefixmaps context")
+    args = parser.parse_args()
+    prefix_map = load_multi_context([args.prefix_map]).as_dict()
+    start = time.perf_counter()
+    converter = Converter.from_prefix_map(prefix_map)
+    print(f"Converter built in {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    index = PrefixIndex.from_prefix_map(prefix_map)
+    print(f"PrefixIndex built in {time.perf_counter() - start:.3f}s")
+    inputs = [
+        ("go-nucleus", go_nucleus_iris()),
+        ("synthetic", synthetic_iris(prefix_map, args.synthetic_size)),
+    ]
+    for name, iris in inputs:
+        print(f"{name}: {len(iris):,} IRIs")
+        expected, t_converter = timeit(
+            "Converter", lambda xs: [converter.compress(x) or x for x in xs], iris
+        )
+        actual, t_index = timeit("PrefixIndex", index.compress_all, iris)
+        assert expected == actual, "PrefixIndex and Converter disagree"
+        print(f"  speedup      {t_converter / t_index:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Generator of synthetic OBO-style ontologies, for benchmarks.
+
+Usage::
+
+    python benchmarks/synthetic.py --size 1m --format nt -o go-like-1m.nt
+
+Each class has a type, labels (some in several languages), a definition,
+synonyms and xrefs, named superclasses, existential restrictions on blank nodes,
+and occasionally an annotated axiom. Class IRIs are spread over the OBO prefixes
+with a skewed distribution, and references favour low-numbered classes, as in
+real ontologies. The output is determined by the seed, so that runs on
+different commits load the same data.
+
+Statements are written straight to the file, so generating 10M triples needs
+little memory.
+"""
+import argparse
+import random
+from pathlib import Path
+from typing import Iterator, List, Optional, TextIO, Tuple, Union
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+FORMATS = {
+    "nt": "application/n-triples",
+    "ttl": "text/turtle",
+    "owl": "application/rdf+xml",
+}
+DEFAULT_SEED = 42
+
+OBO = "http://purl.obolibrary.org/obo/"
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+RDFS = "http://www.w3.org/2000/01/rdf-schema#"
+OWL = "http://www.w3.org/2002/07/owl#"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+OIO = "http://www.geneontology.org/formats/oboInOwl#"
+
+# prefixes of class IRIs, and their relative frequencies
+CLASS_PREFIXES = [
+    ("GO", 30),
+    ("CHEBI", 20),
+    ("UBERON", 12),
+    ("NCBITaxon", 10),
+    ("CL", 8),
+    ("PR", 8),
+    ("MONDO", 6),
+    ("HP", 4),
+    ("ENVO", 2),
+]
+RELATIONS = [f"{OBO}BFO_0000050", f"{OBO}BFO_0000051", f"{OBO}RO_0002211", f"{OBO}RO_0002202"]
+LANGUAGES = ["fr", "de", "es", "ja", "zh"]
+WORDS = (
+    "cell membrane nuclear envelope process regulation positive negative binding "
+    "transport activity complex organelle tissue development response signaling "
+    "receptor protein metabolic biosynthetic catabolic structure region part"
+).split()
+
+PREFIX_MAP = {
+    **{prefix: f"{OBO}{prefix}_" for prefix, _ in CLASS_PREFIXES},
+    "BFO": f"{OBO}BFO_",
+    "RO": f"{OBO}RO_",
+    "IAO": f"{OBO}IAO_",
+    "rdf": RDF,
+    "rdfs": RDFS,
+    "owl": OWL,
+    "xsd": XSD,
+    "oboInOwl": OIO,
+}
+
+# a node is ("iri", value), ("bnode", label) or ("literal", value, language, datatype)
+NODE = Tuple
+BLOCK = Tuple[NODE, List[Tuple[str, NODE]]]
+
+
+def iri(value: str) -> NODE:
+    return ("iri", value)
+
+
+def literal(value: str, language: Optional[str] = None, datatype: Optional[str] = None) -> NODE:
+    return ("literal", value, language, datatype)
+
+
+class OntologyGenerator:
+    """Generates the statements of a synthetic ontology, grouped by subject."""
+
+    def __init__(self, num_triples: int, seed: int = DEFAULT_SEED):
+        self.num_triples = num_triples
+        self.random = random.Random(seed)
+        self.prefixes = [prefix for prefix, _ in CLASS_PREFIXES]
+        self.weights = [weight for _, weight in CLASS_PREFIXES]
+        self.num_bnodes = 0
+        # class i is only known once generated, so references go to classes before it
+        self.class_iris: List[str] = []
+
+    def _class_iri(self, i: int) -> str:
+        prefix = self.random.choices(self.prefixes, self.weights)[0]
+        return f"{OBO}{prefix}_{i:07d}"
+
+    def _reference(self) -> str:
+        # skewed towards the first classes, like the upper levels of a real hierarchy
+        n = len(self.class_iris)
+        return self.class_iris[int(n * self.random.random() ** 3)]
+
+    def _words(self, n: int) -> str:
+        return " ".join(self.random.choices(WORDS, k=n))
+
+    def _bnode(self) -> NODE:
+        self.num_bnodes += 1
+        return ("bnode", f"b{self.num_bnodes}")
+
+    def blocks(self) -> Iterator[BLOCK]:
+        """
+        Yields (subject, [(predicate, object), ...]) blocks, until num_triples are generated.
+
+        Blank nodes are yielded as their own blocks, after the block that refers to them.
+        """
+        yield iri(f"{OBO}synthetic.owl"), [
+            (f"{RDF}type", iri(f"{OWL}Ontology")),
+            (f"{RDFS}comment", literal("Synthetic ontology for benchmarks", "en")),
+        ]
+        num_triples = 2
+        i = 0
+        while num_triples < self.num_triples:
+            i += 1
+            for block in self._class_blocks(i):
+                num_triples += len(block[1])
+                yield block
+
+    def _class_blocks(self, i: int) -> Iterator[BLOCK]:
+        rnd = self.random
+        subject = self._class_iri(i)
+        label = f"{self._words(2)} {i}"
+        pairs = [
+            (f"{RDF}type", iri(f"{OWL}Class")),
+            (f"{RDFS}label", literal(label, "en")),
+            (f"{OBO}IAO_0000115", literal(f"A {self._words(8)}.", datatype=f"{XSD}string")),
+        ]
+        for language in rnd.sample(LANGUAGES, rnd.choice([0, 0, 0, 1, 2])):
+            pairs.append((f"{RDFS}label", literal(f"{label} ({language})", language)))
+        for _ in range(rnd.choice([0, 1, 1, 2, 3])):
+            pairs.append((f"{OIO}hasExactSynonym", literal(self._words(3))))
+        if rnd.random() < 0.3:
+            pairs.append((f"{OIO}hasDbXref", literal(f"Wikipedia:{self._words(1)}_{i}")))
+        extra = []
+        if self.class_iris:
+            parents = [self._reference() for _ in range(rnd.choice([1, 1, 1, 2]))]
+            for parent in parents:
+                pairs.append((f"{RDFS}subClassOf", iri(parent)))
+            for _ in range(rnd.choice([0, 0, 1, 1, 2])):
+                restriction = self._bnode()
+                pairs.append((f"{RDFS}subClassOf", restriction))
+                extra.append(
+                    (
+                        restriction,
+                        [
+                            (f"{RDF}type", iri(f"{OWL}Restriction")),
+                            (f"{OWL}onProperty", iri(rnd.choice(RELATIONS))),
+                            (f"{OWL}someValuesFrom", iri(self._reference())),
+                        ],
+                    )
+                )
+            if rnd.random() < 0.1:
+                axiom = self._bnode()
+                extra.append(
+                    (
+                        axiom,
+                        [
+                            (f"{RDF}type", iri(f"{OWL}Axiom")),
+                            (f"{OWL}annotatedSource", iri(subject)),
+                            (f"{OWL}annotatedProperty", iri(f"{RDFS}subClassOf")),
+                            (f"{OWL}annotatedTarget", iri(parents[0])),
+                            (f"{OIO}hasDbXref", literal(f"PMID:{rnd.randrange(10**7)}")),
+                        ],
+                    )
+                )
+        self.class_iris.append(subject)
+        yield iri(subject), pairs
+        yield from extra
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _nt_node(node: NODE) -> str:
+    if node[0] == "iri":
+        return f"<{node[1]}>"
+    if node[0] == "bnode":
+        return f"_:{node[1]}"
+    _, value, language, datatype = node
+    if language:
+        return f'"{_escape(value)}"@{language}'
+    if datatype:
+        return f'"{_escape(value)}"^^<{datatype}>'
+    return f'"{_escape(value)}"'
+
+
+def write_ntriples(blocks: Iterator[BLOCK], stream: TextIO):
+    for subject, pairs in blocks:
+        s = _nt_node(subject)
+        stream.writelines(f"{s} <{p}> {_nt_node(o)} .\n" for p, o in pairs)
+
+
+def _ttl_iri(value: str) -> str:
+    for prefix, base in PREFIX_MAP.items():
+        if value.startswith(base):
+            local = value[len(base) :]
+            if local.replace("_", "").isalnum():
+                return f"{prefix}:{local}"
+    return f"<{value}>"
+
+
+def _ttl_node(node: NODE) -> str:
+    if node[0] == "iri":
+        return _ttl_iri(node[1])
+    if node[0] == "literal" and node[3]:
+        _, value, _, datatype = node
+        return f'"{_escape(value)}"^^{_ttl_iri(datatype)}'
+    return _nt_node(node)
+
+
+def write_turtle(blocks: Iterator[BLOCK], stream: TextIO):
+    for prefix, base in PREFIX_MAP.items():
+        stream.write(f"@prefix {prefix}: <{base}> .\n")
+    for subject, pairs in blocks:
+        body = " ;\n    ".join(f"{_ttl_iri(p)} {_ttl_node(o)}" for p, o in pairs)
+        stream.write(f"\n{_ttl_node(subject)} {body} .\n")
+
+
+def _xml_escape(value: str) -> str:
+    return (
+        value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    )
+
+
+def _xml_name(value: str) -> str:
+    for prefix, namespace in [("rdf", RDF), ("rdfs", RDFS), ("owl", OWL), ("oboInOwl", OIO)]:
+        if value.startswith(namespace):
+            return f"{prefix}:{value[len(namespace):]}"
+    return f"obo:{value[len(OBO):]}"
+
+
+def write_rdfxml(blocks: Iterator[BLOCK], stream: TextIO):
+    stream.write(
+        '<?xml version="1.0"?>\n'
+        f'<rdf:RDF xmlns:rdf="{RDF}" xmlns:rdfs="{RDFS}" xmlns:owl="{OWL}"\n'
+        f'    xmlns:oboInOwl="{OIO}" xmlns:obo="{OBO}">\n'
+    )
+    for subject, pairs in blocks:
+        if subject[0] == "iri":
+            about = f'rdf:about="{_xml_escape(subject[1])}"'
+        else:
+            about = f'rdf:nodeID="{subject[1]}"'
+        stream.write(f"  <rdf:Description {about}>\n")
+        for p, o in pairs:
+            name = _xml_name(p)
+            if o[0] == "iri":
+                stream.write(f'    <{name} rdf:resource="{_xml_escape(o[1])}"/>\n')
+            elif o[0] == "bnode":
+                stream.write(f'    <{name} rdf:nodeID="{o[1]}"/>\n')
+            else:
+                _, value, language, datatype = o
+                if language:
+                    attr = f' xml:lang="{language}"'
+                elif datatype:
+                    attr = f' rdf:datatype="{datatype}"'
+                else:
+                    attr = ""
+                stream.write(f"    <{name}{attr}>{_xml_escape(value)}</{name}>\n")
+        stream.write("  </rdf:Description>\n")
+    stream.write("</rdf:RDF>\n")
+
+
+WRITERS = {"nt": write_ntriples, "ttl": write_turtle, "owl": write_rdfxml}
+
+
+def generate(
+    path: Union[Path, str], num_triples: int, format: str = "nt", seed: int = DEFAULT_SEED
+) -> Path:
+    """
+    Write a synthetic ontology of roughly num_triples triples.
+
+    :param path:
+    :param num_triples:
+    :param format: ``nt``, ``ttl`` or ``owl`` (RDF/XML)
+    :param seed:
+    :return: the path written
+    """
+    path = Path(path)
+    blocks = OntologyGenerator(num_triples, seed).blocks()
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as stream:
+        WRITERS[format](blocks, stream)
+    return path
+
+
+def dataset_path(
+    data_dir: Union[Path, str], size: str, format: str, seed: int = DEFAULT_SEED
+) -> Path:
+    """
+    Return the path of a generated dataset, generating it if it does not exist yet.
+
+    :param data_dir:
+    :param size: one of :data:`SIZES`
+    :param format: one of :data:`FORMATS`
+    :param seed:
+    :return:
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    path = data_dir / f"synthetic-{size}-{seed}.{format}"
+    if not path.exists():
+        tmp_path = path.with_name(path.name + ".tmp")
+        generate(tmp_path, SIZES[size], format, seed)
+        tmp_path.rename(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", choices=list(SIZES), default="10k")
+    parser.add_argument("--format", choices=list(FORMATS), default="nt")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+    generate(args.output, SIZES[args.size], args.format, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,4 +3,13 @@ from importlib import metadata
 
 __version__ = metadata.version(__name__)
 
-from rdf_sql_bulkloader.loaders.sqlite3_bulkloader import SqliteBulkloader
+__all__ = ["SqliteBulkloader", "__version__"]
+
+
+def __getattr__(name: str):
+    # imported on first use, so that importing the package (e.g. for the CLI) is fast
+    if name == "SqliteBulkloader":
+        from rdf_sql_bulkloader.loaders.sqlite3_bulkloader import SqliteBulkloader
+
+        return SqliteBulkloader
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
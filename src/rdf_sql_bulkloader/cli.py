@@ -1,14 +1,112 @@
 """Command line interface for rdf-sql-bulkloader."""
 import logging
+import shutil
 from pathlib import Path
 
 import click
 
-from rdf_sql_bulkloader import SqliteBulkloader, __version__
+from rdf_sql_bulkloader import __version__
 
 logger = logging.getLogger(__name__)
 
 
+def _default_contraction_cache_size() -> int:
+    # loaders are imported when a command runs, as they are slow to import
+    from rdf_sql_bulkloader.loaders.bulkloader import DEFAULT_CONTRACTION_CACHE_SIZE
+
+    return DEFAULT_CONTRACTION_CACHE_SIZE
+
+
+def _default_batch_size() -> int:
+    from rdf_sql_bulkloader.loaders.bulkloader import DEFAULT_CHUNK
+
+    return DEFAULT_CHUNK
+
+
+output_option = click.option("--output", "-o", required=True)
+format_option = click.option(
+    "--format",
+    "-f",
+    help="MIME type or extension (e.g. ttl, nt) of all inputs; inferred for each file if omitted",
+)
+force_option = click.option(
+    "--force/--no-force", default=False, show_default=True, help="Recreates db if already present"
+)
+append_option = click.option(
+    "--append/--no-append", default=False, show_default=True, help="Append to existing db"
+)
+create_tables_option = click.option(
+    "--create-tables/--no-create-tables", default=True, show_default=True, help="Adds statements table"
+)
+rdftab_compatibility_option = click.option(
+    "--rdftab-compatibility/--no-rdftab-compatibility",
+    default=True,
+    show_default=True,
+    help="Creates a statements table, compatible with rdftab",
+)
+named_prefix_map_option = click.option(
+    "--named-prefix-map", "-P", multiple=True, help="Names of prefixmaps, e.g. obo"
+)
+workers_option = click.option(
+    "--workers",
+    "-j",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of processes used to parse input files in parallel",
+)
+index_option = click.option(
+    "--index/--no-index",
+    default=False,
+    show_default=True,
+    help="Create indexes on the statements table after loading",
+)
+contraction_cache_size_option = click.option(
+    "--contraction-cache-size",
+    type=int,
+    default=_default_contraction_cache_size,
+    show_default=True,
+    help="Maximum number of IRIs whose CURIE contraction is cached",
+)
+stats_json_option = click.option(
+    "--stats-json",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write per-stage timings and counters for the load to a JSON file",
+)
+progress_option = click.option(
+    "--progress/--no-progress",
+    default=False,
+    show_default=True,
+    help="Show a progress line on stderr while loading",
+)
+memory_budget_option = click.option(
+    "--memory-budget",
+    type=int,
+    help="Stream with bounded memory: parse in a background thread, and keep rows in flight, "
+    "caches and batches within this many MB (workers are not used)",
+)
+include_graph_name_option = click.option(
+    "--include-graph-name/--no-include-graph-name",
+    default=False,
+    show_default=True,
+    help="Fill the graph column from N-Quads/TriG, or with a graph per file for triple formats"
+    " (requires --no-rdftab-compatibility)",
+)
+graph_name_from_ontology_option = click.option(
+    "--graph-name-from-ontology/--no-graph-name-from-ontology",
+    default=False,
+    show_default=True,
+    help="Use the owl:Ontology IRI of a file as its graph name, instead of the file URI",
+)
+include_statement_id_option = click.option(
+    "--include-statement-id/--no-include-statement-id",
+    default=False,
+    show_default=True,
+    help="Fill the id column with a 64-bit hash of each statement"
+    " (requires --no-rdftab-compatibility)",
+)
+
+
 @click.group()
 @click.option("-v", "--verbose", count=True)
 @click.option("-q", "--quiet")
@@ -19,6 +117,8 @@ def main(verbose: int, quiet: bool):
     :param verbose: Verbosity while running.
     :param quiet: Boolean to be quiet or verbose.
     """
+    logging.basicConfig()
+    logger = logging.getLogger()
     if verbose >= 2:
         logger.setLevel(level=logging.DEBUG)
     elif verbose == 1:
@@ -29,45 +129,391 @@ def main(verbose: int, quiet: bool):
         logger.setLevel(level=logging.ERROR)
 
 
+def _prepare_output(output: str, append: bool, force: bool):
+    output_path = Path(output)
+    if append:
+        if not output_path.exists():
+            raise ValueError(f"Cannot append as {output_path} does not exist")
+    else:
+        if output_path.exists():
+            if force:
+                output_path.unlink()
+            else:
+                raise ValueError(f"Path exists {output_path}")
+
+
 @main.command()
-@click.option("--output", "-o", required=True)
-@click.option("--format",
-              "-f")
+@output_option
+@format_option
+@force_option
+@append_option
+@create_tables_option
+@rdftab_compatibility_option
 @click.option(
-    "--force/--no-force", default=False, show_default=True, help="Recreates db if already present"
+    "--resolve-stanzas/--no-resolve-stanzas",
+    default=True,
+    show_default=True,
+    help="In rdftab mode, set the stanza of blank nodes to the named subject they belong to",
 )
 @click.option(
-    "--append/--no-append", default=False, show_default=True, help="Append to existing db"
+    "--compact-stanzas/--no-compact-stanzas",
+    default=False,
+    show_default=True,
+    help="In rdftab mode, store stanzas only where they differ from the subject, behind a view",
 )
+@named_prefix_map_option
+@workers_option
 @click.option(
-    "--create-tables/--no-create-tables", default=True, show_default=True, help="Adds statements table"
+    "--fast/--no-fast",
+    default=False,
+    show_default=True,
+    help="Trade durability for speed while loading (journal and sync off, single transaction)",
 )
+@index_option
 @click.option(
-    "--rdftab-compatibility/--no-rdftab-compatibility",
+    "--show-index-plan/--no-show-index-plan",
+    default=False,
+    show_default=True,
+    help="Print the CREATE INDEX statements for the loaded database",
+)
+@click.option(
+    "--intern-terms/--no-intern-terms",
+    default=False,
+    show_default=True,
+    help="Store each term once in a term table, with statements exposed as a view",
+)
+@click.option(
+    "--incremental/--no-incremental",
     default=True,
     show_default=True,
-    help="Creates a statements table, compatible with rdftab",
+    help="When appending, skip files unchanged since they were loaded, and replace rows of "
+    "changed files",
 )
-@click.option("--named-prefix-map", "-P", multiple=True, help="Names of prefixmaps, e.g. obo")
+@click.option(
+    "--entailed-edges/--no-entailed-edges",
+    default=False,
+    show_default=True,
+    help="Materialize the transitive closure of subClassOf and part-of restrictions "
+    "in entailed_edge",
+)
+@click.option(
+    "--entailed-edge-predicate",
+    multiple=True,
+    help="IRI or CURIE of a transitive property whose restrictions are included in entailed_edge "
+    "(replaces the default, part of)",
+)
+@click.option(
+    "--fts/--no-fts",
+    default=False,
+    show_default=True,
+    help="Build FTS5 full-text indexes over labels, definitions and synonyms after loading",
+)
+@click.option(
+    "--fts-predicate",
+    multiple=True,
+    help="IRI or CURIE of a predicate to index for full-text search (replaces the defaults)",
+)
+@click.option(
+    "--checkpoint-batches",
+    type=int,
+    help="Commit and record a checkpoint every N batches, so that the load can be resumed",
+)
+@click.option(
+    "--resume/--no-resume",
+    default=False,
+    show_default=True,
+    help="Continue an interrupted checkpointed load into an existing db from its last checkpoint",
+)
+@contraction_cache_size_option
+@include_graph_name_option
+@graph_name_from_ontology_option
+@include_statement_id_option
+@stats_json_option
+@progress_option
+@memory_budget_option
 @click.argument("files", nargs=-1)
-def load_sqlite(files, format, output, append: bool, force: bool, rdftab_compatibility: bool, named_prefix_map: tuple, **kwargs):
+def load_sqlite(
+    files,
+    format,
+    output,
+    append: bool,
+    force: bool,
+    rdftab_compatibility: bool,
+    resolve_stanzas: bool,
+    compact_stanzas: bool,
+    named_prefix_map: tuple,
+    workers: int,
+    fast: bool,
+    index: bool,
+    show_index_plan: bool,
+    intern_terms: bool,
+    incremental: bool,
+    entailed_edges: bool,
+    entailed_edge_predicate: tuple,
+    fts: bool,
+    fts_predicate: tuple,
+    checkpoint_batches: int,
+    resume: bool,
+    contraction_cache_size: int,
+    include_graph_name: bool,
+    graph_name_from_ontology: bool,
+    include_statement_id: bool,
+    stats_json: str,
+    progress: bool,
+    memory_budget: int,
+    **kwargs,
+):
     """Run the rdf-sql-bulkloader's demo command."""
-    output_path = Path(output)
+    from rdf_sql_bulkloader.loaders.sqlite3_bulkloader import SqliteBulkloader
+
+    if resume and Path(output).exists():
+        append = True
     if append:
-        if not output_path.exists():
-            raise ValueError(f"Cannot append as {output_path} does not exist")
-    else:
-        if output_path.exists():
-            if force:
-                output_path.unlink()
-            else:
-                raise ValueError(f"Path exists {output_path}")
+        kwargs["create_tables"] = False
+    _prepare_output(output, append, force)
     loader = SqliteBulkloader(
-        output, named_prefix_maps=list(named_prefix_map) if named_prefix_map else None
+        output,
+        named_prefix_maps=list(named_prefix_map) if named_prefix_map else None,
+        contraction_cache_size=contraction_cache_size,
     )
     loader.rdftab_compatibility = rdftab_compatibility
+    loader.resolve_stanzas = resolve_stanzas
+    loader.compact_stanzas = compact_stanzas
+    loader.workers = workers
+    loader.include_graph_name = include_graph_name
+    loader.graph_name_from_ontology = graph_name_from_ontology
+    loader.include_statement_id = include_statement_id
+    loader.progress = progress
+    loader.memory_budget_mb = memory_budget
+    loader.fast = fast
+    loader.index_statements = index
+    loader.intern_terms = intern_terms
+    loader.incremental = incremental
+    loader.entailed_edges = entailed_edges
+    loader.entailed_edge_predicates = (
+        list(entailed_edge_predicate) if entailed_edge_predicate else None
+    )
+    loader.full_text_search = fts
+    loader.fts_predicates = list(fts_predicate) if fts_predicate else None
+    loader.checkpoint_batches = checkpoint_batches
+    loader.resume = resume
     logging.info(f"Loading {files}")
     loader.bulkload(list(files), format, **kwargs)
+    if stats_json:
+        loader.stats.write_json(stats_json, loader.contraction_cache_info())
+    if show_index_plan:
+        for stmt in loader.index_ddl_statements():
+            click.echo(stmt)
+
+
+@main.command()
+@output_option
+@format_option
+@force_option
+@append_option
+@create_tables_option
+@rdftab_compatibility_option
+@named_prefix_map_option
+@workers_option
+@index_option
+@contraction_cache_size_option
+@include_graph_name_option
+@graph_name_from_ontology_option
+@include_statement_id_option
+@stats_json_option
+@progress_option
+@memory_budget_option
+@click.argument("files", nargs=-1)
+def load_duckdb(
+    files,
+    format,
+    output,
+    append: bool,
+    force: bool,
+    rdftab_compatibility: bool,
+    named_prefix_map: tuple,
+    workers: int,
+    index: bool,
+    contraction_cache_size: int,
+    include_graph_name: bool,
+    graph_name_from_ontology: bool,
+    include_statement_id: bool,
+    stats_json: str,
+    progress: bool,
+    memory_budget: int,
+    **kwargs,
+):
+    """Load RDF files into a DuckDB database (requires the duckdb extra)."""
+    from rdf_sql_bulkloader.loaders.duckdb_bulkloader import DuckDBBulkloader
+
+    if append:
+        kwargs["create_tables"] = False
+    _prepare_output(output, append, force)
+    loader = DuckDBBulkloader(
+        output,
+        named_prefix_maps=list(named_prefix_map) if named_prefix_map else None,
+        contraction_cache_size=contraction_cache_size,
+    )
+    loader.rdftab_compatibility = rdftab_compatibility
+    loader.workers = workers
+    loader.include_graph_name = include_graph_name
+    loader.graph_name_from_ontology = graph_name_from_ontology
+    loader.include_statement_id = include_statement_id
+    loader.progress = progress
+    loader.memory_budget_mb = memory_budget
+    loader.index_statements = index
+    logging.info(f"Loading {files}")
+    loader.bulkload(list(files), format, **kwargs)
+    if stats_json:
+        loader.stats.write_json(stats_json, loader.contraction_cache_info())
+
+
+@main.command()
+@output_option
+@format_option
+@force_option
+@append_option
+@rdftab_compatibility_option
+@named_prefix_map_option
+@workers_option
+@contraction_cache_size_option
+@include_graph_name_option
+@graph_name_from_ontology_option
+@include_statement_id_option
+@stats_json_option
+@progress_option
+@memory_budget_option
+@click.option(
+    "--partition-by",
+    type=click.Choice(["predicate", "source"]),
+    help="Write one partition per predicate, or per source file",
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    default=_default_batch_size,
+    show_default=True,
+    help="Maximum number of rows per Parquet row group",
+)
+@click.argument("files", nargs=-1)
+def load_parquet(
+    files,
+    format,
+    output,
+    append: bool,
+    force: bool,
+    rdftab_compatibility: bool,
+    named_prefix_map: tuple,
+    workers: int,
+    contraction_cache_size: int,
+    include_graph_name: bool,
+    graph_name_from_ontology: bool,
+    include_statement_id: bool,
+    stats_json: str,
+    progress: bool,
+    memory_budget: int,
+    partition_by: str,
+    batch_size: int,
+):
+    """Write statements from RDF files to a directory of Parquet files (requires pyarrow)."""
+    from rdf_sql_bulkloader.loaders.parquet_bulkloader import ParquetBulkloader
+
+    output_path = Path(output)
+    if output_path.exists() and not append:
+        if force:
+            shutil.rmtree(output_path)
+        else:
+            raise ValueError(f"Path exists {output_path}")
+    loader = ParquetBulkloader(
+        output,
+        named_prefix_maps=list(named_prefix_map) if named_prefix_map else None,
+        contraction_cache_size=contraction_cache_size,
+        partition_by=partition_by,
+        batch_size=batch_size,
+    )
+    loader.rdftab_compatibility = rdftab_compatibility
+    loader.workers = workers
+    loader.include_graph_name = include_graph_name
+    loader.graph_name_from_ontology = graph_name_from_ontology
+    loader.include_statement_id = include_statement_id
+    loader.progress = progress
+    loader.memory_budget_mb = memory_budget
+    logging.info(f"Loading {files}")
+    loader.bulkload(list(files), format, create_tables=not append)
+    if stats_json:
+        loader.stats.write_json(stats_json, loader.contraction_cache_info())
+
+
+@main.command()
+@format_option
+@force_option
+@append_option
+@rdftab_compatibility_option
+@named_prefix_map_option
+@workers_option
+@index_option
+@contraction_cache_size_option
+@include_graph_name_option
+@graph_name_from_ontology_option
+@include_statement_id_option
+@stats_json_option
+@progress_option
+@memory_budget_option
+@click.option(
+    "--conninfo",
+    "-d",
+    required=True,
+    help="libpq connection string, e.g. 'dbname=rdf host=localhost'",
+)
+@click.option(
+    "--staging/--no-staging",
+    default=False,
+    show_default=True,
+    help="Load into an UNLOGGED staging table, and swap it in when loading is complete",
+)
+@click.argument("files", nargs=-1)
+def load_postgres(
+    files,
+    format,
+    conninfo: str,
+    append: bool,
+    force: bool,
+    rdftab_compatibility: bool,
+    named_prefix_map: tuple,
+    workers: int,
+    index: bool,
+    contraction_cache_size: int,
+    include_graph_name: bool,
+    graph_name_from_ontology: bool,
+    include_statement_id: bool,
+    stats_json: str,
+    progress: bool,
+    memory_budget: int,
+    staging: bool,
+):
+    """Load RDF files into a PostgreSQL database (requires the postgres extra)."""
+    from rdf_sql_bulkloader.loaders.postgres_bulkloader import PostgresBulkloader
+
+    loader = PostgresBulkloader(
+        conninfo,
+        named_prefix_maps=list(named_prefix_map) if named_prefix_map else None,
+        contraction_cache_size=contraction_cache_size,
+        use_staging_table=staging,
+    )
+    loader.rdftab_compatibility = rdftab_compatibility
+    loader.workers = workers
+    loader.include_graph_name = include_graph_name
+    loader.graph_name_from_ontology = graph_name_from_ontology
+    loader.include_statement_id = include_statement_id
+    loader.progress = progress
+    loader.memory_budget_mb = memory_budget
+    loader.index_statements = index
+    if force and not append:
+        loader.drop_tables()
+    logging.info(f"Loading {files}")
+    loader.bulkload(list(files), format, create_tables=not append)
+    if stats_json:
+        loader.stats.write_json(stats_json, loader.contraction_cache_info())
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 """
 loaders
 
-Currently only SQLite3 is supported
+SQLite3 is supported by default; DuckDB requires the duckdb extra, and PostgreSQL
+the postgres extra
 """
@@ -0,0 +1,55 @@
+"""Conversion of statement rows to Arrow record batches, for columnar backends."""
+from typing import Iterable, List, Mapping, Optional
+
+import pyarrow as pa
+
+from rdf_sql_bulkloader.loaders.bulkloader import ROW_COLUMNS, STATEMENT
+
+# columns of the statement tables, in DDL order
+STATEMENT_COLUMNS = ["id"] + ROW_COLUMNS + ["graph"]
+RDFTAB_STATEMENT_COLUMNS = ["stanza"] + ROW_COLUMNS
+
+
+def statement_columns(rdftab_compatibility: bool) -> List[str]:
+    """Return the columns of the statement table for a layout."""
+    return RDFTAB_STATEMENT_COLUMNS if rdftab_compatibility else STATEMENT_COLUMNS
+
+
+def statement_schema(names: List[str]) -> pa.Schema:
+    """Return an Arrow schema of string columns."""
+    return pa.schema([(name, pa.string()) for name in names])
+
+
+def to_record_batch(
+    rows: Iterable[STATEMENT],
+    names: List[str],
+    constants: Optional[Mapping[str, str]] = None,
+    row_columns: List[str] = ROW_COLUMNS,
+) -> pa.RecordBatch:
+    """
+    Convert statement rows to an Arrow record batch with the given columns.
+
+    Rows are transposed once; the subject array is reused for the stanza column.
+    Columns that are neither in the rows nor in constants are left null.
+
+    :param rows:
+    :param names: column names, from :data:`STATEMENT_COLUMNS` or :data:`RDFTAB_STATEMENT_COLUMNS`
+    :param constants: values for additional columns that are the same for every row
+    :param row_columns: columns of the rows, see :meth:`BulkLoader.row_columns`
+    :return:
+    """
+    rows = list(rows)
+    num_rows = len(rows)
+    positions = {col: i for i, col in enumerate(row_columns)}
+    positions["stanza"] = positions["subject"]
+    columns = list(zip(*rows)) if rows else [()] * len(row_columns)
+    arrays = [pa.array(col, type=pa.string()) for col in columns]
+    data = []
+    for name in names:
+        if constants and name in constants:
+            data.append(pa.array([constants[name]] * num_rows, type=pa.string()))
+        elif name in positions:
+            data.append(arrays[positions[name]])
+        else:
+            data.append(pa.nulls(num_rows, pa.string()))
+    return pa.RecordBatch.from_arrays(data, schema=statement_schema(names))
@@ -1,20 +1,89 @@
 """
 Base class for bulk loaders.
 """
+import copy
+import hashlib
+import io
+import itertools
+import logging
+import marshal
+import mmap
+import os
+import re
+import tempfile
+import time
 from abc import ABC
 from collections import defaultdict
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from curies import Converter
-from prefixmaps.io.parser import load_multi_context
-from pyoxigraph import BlankNode, Literal, NamedNode, parse
+from pyoxigraph import BlankNode, DefaultGraph, Literal, NamedNode, parse
+
+from rdf_sql_bulkloader.loaders.inputs import (  # noqa: F401
+    DEFAULT_MIME_TYPE,
+    STDIN,
+    guess_mime_type,
+    is_plain_file,
+    normalize_mime_type,
+    parse_input,
+)
+from rdf_sql_bulkloader.loaders.stats import LoadStats
+from rdf_sql_bulkloader.loaders.streaming import (
+    CONTRACTION_CACHE_ENTRY_BYTES,
+    RowStream,
+    adaptive_chunks,
+    budget_bytes,
+)
+from rdf_sql_bulkloader.prefix_cache import load_named_prefix_maps
+from rdf_sql_bulkloader.prefix_index import PrefixIndex
+
+if TYPE_CHECKING:
+    from curies import Converter
+
+logger = logging.getLogger(__name__)
 
-DEFAULT_MIME_TYPE = "application/rdf+xml"
 SHACL_PREFIX = NamedNode("http://www.w3.org/ns/shacl#prefix")
 SHACL_NAMESPACE = NamedNode("http://www.w3.org/ns/shacl#namespace")
 
+LINE_BASED_MIME_TYPES = ["application/n-triples", "application/n-quads"]
+QUAD_MIME_TYPES = ["application/n-quads", "application/trig"]
+
+RDF_TYPE = NamedNode("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
+OWL_ONTOLOGY = NamedNode("http://www.w3.org/2002/07/owl#Ontology")
+# ontology declarations are expected in the header of a file
+ONTOLOGY_SCAN_LIMIT = 10000
+STDIN_GRAPH_NAME = "urn:x-rdf-sql-bulkloader:stdin"
+
+# blank node labels are only stable within a single parse, so when a line-based
+# file is parsed in separate byte ranges they are rewritten to IRIs in this namespace
+BNODE_SKOLEM_PREFIX = "urn:x-rdf-sql-bulkloader:bnode:"
+BNODE_LABEL = rb'_:([^\s<>"]*[^\s<>".])'
+BNODE_SUBJECT_PATTERN = re.compile(rb"^([ \t]*)" + BNODE_LABEL, re.MULTILINE)
+BNODE_OBJECT_PATTERN = re.compile(
+    rb"^([ \t]*<[^>]*>[ \t]+<[^>]*>[ \t]+)" + BNODE_LABEL, re.MULTILINE
+)
+# the graph name of a quad: the last term, once subjects and objects are rewritten
+BNODE_GRAPH_PATTERN = re.compile(
+    rb"([ \t])" + BNODE_LABEL + rb"(?=[ \t]*\.[ \t\r]*$)", re.MULTILINE
+)
+BNODE_SKOLEM_REPLACEMENT = rb"\1<" + BNODE_SKOLEM_PREFIX.encode() + rb"\2>"
+SHACL_LINE_PATTERN = re.compile(
+    rb"^[^\n]*<http://www\.w3\.org/ns/shacl#(?:prefix|namespace)>[^\n]*$", re.MULTILINE
+)
+
 STATEMENT_DDL = """
 CREATE TABLE statement (
     id TEXT,
@@ -47,6 +116,96 @@ CREATE TABLE prefix (
 );
 """
 
+# dictionary-encoded layout, used when intern_terms is set:
+# IRIs, CURIEs and blank nodes are stored once in the term table, and
+# statement rows refer to them by id; views provide the usual tables
+
+TERM_DDL = """
+CREATE TABLE term (
+    id INTEGER PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+INTERNED_STATEMENT_DDL = """
+CREATE TABLE interned_statement (
+    id TEXT,
+    subject INTEGER,
+    predicate INTEGER,
+    object INTEGER,
+    value TEXT,
+    datatype INTEGER,
+    language TEXT,
+    graph INTEGER
+);
+"""
+
+INTERNED_STATEMENT_VIEW_DDL = """
+CREATE VIEW statement AS
+SELECT
+ x.id,
+ s.value AS subject,
+ p.value AS predicate,
+ o.value AS object,
+ x.value,
+ d.value AS datatype,
+ x.language,
+ g.value AS graph
+FROM interned_statement AS x
+ JOIN term AS s ON s.id = x.subject
+ JOIN term AS p ON p.id = x.predicate
+ LEFT JOIN term AS o ON o.id = x.object
+ LEFT JOIN term AS d ON d.id = x.datatype
+ LEFT JOIN term AS g ON g.id = x.graph;
+"""
+
+INTERNED_RDFTAB_STATEMENT_DDL = """
+CREATE TABLE interned_statements (
+    stanza INTEGER,
+    subject INTEGER,
+    predicate INTEGER,
+    object INTEGER,
+    value TEXT,
+    datatype INTEGER,
+    language TEXT
+);
+"""
+
+INTERNED_RDFTAB_STATEMENT_VIEW_DDL = """
+CREATE VIEW statements AS
+SELECT
+ z.value AS stanza,
+ s.value AS subject,
+ p.value AS predicate,
+ o.value AS object,
+ x.value,
+ d.value AS datatype,
+ x.language
+FROM interned_statements AS x
+ JOIN term AS s ON s.id = x.subject
+ JOIN term AS p ON p.id = x.predicate
+ LEFT JOIN term AS z ON z.id = x.stanza
+ LEFT JOIN term AS o ON o.id = x.object
+ LEFT JOIN term AS d ON d.id = x.datatype;
+"""
+
+TERM_INDEX_DDL = "CREATE UNIQUE INDEX IF NOT EXISTS term_value ON term(value);"
+
+# indexes created after loading when index_statements is set;
+# maps index name suffixes to the indexed columns
+STATEMENT_INDEXES = {
+    "subject": ["subject", "predicate"],
+    "predicate_object": ["predicate", "object", "subject"],
+    "predicate_value": ["predicate", "value", "subject"],
+    "stanza": ["stanza"],
+    "graph": ["graph", "subject"],
+}
+
+# columns of statement rows; with graph names or statement ids, rows have
+# all the columns of the statement table
+ROW_COLUMNS = ["subject", "predicate", "object", "value", "datatype", "language"]
+QUAD_ROW_COLUMNS = ["id"] + ROW_COLUMNS + ["graph"]
+
 URI = str
 PREFIX = str
 SUBJECT = URI
@@ -57,9 +216,15 @@ OBJECT_DATATYPE = str
 OBJECT_LANG = str
 
 STATEMENT = Tuple[SUBJECT, PREDICATE, OBJECT_URI, OBJECT_VALUE, OBJECT_DATATYPE, OBJECT_LANG]
+QUAD_STATEMENT = Tuple[
+    str, SUBJECT, PREDICATE, OBJECT_URI, OBJECT_VALUE, OBJECT_DATATYPE, OBJECT_LANG, URI
+]
 PREFIX_MAP = Mapping[PREFIX, URI]
 
 DEFAULT_CHUNK = 1000000
+DEFAULT_CONTRACTION_CACHE_SIZE = 1000000
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+SPOOL_CHUNK = 10000
 
 
 @dataclass
@@ -67,21 +232,44 @@ class BulkLoader(ABC):
     """
     Abstract base class for all bulk loaders.
 
-    Currently there is only one implementation, for sqlite.
+    Implementations exist for SQLite and DuckDB.
     """
 
     database_path: str
     named_prefix_maps: List[str] = None
     prefix_map: PREFIX_MAP = None
-    converter: Converter = None
+    converter: "Converter" = None
+    """Built on first use by :meth:`get_converter`; contraction uses :attr:`prefix_index`."""
+    prefix_index: PrefixIndex = None
     index_statements: bool = False
+    intern_terms: bool = False
+    indexes: List[str] = None
     rdftab_compatibility: bool = True
     include_graph_name: bool = False
     graph_name_from_ontology: bool = False
     include_statement_id: bool = False
     use_shacl_namespaces: bool = True
+    single_pass: bool = True
     batch_size: int = field(default_factory=lambda: DEFAULT_CHUNK)
-    _contract_uri_cache: Dict[Union[NamedNode, BlankNode], str] = field(default_factory=lambda: {})
+    workers: int = 1
+    chunk_bytes: int = field(default_factory=lambda: DEFAULT_CHUNK_BYTES)
+    contraction_cache_size: Optional[int] = field(
+        default_factory=lambda: DEFAULT_CONTRACTION_CACHE_SIZE
+    )
+    """Maximum number of IRIs in the contraction cache; None for unbounded, 0 to disable."""
+    memory_budget_mb: Optional[int] = None
+    """Strict streaming mode: parse in a producer thread, and keep the rows in flight, the
+    contraction cache and the database cache within this many MB, see
+    :mod:`rdf_sql_bulkloader.loaders.streaming`."""
+    use_prefix_cache: bool = True
+    """Cache resolved named prefix maps on disk, see :mod:`rdf_sql_bulkloader.prefix_cache`."""
+    progress: bool = False
+    """Write a progress line to stderr while loading."""
+    stats: LoadStats = field(default_factory=LoadStats)
+    """Timings and counters for the most recent load."""
+    _term_ids: Dict[str, int] = field(default_factory=lambda: {})
+    _default_graphs: Dict[str, str] = field(default_factory=lambda: {})
+    _new_terms: List[Tuple[int, str]] = field(default_factory=lambda: [])
 
     def __post_init__(self):
         if self.prefix_map is None:
@@ -89,84 +277,785 @@ class BulkLoader(ABC):
         named_prefix_maps = self.named_prefix_maps
         if named_prefix_maps is None:
             named_prefix_maps = ["merged"]
+        named_index = None
         if len(named_prefix_maps) > 0:
-            ctxt = load_multi_context(named_prefix_maps)
-            self.prefix_map = {**ctxt.as_dict(), **self.prefix_map}
-        self._set_converter()
+            named_prefix_map, named_index = load_named_prefix_maps(
+                named_prefix_maps, self.use_prefix_cache
+            )
+            if self.prefix_map:
+                # the cached index does not cover the extra prefixes
+                named_index = None
+            self.prefix_map = {**named_prefix_map, **self.prefix_map}
+        self._set_converter(named_index)
 
-    def _set_converter(self):
+    def _set_converter(self, prefix_index: Optional[PrefixIndex] = None):
         if self.prefix_map:
-            self.converter = Converter.from_prefix_map(self.prefix_map)
+            with self.stats.stage("prefix_map"):
+                # rebuilt lazily, as it is slow to build for large prefix maps
+                self.converter = None
+                if prefix_index is None:
+                    prefix_index = PrefixIndex.from_prefix_map(self.prefix_map)
+                self.prefix_index = prefix_index
         else:
             raise ValueError("Must set prefix_map")
+        self._reset_contraction_cache()
+
+    def get_converter(self) -> "Converter":
+        """
+        Return a curies Converter for the prefix map, building it on first use.
+
+        :return:
+        """
+        if self.converter is None:
+            from curies import Converter
+
+            self.converter = Converter.from_prefix_map(self.prefix_map)
+        return self.converter
+
+    def _contraction_cache_maxsize(self) -> Optional[int]:
+        maxsize = self.contraction_cache_size
+        if self.memory_budget_mb:
+            budget = budget_bytes(self.memory_budget_mb, "contraction_cache")
+            budget_entries = budget // CONTRACTION_CACHE_ENTRY_BYTES
+            maxsize = budget_entries if maxsize is None else min(maxsize, budget_entries)
+        return maxsize
+
+    def _reset_contraction_cache(self):
+        self._contract_iri = lru_cache(maxsize=self._contraction_cache_maxsize())(
+            self._timed_compress_iri
+        )
+
+    def contraction_cache_info(self):
+        """
+        Return hit and miss counts for the contraction cache.
+
+        The cache is keyed by IRI string, bounded by :attr:`contraction_cache_size`,
+        and cleared whenever the prefix map changes.
+
+        :return: a ``CacheInfo(hits, misses, maxsize, currsize)`` named tuple
+        """
+        return self._contract_iri.cache_info()
+
+    def __getstate__(self):
+        # the cache wraps a bound method and is rebuilt after unpickling
+        state = self.__dict__.copy()
+        state.pop("_contract_iri", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_contraction_cache()
 
     def bulkload(self, path: str):
         raise NotImplementedError
 
-    def _cached_parse_node(self, o: Union[NamedNode, BlankNode]) -> str:
-        if o not in self._contract_uri_cache:
-            self._contract_uri_cache[o] = self._parse_node(o)
-        return self._contract_uri_cache[o]
+    def start_stats(self) -> LoadStats:
+        """Reset :attr:`stats` at the start of a load."""
+        self.stats = LoadStats(progress=self.progress)
+        return self.stats
+
+    def worker_copy(self) -> "BulkLoader":
+        """Return a copy of this loader that can be handed to a worker process."""
+        return copy.copy(self)
 
     def _parse_node(self, o: Union[NamedNode, BlankNode]) -> str:
         if isinstance(o, BlankNode):
             return str(o)
         else:
-            return self.contract_uri(o)
+            return self._contract_iri(o.value)
 
     def contract_uri(self, uri: Optional[NamedNode]) -> Optional[str]:
         if uri is None:
             return None
-        elif self.converter:
-            curie = self.converter.compress(uri.value)
-            if curie:
-                return curie
-            else:
-                return uri.value
-        else:
-            return uri.value
+        return self._contract_iri(uri.value)
 
     def load_prefixes(self):
         raise NotImplementedError
 
+    def _timed_compress_iri(self, iri: URI) -> str:
+        # only called on cache misses
+        start_time = time.perf_counter()
+        curie = self._compress_iri(iri)
+        self.stats.add_time("contraction", time.perf_counter() - start_time)
+        return curie
+
+    def _compress_iri(self, iri: URI) -> str:
+        if self.prefix_index:
+            curie = self.prefix_index.compress(iri)
+            if curie:
+                return curie
+        return iri
+
+    def _contract_term(self, term: Optional[str]) -> Optional[str]:
+        if term is None or term.startswith("_:"):
+            return term
+        return self._contract_iri(term)
+
+    def _add_shacl_prefixes(self, prefix_node_map: Mapping) -> None:
+        self.add_prefixes(prefix_node_map.values())
+
+    def add_prefixes(self, prefixes: Iterable[Tuple[str, str]]) -> None:
+        """
+        Add ``(prefix, namespace)`` pairs to the prefix map, keeping existing prefixes.
+
+        :param prefixes: e.g. SHACL prefix declarations, see :meth:`shacl_prefixes`
+        :return:
+        """
+        prefixes = list(prefixes)
+        if prefixes:
+            if self.prefix_map is None:
+                self.prefix_map = {}
+            for p, ns in prefixes:
+                if p not in self.prefix_map:
+                    self.prefix_map[p] = ns
+            self._set_converter()
+
+    def input_mime_type(self, path: Union[Path, str], mime_type=None) -> Optional[str]:
+        """
+        Return the MIME type used to parse an input.
+
+        If mime_type is not given, it is inferred from the extension or content of
+        the input, falling back to :data:`DEFAULT_MIME_TYPE`. For stdin, None is
+        returned, and the format is inferred when parsing.
+
+        :param path:
+        :param mime_type: a MIME type, or a format name such as ``ttl``
+        :return:
+        """
+        if mime_type is not None:
+            return normalize_mime_type(mime_type)
+        if str(path) == STDIN:
+            return None
+        return guess_mime_type(path) or DEFAULT_MIME_TYPE
+
     def statements(self, path: Union[Path, str], mime_type=None) -> Iterator[STATEMENT]:
-        """Yields statement rows from an RDF file."""
-        if mime_type is None:
-            mime_type = DEFAULT_MIME_TYPE
+        """
+        Yields statement rows from an RDF file.
+
+        Uncompressed line-based files take a fast path: SHACL prefix declarations are
+        found by scanning the raw bytes, and rows are contracted as they are parsed.
+        """
+        mime_type = self.input_mime_type(path, mime_type)
         if self.use_shacl_namespaces:
-            triple_it = parse(str(path), mime_type)
+            if mime_type in LINE_BASED_MIME_TYPES and is_plain_file(path):
+                self._scan_shacl_prefixes(str(path), mime_type)
+                raw_rows = _raw_rows(parse_input(path, mime_type), self.include_graph_name)
+                yield from self._contract_rows(row for _, row in raw_rows)
+                return
+            if self.single_pass:
+                yield from self._statements_single_pass(path, mime_type)
+                return
+            if str(path) == STDIN:
+                raise ValueError("stdin can only be read once; use single_pass")
+            triple_it = parse_input(path, mime_type)
 
             # First pass: pre-processing
             # index shacl prefixes and reified statements
             # note we use lists as a proxy for mutable tuples here;
             # this may not be the cleanest way but it should hopefully be fast
-            prefix_node_map = defaultdict(lambda: [None, None])
-            for s, p, o in triple_it:
-                if p == SHACL_PREFIX:
-                    prefix_node_map[s][0] = o.value
-                elif p == SHACL_NAMESPACE:
-                    prefix_node_map[s][1] = o.value
-            if prefix_node_map:
-                if self.prefix_map is None:
-                    self.prefix_map = {}
-                for [p, ns] in prefix_node_map.values():
-                    if p not in self.prefix_map:
-                        self.prefix_map[p] = ns
-                self._set_converter()
+            with self.stats.stage("shacl_prepass"):
+                prefix_node_map = defaultdict(lambda: [None, None])
+                for t in triple_it:
+                    if t.predicate == SHACL_PREFIX:
+                        prefix_node_map[t.subject][0] = t.object.value
+                    elif t.predicate == SHACL_NAMESPACE:
+                        prefix_node_map[t.subject][1] = t.object.value
+                self._add_shacl_prefixes(prefix_node_map)
 
         # Second pass; yield rows
-        # TODO: investigate if this is the most efficient way to do this
-        for s, p, o in parse(str(path), mime_type):
-            s = self._parse_node(s)
-            p = self.contract_uri(p)
-            if isinstance(o, Literal):
-                yield s, p, None, o.value, self._cached_parse_node(o.datatype), o.language
+        raw_rows = _raw_rows(parse_input(path, mime_type), self.include_graph_name)
+        yield from self._contract_rows(row for _, row in raw_rows)
+
+    def _contract_rows(self, rows: Iterable[Tuple]) -> Iterator[STATEMENT]:
+        contract = self._contract_term
+        if self.include_graph_name:
+            for s, p, o, v, dt, lang, g in rows:
+                yield contract(s), contract(p), contract(o), v, contract(dt), lang, contract(g)
+        else:
+            for s, p, o, v, dt, lang in rows:
+                yield contract(s), contract(p), contract(o), v, contract(dt), lang
+
+    def _statements_single_pass(
+        self, path: Union[Path, str], mime_type: str
+    ) -> Iterator[STATEMENT]:
+        """
+        Yields statement rows from an RDF file, parsing it only once.
+
+        Uncontracted rows are spooled to a temporary file while SHACL prefix
+        declarations are collected; rows are contracted when read back, after
+        the prefix map is complete.
+        """
+        prefix_node_map = defaultdict(lambda: [None, None])
+        with tempfile.TemporaryFile() as spool:
+            with self.stats.stage("shacl_prepass"):
+                buffer = []
+                for t, row in _raw_rows(parse_input(path, mime_type), self.include_graph_name):
+                    p = t.predicate
+                    if p == SHACL_PREFIX:
+                        prefix_node_map[t.subject][0] = t.object.value
+                    elif p == SHACL_NAMESPACE:
+                        prefix_node_map[t.subject][1] = t.object.value
+                    buffer.append(row)
+                    if len(buffer) >= SPOOL_CHUNK:
+                        marshal.dump(buffer, spool)
+                        buffer = []
+                if buffer:
+                    marshal.dump(buffer, spool)
+                self._add_shacl_prefixes(prefix_node_map)
+            spool.seek(0)
+            while True:
+                try:
+                    rows = marshal.load(spool)
+                except EOFError:
+                    break
+                yield from self._contract_rows(rows)
+
+    def parallel_tasks(
+        self, paths: List[Union[Path, str]], mime_type=None
+    ) -> List[Tuple[str, str, Optional[Tuple[int, int]]]]:
+        """
+        Plan the units of work for loading paths in parallel.
+
+        Each path is one task, except for files in a line-based format larger than
+        :attr:`chunk_bytes`, which are split into newline-aligned byte ranges. SHACL
+        prefix declarations are collected for each path before the tasks are run, see
+        :func:`~rdf_sql_bulkloader.loaders.parallel.parallel_batches`.
+
+        :param paths:
+        :param mime_type: MIME type of all paths; inferred for each path if None
+        :return: list of ``(path, mime_type, byte_range)`` tuples
+        """
+        tasks = []
+        for path in paths:
+            path = str(path)
+            path_mime_type = self.input_mime_type(path, mime_type)
+            if (
+                path_mime_type in LINE_BASED_MIME_TYPES
+                and is_plain_file(path)
+                and os.path.getsize(path) > self.chunk_bytes
+            ):
+                for byte_range in line_ranges(path, self.chunk_bytes):
+                    tasks.append((path, path_mime_type, byte_range))
+            else:
+                tasks.append((path, path_mime_type, None))
+        return tasks
+
+    def _scan_shacl_prefixes(self, path: str, mime_type: str) -> None:
+        self.add_prefixes(self.shacl_prefixes(path, mime_type))
+
+    def shacl_prefixes(self, path: Union[Path, str], mime_type: str) -> List[Tuple[str, str]]:
+        """
+        Return the SHACL prefix declarations of an input, as ``(prefix, namespace)`` pairs.
+
+        Uncompressed line-based files are scanned for the lines that declare prefixes;
+        other inputs are parsed.
+
+        :param path:
+        :param mime_type:
+        :return:
+        """
+        with self.stats.stage("shacl_prepass"):
+            if mime_type in LINE_BASED_MIME_TYPES and is_plain_file(path):
+                triples = self._shacl_lines(str(path), mime_type)
             else:
-                yield s, p, self._parse_node(o), None, None, None
+                triples = parse_input(path, mime_type)
+            prefix_node_map = defaultdict(lambda: [None, None])
+            for t in triples:
+                if t.predicate == SHACL_PREFIX:
+                    prefix_node_map[t.subject][0] = t.object.value
+                elif t.predicate == SHACL_NAMESPACE:
+                    prefix_node_map[t.subject][1] = t.object.value
+        return [(p, ns) for p, ns in prefix_node_map.values()]
+
+    def _shacl_lines(self, path: str, mime_type: str) -> Iterator:
+        if os.path.getsize(path) == 0:
+            return iter([])
+        with open(path, "rb") as stream, mmap.mmap(
+            stream.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            lines = b"\n".join(m.group(0) for m in SHACL_LINE_PATTERN.finditer(mm))
+        return parse(io.BytesIO(lines), mime_type)
+
+    def range_statements(
+        self, path: Union[Path, str], mime_type: str, start: int, end: int
+    ) -> Iterator[STATEMENT]:
+        """
+        Yields statement rows from a newline-aligned byte range of a line-based RDF file.
+
+        Blank node labels are preserved across ranges, so that rows from separately
+        parsed ranges of the same file can be combined, and prefixed with
+        :func:`blank_node_prefix`, so that they do not clash with those of other files.
+
+        :param path:
+        :param mime_type: one of :data:`LINE_BASED_MIME_TYPES`
+        :param start: offset of the first byte
+        :param end: offset after the last byte
+        :return:
+        """
+        with open(path, "rb") as stream:
+            with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = mm[start:end]
+        if b"_:" in data:
+            data = BNODE_SUBJECT_PATTERN.sub(BNODE_SKOLEM_REPLACEMENT, data)
+            data = BNODE_OBJECT_PATTERN.sub(BNODE_SKOLEM_REPLACEMENT, data)
+            if mime_type in QUAD_MIME_TYPES:
+                data = BNODE_GRAPH_PATTERN.sub(BNODE_SKOLEM_REPLACEMENT, data)
+        contract = self._contract_term
+        skolem_len = len(BNODE_SKOLEM_PREFIX)
+        bnode_prefix = "_:" + blank_node_prefix(path)
+
+        def term(t: Optional[str]) -> Optional[str]:
+            if t is not None and t.startswith(BNODE_SKOLEM_PREFIX):
+                return bnode_prefix + t[skolem_len:]
+            return contract(t)
+
+        raw_rows = _raw_rows(parse(io.BytesIO(data), mime_type), self.include_graph_name)
+        if self.include_graph_name:
+            for _, (s, p, o, v, dt, lang, g) in raw_rows:
+                yield term(s), contract(p), term(o), v, contract(dt), lang, term(g)
+        else:
+            for _, (s, p, o, v, dt, lang) in raw_rows:
+                yield term(s), contract(p), term(o), v, contract(dt), lang
+
+    def uses_quad_rows(self) -> bool:
+        """Return True if rows carry graph names or statement ids, see :data:`QUAD_ROW_COLUMNS`."""
+        return self.include_graph_name or self.include_statement_id
+
+    def row_columns(self) -> List[str]:
+        """Return the columns of the rows yielded by :meth:`row_batches`, in order."""
+        if self.uses_quad_rows():
+            if self.rdftab_compatibility:
+                raise ValueError(
+                    "Graph names and statement ids require rdftab_compatibility to be unset"
+                )
+            return QUAD_ROW_COLUMNS
+        return ROW_COLUMNS
+
+    def default_graph_name(self, path: Union[Path, str], mime_type: str) -> str:
+        """
+        Return the graph name for triples of a file that are not in a named graph.
+
+        This is the ``owl:Ontology`` IRI declared in the file if
+        :attr:`graph_name_from_ontology` is set, otherwise the file URI
+        (or :data:`STDIN_GRAPH_NAME` for stdin, which can only be read once).
+
+        :param path:
+        :param mime_type:
+        :return:
+        """
+        path = str(path)
+        if path not in self._default_graphs:
+            graph_name = None
+            if path == STDIN:
+                graph_name = STDIN_GRAPH_NAME
+            elif self.graph_name_from_ontology:
+                graph_name = ontology_iri(path, mime_type)
+            if graph_name is None:
+                graph_name = Path(path).resolve().as_uri()
+            self._default_graphs[path] = self._contract_iri(graph_name)
+        return self._default_graphs[path]
+
+    def quad_rows(
+        self, rows: Iterable[Tuple], path: Union[Path, str], mime_type: str
+    ) -> Iterator[QUAD_STATEMENT]:
+        """
+        Yields rows with the columns of the statement table.
+
+        Rows without a graph name are assigned :meth:`default_graph_name`, and
+        statement ids are filled in if :attr:`include_statement_id` is set. Ids are
+        the same on every load of a file only if its blank node labels are, see
+        :meth:`task_statements`.
+
+        :param rows: rows from :meth:`statements`
+        :param path:
+        :param mime_type:
+        :return:
+        """
+        include_graph_name = self.include_graph_name
+        include_statement_id = self.include_statement_id
+        default_graph = self.default_graph_name(path, mime_type) if include_graph_name else None
+        for row in rows:
+            if include_graph_name:
+                graph = row[6] or default_graph
+                row = row[:6]
+            else:
+                graph = None
+            row = row + (graph,)
+            yield (statement_id(row) if include_statement_id else None,) + row
+
+    def task_statements(
+        self,
+        path: Union[Path, str],
+        mime_type=None,
+        byte_range: Optional[Tuple[int, int]] = None,
+        stable_blank_nodes: bool = False,
+    ) -> Iterator[Tuple]:
+        """
+        Yields the rows for a file, or a byte range of it, as written to the database.
+
+        :param path:
+        :param mime_type:
+        :param byte_range: ``(start, end)`` offsets, see :meth:`range_statements`
+        :param stable_blank_nodes: label blank nodes the same way each time the file is
+            parsed, see :func:`relabel_blank_nodes`; byte ranges always keep the labels
+            in the file. Implied by :attr:`include_statement_id`, as the ids of
+            statements about blank nodes are hashed from their labels
+        :return: rows with the columns given by :meth:`row_columns`
+        """
+        mime_type = self.input_mime_type(path, mime_type)
+        if byte_range is None:
+            rows = self.statements(path, mime_type)
+            if stable_blank_nodes or self.include_statement_id:
+                rows = relabel_blank_nodes(rows, blank_node_prefix(path))
+        else:
+            rows = self.range_statements(path, mime_type, *byte_range)
+        if self.uses_quad_rows():
+            rows = self.quad_rows(rows, path, mime_type)
+        return rows
+
+    def intern_statements(self, rows: Iterator[STATEMENT]) -> Iterator[Tuple]:
+        """
+        Yields statement rows with terms replaced by integer ids.
+
+        Ids are assigned in memory; terms that have not been seen before are
+        queued, and can be retrieved with :meth:`pop_new_terms`.
+
+        :param rows:
+        :return:
+        """
+        term_ids = self._term_ids
+        new_terms = self._new_terms
+
+        def intern(term: Optional[str]) -> Optional[int]:
+            if term is None:
+                return None
+            term_id = term_ids.get(term)
+            if term_id is None:
+                term_id = len(term_ids) + 1
+                term_ids[term] = term_id
+                new_terms.append((term_id, term))
+            return term_id
+
+        if self.uses_quad_rows():
+            for sid, s, p, o, v, dt, lang, g in rows:
+                yield sid, intern(s), intern(p), intern(o), v, intern(dt), lang, intern(g)
+        else:
+            for s, p, o, v, dt, lang in rows:
+                yield intern(s), intern(p), intern(o), v, intern(dt), lang
+
+    def pop_new_terms(self) -> List[Tuple[int, str]]:
+        """Return ``(id, term)`` pairs assigned since the last call."""
+        new_terms = list(self._new_terms)
+        self._new_terms.clear()
+        return new_terms
+
+    def row_batches(
+        self, paths: List[Union[Path, str]], mime_type=None
+    ) -> Iterator[Tuple[str, Optional[Iterable[STATEMENT]]]]:
+        """
+        Yields batches of up to :attr:`batch_size` statement rows from paths.
+
+        Yields ``(path, rows)`` for each batch, and ``(path, None)`` once a path (or
+        a byte range of it) is finished, which writers can use to commit. If
+        :attr:`workers` is greater than one, parsing and contraction happen in a
+        pool of worker processes, see :meth:`parallel_tasks`.
+
+        If :attr:`memory_budget_mb` is set, each path is instead parsed in a producer
+        thread, and batch sizes adapt to the size of rows; workers are not used, as
+        each would need a budget of its own.
+
+        :param paths:
+        :param mime_type:
+        :return:
+        """
+        # imported here as the parallel module depends on this one
+        from rdf_sql_bulkloader.loaders.parallel import parallel_batches
+
+        if self.memory_budget_mb:
+            if self.workers > 1:
+                logger.warning("Ignoring workers, as a memory budget is set")
+            if self._contract_iri.cache_info().maxsize != self._contraction_cache_maxsize():
+                self._reset_contraction_cache()
+            yield from self._streamed_row_batches(paths, mime_type)
+            return
+        # stdin can only be read by this process
+        parallel = self.workers > 1 and STDIN not in [str(p) for p in paths]
+        tasks = self.parallel_tasks(paths, mime_type) if parallel else []
+        if len(tasks) > 1:
+            workers = min(self.workers, len(tasks))
+            logger.info(
+                f"Loading {len(tasks)} tasks into {self.database_path} using {workers} workers"
+            )
+            batches = parallel_batches(self, tasks, workers)
+            while True:
+                # time spent waiting on workers
+                with self.stats.stage("parse"):
+                    item = next(batches, None)
+                if item is None:
+                    return
+                if item[1] is not None:
+                    self.stats.rows_parsed += len(item[1])
+                yield item
+        for path in paths:
+            if not self.progress:
+                print(path)
+            self.stats.current_path = str(path)
+            path_mime_type = self.input_mime_type(path, mime_type)
+            logger.info(f"Loading {path} into {self.database_path} as {path_mime_type}...")
+            rows_it = self.stats.timed_rows(self.task_statements(path, path_mime_type))
+            for rows in chunk(rows_it, self.batch_size):
+                yield str(path), rows
+            yield str(path), None
+
+    def _streamed_row_batches(
+        self, paths: List[Union[Path, str]], mime_type=None
+    ) -> Iterator[Tuple[str, Optional[Iterable[STATEMENT]]]]:
+        stats = self.stats
+        batch_bytes = budget_bytes(self.memory_budget_mb, "batch")
+        for path in paths:
+            if not self.progress:
+                print(path)
+            stats.current_path = str(path)
+            path_mime_type = self.input_mime_type(path, mime_type)
+            logger.info(f"Streaming {path} into {self.database_path} as {path_mime_type}...")
+            stream = RowStream(
+                self.task_statements(path, path_mime_type),
+                budget_bytes(self.memory_budget_mb, "queue"),
+            )
+
+            def streamed_rows() -> Iterator[STATEMENT]:
+                blocks = stream.blocks()
+                while True:
+                    # time spent waiting on the producer
+                    with stats.stage("parse"):
+                        block = next(blocks, None)
+                    if block is None:
+                        return
+                    stats.rows_parsed += len(block)
+                    if stats.progress:
+                        stats.report_progress()
+                    yield from block
+
+            def batch_rows() -> int:
+                return stream.batch_rows(batch_bytes, self.batch_size)
+
+            for rows in adaptive_chunks(streamed_rows(), batch_rows):
+                yield str(path), rows
+            logger.info(
+                f"Streamed {path}: {stream.mean_row_bytes or 0:.0f} bytes/row, "
+                f"at most {stream.max_queued_bytes} bytes queued"
+            )
+            yield str(path), None
 
     def ddl_statements(self) -> List[str]:
         """Return CREATE TABLE statements."""
+        # graph names and statement ids cannot be stored in the rdftab layout
+        self.row_columns()
+        if self.intern_terms:
+            if self.rdftab_compatibility:
+                return [
+                    TERM_DDL,
+                    INTERNED_RDFTAB_STATEMENT_DDL,
+                    INTERNED_RDFTAB_STATEMENT_VIEW_DDL,
+                    PREFIX_DDL,
+                ]
+            else:
+                return [TERM_DDL, INTERNED_STATEMENT_DDL, INTERNED_STATEMENT_VIEW_DDL, PREFIX_DDL]
         if self.rdftab_compatibility:
             return [RDFTAB_STATEMENT_DDL, PREFIX_DDL]
         else:
             return [STATEMENT_DDL, PREFIX_DDL]
+
+    def statement_table(self) -> str:
+        """Return the name of the table that holds statements."""
+        table = "statements" if self.rdftab_compatibility else "statement"
+        if self.intern_terms:
+            return f"interned_{table}"
+        return table
+
+    def index_expression(self, column: str) -> str:
+        """Return the expression that is indexed for a column of :data:`STATEMENT_INDEXES`."""
+        return column
+
+    def index_ddl_statements(self) -> List[str]:
+        """
+        Return CREATE INDEX statements for the statement table.
+
+        Indexes are taken from :data:`STATEMENT_INDEXES`, restricted to :attr:`indexes`
+        if set. The stanza index is only created in rdftab compatibility mode, and the
+        graph index only with :attr:`include_graph_name`. With
+        :attr:`intern_terms`, the term table is also indexed by value.
+        """
+        table = self.statement_table()
+        names = self.indexes if self.indexes is not None else list(STATEMENT_INDEXES)
+        stmts = []
+        for name in names:
+            if name not in STATEMENT_INDEXES:
+                raise ValueError(f"Unknown index {name}; must be one of {list(STATEMENT_INDEXES)}")
+            cols = STATEMENT_INDEXES[name]
+            if "stanza" in cols and not self.rdftab_compatibility:
+                continue
+            if "graph" in cols and not self.include_graph_name:
+                continue
+            exprs = ",".join(self.index_expression(col) for col in cols)
+            stmts.append(f"CREATE INDEX IF NOT EXISTS {table}_{name} ON {table}({exprs});")
+        if self.intern_terms:
+            stmts.append(TERM_INDEX_DDL)
+        return stmts
+
+
+def chunk(iterable: Iterable, size=DEFAULT_CHUNK) -> Iterable[Iterable]:
+    """
+    Get first N results of iterable
+
+    https://stackoverflow.com/questions/8991506/iterate-an-iterator-by-chunks-of-n-in-python
+    """
+    it = iter(iterable)
+    while True:
+        chunk_it = itertools.islice(it, size)
+        try:
+            first_el = next(chunk_it)
+        except StopIteration:
+            return
+        yield itertools.chain((first_el,), chunk_it)
+
+
+def _raw_rows(triple_it: Iterator, include_graph_name=False) -> Iterator[Tuple[Any, STATEMENT]]:
+    """
+    Yields triples or quads paired with uncontracted statement rows.
+
+    If include_graph_name is set, the graph name of each quad (None for triples,
+    or the default graph) is appended to the row.
+    """
+    for t in triple_it:
+        s = t.subject
+        o = t.object
+        s = str(s) if isinstance(s, BlankNode) else s.value
+        if isinstance(o, Literal):
+            row = (s, t.predicate.value, None, o.value, o.datatype.value, o.language)
+        elif isinstance(o, BlankNode):
+            row = (s, t.predicate.value, str(o), None, None, None)
+        else:
+            row = (s, t.predicate.value, o.value, None, None, None)
+        if include_graph_name:
+            g = getattr(t, "graph_name", None)
+            if g is None or isinstance(g, DefaultGraph):
+                row += (None,)
+            else:
+                row += (str(g) if isinstance(g, BlankNode) else g.value,)
+        yield t, row
+
+
+def blank_node_prefix(path: Union[Path, str]) -> str:
+    """
+    Return a prefix for the blank node labels of a file, from a hash of its absolute path.
+
+    Labels such as ``_:b0`` are reused by every file written by the same serializer;
+    where labels are kept across parses, they are prefixed to keep files apart.
+    """
+    key = str(Path(path).resolve())
+    return hashlib.blake2b(key.encode(), digest_size=4).hexdigest() + "_"
+
+
+def relabel_blank_nodes(rows: Iterable[Tuple], prefix: str) -> Iterator[Tuple]:
+    """
+    Yields statement rows with blank nodes labelled ``_:{prefix}{n}``, in order of appearance.
+
+    pyoxigraph assigns random blank node labels each time a file is parsed; numbered
+    labels are the same for every parse of the same file, so rows can be skipped on
+    one parse and continued from on the next.
+
+    The label of every blank node in the file is held until the file is finished, about
+    100 bytes each; this is not bounded by :attr:`BulkLoader.memory_budget_mb`. Large
+    line-based files do not need it, see :meth:`BulkLoader.range_statements`.
+
+    :param rows: rows from :meth:`BulkLoader.statements`
+    :param prefix: distinguishes the blank nodes of different files
+    :return:
+    """
+    labels = {}
+
+    def label(t: Optional[str]) -> Optional[str]:
+        if t is None or not t.startswith("_:"):
+            return t
+        new_label = labels.get(t)
+        if new_label is None:
+            new_label = labels[t] = f"_:{prefix}{len(labels) + 1}"
+        return new_label
+
+    for row in rows:
+        # subject, object and graph name; values are literals
+        yield (label(row[0]), row[1], label(row[2])) + row[3:6] + tuple(label(g) for g in row[6:])
+
+
+def statement_id(row: Tuple) -> str:
+    """
+    Return a deterministic 64-bit id for a row, as 16 hex digits.
+
+    :param row: a contracted row, including its graph name
+    :return:
+    """
+    key = "\x1f".join("\x00" if v is None else v for v in row)
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def ontology_iri(path: Union[Path, str], mime_type: str) -> Optional[str]:
+    """
+    Return the IRI of the ``owl:Ontology`` declared in a file, if any.
+
+    Only the first :data:`ONTOLOGY_SCAN_LIMIT` triples are read.
+
+    :param path:
+    :param mime_type:
+    :return:
+    """
+    for t in itertools.islice(parse_input(path, mime_type), ONTOLOGY_SCAN_LIMIT):
+        if (
+            t.predicate == RDF_TYPE
+            and t.object == OWL_ONTOLOGY
+            and isinstance(t.subject, NamedNode)
+        ):
+            return t.subject.value
+    return None
+
+
+def line_ranges(path: Union[Path, str], chunk_bytes: int, start: int = 0) -> List[Tuple[int, int]]:
+    """
+    Split a file into byte ranges of roughly chunk_bytes, each ending on a newline.
+
+    :param path:
+    :param chunk_bytes:
+    :param start: offset of the first range, which must follow a newline
+    :return: list of ``(start, end)`` offsets
+    """
+    ranges = []
+    with open(path, "rb") as stream:
+        size = os.fstat(stream.fileno()).st_size
+        if size == 0:
+            return ranges
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            while start < size:
+                end = start + chunk_bytes
+                if end >= size:
+                    end = size
+                else:
+                    nl = mm.find(b"\n", end - 1)
+                    end = size if nl == -1 else nl + 1
+                ranges.append((start, end))
+                start = end
+    return ranges
+
+
+def file_digest(path: Union[Path, str], block_size=1 << 20) -> str:
+    """
+    Return a hex digest of the contents of a file.
+
+    :param path:
+    :param block_size:
+    :return:
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as stream:
+        for block in iter(lambda: stream.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,130 @@
+"""Bulk loader for DuckDB databases."""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Union
+
+import duckdb
+import pyarrow as pa
+
+from rdf_sql_bulkloader.loaders.arrow_batches import statement_columns, to_record_batch
+from rdf_sql_bulkloader.loaders.bulkloader import STATEMENT, BulkLoader
+from rdf_sql_bulkloader.loaders.streaming import budget_bytes
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DuckDBBulkloader(BulkLoader):
+    """
+    Implements BulkLoader for DuckDB databases.
+
+    Rows are converted to Arrow record batches of :attr:`batch_size` rows, and each
+    batch is appended to the statement table with a single INSERT ... SELECT.
+    """
+
+    connection: Any = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.intern_terms:
+            raise ValueError(
+                "intern_terms is not supported for DuckDB, which compresses strings natively"
+            )
+
+    def create_ddl(self):
+        """
+        Create tables, and populate the prefix table.
+
+        :return:
+        """
+        con = self.connection
+        for ddl_stmt in self.ddl_statements():
+            con.execute(ddl_stmt)
+        con.executemany(
+            "insert into prefix (prefix,base) values (?,?)", list(self.prefix_map.items())
+        )
+
+    def worker_copy(self) -> "DuckDBBulkloader":
+        worker = super().worker_copy()
+        worker.connection = None
+        return worker
+
+    def record_batch(self, rows: Iterable[STATEMENT]) -> pa.RecordBatch:
+        """
+        Convert statement rows to an Arrow record batch matching the statement table.
+
+        In rdftab compatibility mode the subject array is reused for the stanza column.
+
+        :param rows:
+        :return:
+        """
+        return to_record_batch(
+            rows, statement_columns(self.rdftab_compatibility), row_columns=self.row_columns()
+        )
+
+    def _insert(self, rows: Iterable[STATEMENT]) -> int:
+        con = self.connection
+        batch = self.record_batch(rows)
+        con.register("statement_batch", batch)
+        try:
+            con.execute(f"insert into {self.statement_table()} select * from statement_batch")
+        finally:
+            con.unregister("statement_batch")
+        logger.info(f"Inserted {batch.num_rows} rows")
+        return batch.num_rows
+
+    def create_indexes(self):
+        """
+        Create indexes on the statement table, once data is loaded.
+
+        :return:
+        """
+        start_time = time.perf_counter()
+        for stmt in self.index_ddl_statements():
+            logger.info(f"Indexing: {stmt}")
+            self.connection.execute(stmt)
+        logger.info(f"Built indexes in {time.perf_counter() - start_time:.2f}s")
+
+    def bulkload(self, paths: Union[str, List[str]], mime_type=None, create_tables=True):
+        """
+        Bulkloads from one or more paths.
+
+        If :attr:`memory_budget_mb` is set, DuckDB's memory_limit is set to its share
+        of the budget.
+
+        :param paths:
+        :param mime_type:
+        :param create_tables:
+        :return:
+        """
+        con = duckdb.connect(str(self.database_path))
+        self.connection = con
+        if self.memory_budget_mb:
+            limit_mb = budget_bytes(self.memory_budget_mb, "database_cache") // (1024 * 1024)
+            con.execute(f"SET memory_limit='{limit_mb}MB'")
+        stats = self.start_stats()
+        start_time = time.perf_counter()
+        num_rows = 0
+        if create_tables:
+            self.create_ddl()
+        if not isinstance(paths, list):
+            paths = [paths]
+        con.begin()
+        for path, rows in self.row_batches(paths, mime_type):
+            if rows is None:
+                logger.info(f"Finished {path}")
+            else:
+                with stats.stage("insert", exclude="parse"):
+                    inserted = self._insert(rows)
+                stats.add_rows(path, inserted)
+                num_rows += inserted
+        with stats.stage("commit"):
+            con.commit()
+        elapsed = time.perf_counter() - start_time
+        rate = num_rows / elapsed if elapsed else 0
+        logger.info(f"Loaded {num_rows} rows in {elapsed:.2f}s ({rate:.0f} rows/s)")
+        if self.index_statements:
+            with stats.stage("index"):
+                self.create_indexes()
+        stats.finish()
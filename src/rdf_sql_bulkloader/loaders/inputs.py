@@ -0,0 +1,194 @@
+"""
+Opening RDF inputs: plain files, compressed files and stdin.
+
+Plain files are handed to the parser by path, which is fastest. Compressed files
+and stdin are decompressed on the fly and streamed to the parser through a large
+read buffer, without temporary files.
+
+The RDF format of an input is inferred from its extension, or else from its first bytes.
+"""
+import bz2
+import gzip
+import io
+import re
+import sys
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
+
+from pyoxigraph import parse
+
+STDIN = "-"
+READ_BUFFER_SIZE = 4 * 1024 * 1024
+
+DEFAULT_MIME_TYPE = "application/rdf+xml"
+EXTENSION_MIME_TYPES = {
+    ".owl": "application/rdf+xml",
+    ".rdf": "application/rdf+xml",
+    ".xml": "application/rdf+xml",
+    ".ttl": "text/turtle",
+    ".nt": "application/n-triples",
+    ".nq": "application/n-quads",
+    ".trig": "application/trig",
+}
+# bytes read from the start of an input to infer its format
+PEEK_SIZE = 8192
+NT_TERM = r'(?:<[^>\s]*>|_:\S+|"(?:[^"\\]|\\.)*"(?:\^\^<[^>\s]*>|@[A-Za-z0-9-]+)?)'
+NT_LINE_PATTERN = re.compile(
+    rf"^{NT_TERM}\s+<[^>\s]*>\s+{NT_TERM}\s*(?P<graph>(?:<[^>\s]*>|_:\S+)\s*)?\.\s*$"
+)
+TURTLE_DIRECTIVE_PATTERN = re.compile(r"^(?:@prefix|@base|prefix|base)\b", re.IGNORECASE)
+# an XML start tag: a (prefixed) name followed by an attribute, or ending the line;
+# unlike IRIs such as <http://...>, or <urn:x> followed by the rest of a statement
+XML_TAG_PATTERN = re.compile(
+    r"<[A-Za-z_][\w.-]*(?::[A-Za-z_][\w.-]*)?(?:\s+[\w:.-]+\s*=|\s*/?>\s*$|\s*$)"
+)
+
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".zst": "zstd", ".zstd": "zstd"}
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\x28\xb5\x2f\xfd": "zstd"}
+MAGIC_LENGTH = max(len(magic) for magic in COMPRESSION_MAGIC)
+
+
+def sniff_compression(head: bytes) -> Optional[str]:
+    """Return the compression format of data starting with head, if any."""
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def compression_format(path: Union[Path, str]) -> Optional[str]:
+    """
+    Return the compression format of a file: ``gzip``, ``bz2``, ``zstd`` or None.
+
+    The format is taken from the extension, or else from the first bytes of the file.
+    Stdin is not inspected here, see :func:`open_input`.
+
+    :param path:
+    :return:
+    """
+    if str(path) == STDIN:
+        return None
+    compression = COMPRESSION_EXTENSIONS.get(Path(path).suffix.lower())
+    if compression is None:
+        with open(path, "rb") as stream:
+            compression = sniff_compression(stream.read(MAGIC_LENGTH))
+    return compression
+
+
+def normalize_mime_type(format_name: str) -> str:
+    """Return the MIME type for a format given as a MIME type or an extension, e.g. ``ttl``."""
+    if "/" in format_name:
+        return format_name
+    extension = "." + format_name.lstrip(".").lower()
+    if extension not in EXTENSION_MIME_TYPES:
+        raise ValueError(f"Unknown format {format_name}")
+    return EXTENSION_MIME_TYPES[extension]
+
+
+def sniff_mime_type(head: bytes) -> Optional[str]:
+    """
+    Infer the RDF format of data starting with head.
+
+    Only the first statement line is inspected, which distinguishes RDF/XML,
+    Turtle directives, and N-Triples from N-Quads.
+
+    :param head: the first bytes of the (decompressed) data
+    :return: a MIME type, or None if the format is not recognized
+    """
+    text = head.decode("utf-8", errors="ignore").lstrip("\ufeff")
+    if text.lstrip().startswith(("<?xml", "<!DOCTYPE", "<!--")) or "<rdf:RDF" in text:
+        return "application/rdf+xml"
+    # the last line may be truncated
+    for line in text.splitlines()[:-1] or text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if TURTLE_DIRECTIVE_PATTERN.match(line):
+            return "text/turtle"
+        match = NT_LINE_PATTERN.match(line)
+        if match:
+            return "application/n-quads" if match.group("graph") else "application/n-triples"
+        if XML_TAG_PATTERN.match(line):
+            return "application/rdf+xml"
+        return "text/turtle"
+    return None
+
+
+def guess_mime_type(path: Union[Path, str]) -> Optional[str]:
+    """
+    Infer the RDF format of an input from its extension, or else from its first bytes.
+
+    Compression extensions are skipped, so ``go.nt.gz`` is N-Triples. Stdin is not
+    inspected here, see :func:`parse_input`.
+
+    :param path:
+    :return: a MIME type, or None if the format is not recognized
+    """
+    if str(path) == STDIN:
+        return None
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    if suffixes and suffixes[-1] in COMPRESSION_EXTENSIONS:
+        suffixes = suffixes[:-1]
+    if suffixes and suffixes[-1] in EXTENSION_MIME_TYPES:
+        return EXTENSION_MIME_TYPES[suffixes[-1]]
+    with open_input(path) as stream:
+        return sniff_mime_type(stream.read(PEEK_SIZE))
+
+
+def is_plain_file(path: Union[Path, str]) -> bool:
+    """Return True if path is an uncompressed file, which can be parsed or split in place."""
+    return str(path) != STDIN and compression_format(path) is None
+
+
+def _decompress(stream: BinaryIO, compression: str) -> BinaryIO:
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if compression == "bz2":
+        return bz2.BZ2File(stream, mode="rb")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstandard is required to read zstd input (install the zstd extra)")
+        return zstandard.ZstdDecompressor().stream_reader(stream, read_size=READ_BUFFER_SIZE)
+    raise ValueError(f"Unknown compression format {compression}")
+
+
+def open_input(path: Union[Path, str]) -> BinaryIO:
+    """
+    Open an input as a buffered binary stream of decompressed bytes.
+
+    :param path: a file path, or ``-`` for stdin
+    :return:
+    """
+    if str(path) == STDIN:
+        stream = io.BufferedReader(sys.stdin.buffer, READ_BUFFER_SIZE)
+        compression = sniff_compression(stream.peek(MAGIC_LENGTH)[:MAGIC_LENGTH])
+    else:
+        compression = compression_format(path)
+        stream = open(path, "rb", buffering=READ_BUFFER_SIZE)
+    if compression is None:
+        return stream
+    return io.BufferedReader(_decompress(stream, compression), READ_BUFFER_SIZE)
+
+
+def parse_input(path: Union[Path, str], mime_type: Optional[str] = None) -> Iterator:
+    """
+    Parse an input, which may be compressed, or stdin.
+
+    :param path: a file path, or ``-`` for stdin
+    :param mime_type: inferred from the input if None
+    :return: an iterator of triples or quads
+    """
+    if is_plain_file(path):
+        if mime_type is None:
+            mime_type = guess_mime_type(path) or DEFAULT_MIME_TYPE
+        return parse(str(path), mime_type)
+    return _parse_stream(path, mime_type)
+
+
+def _parse_stream(path: Union[Path, str], mime_type: Optional[str]) -> Iterator:
+    with open_input(path) as stream:
+        if mime_type is None:
+            mime_type = sniff_mime_type(stream.peek(PEEK_SIZE)[:PEEK_SIZE]) or DEFAULT_MIME_TYPE
+        yield from parse(stream, mime_type)
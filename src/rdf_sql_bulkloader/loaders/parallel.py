@@ -0,0 +1,153 @@
+"""
+Process-pool helpers for parsing and contracting inputs in parallel.
+
+Workers each take one task (an input file, or a byte range of a line-based
+input file), parse and contract it using a copy of the loader, and push batches
+of finished rows onto a bounded queue. The calling process drains the queue and
+is the only one that writes to the database.
+
+A worker that dies without raising (e.g. killed for lack of memory) never reports
+its task, so the queue is polled, and the load fails if any worker has exited.
+
+If SHACL prefix declarations are used, the workers first collect those of each
+input. The rows of each task are then contracted with the prefixes declared in its
+input and in the inputs before it, as they are when the inputs are loaded one after
+another in a single process.
+"""
+import copy
+import itertools
+import logging
+import multiprocessing
+from queue import Empty
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PARALLEL_CHUNK = 50000
+# seconds between checks on the workers, while waiting for batches
+POLL_SECONDS = 1.0
+
+TASK = Tuple[str, Optional[str], Optional[Tuple[int, int]]]
+PREFIXES = Tuple[Tuple[str, str], ...]
+
+# per-process state, set by the pool initializer
+_worker_loader = None
+_worker_queue = None
+# copy of the loader with the SHACL prefixes of the last task, see _task_loader
+_prefixed_loader = None
+
+
+def _init_worker(loader, queue) -> None:
+    global _worker_loader, _worker_queue
+    _worker_loader = loader
+    _worker_queue = queue
+
+
+def _scan_task(task: Tuple[str, Optional[str]]) -> List[Tuple[str, str]]:
+    path, mime_type = task
+    return _worker_loader.shacl_prefixes(path, mime_type)
+
+
+def _task_loader(prefixes: PREFIXES) -> Any:
+    global _prefixed_loader
+    if not prefixes:
+        return _worker_loader
+    # consecutive tasks are often byte ranges of the same file
+    if _prefixed_loader is None or _prefixed_loader[0] != prefixes:
+        loader = copy.copy(_worker_loader)
+        loader.prefix_map = dict(_worker_loader.prefix_map)
+        loader.add_prefixes(prefixes)
+        _prefixed_loader = (prefixes, loader)
+    return _prefixed_loader[1]
+
+
+def _run_task(item: Tuple[TASK, PREFIXES]) -> None:
+    (path, mime_type, byte_range), prefixes = item
+    try:
+        loader = _task_loader(prefixes)
+        size = min(loader.batch_size, PARALLEL_CHUNK)
+        it = iter(loader.task_statements(path, mime_type, byte_range))
+        while True:
+            batch = list(itertools.islice(it, size))
+            if not batch:
+                break
+            _worker_queue.put((path, batch))
+        _worker_queue.put((path, None))
+    except Exception as e:
+        _worker_queue.put((path, e))
+
+
+def _check_workers(result: Any, processes: List[Any], remaining: int) -> None:
+    if result.ready():
+        # raises the error that stopped the tasks
+        result.get()
+    for process in processes:
+        if process.exitcode is not None:
+            raise RuntimeError(
+                f"Worker process {process.pid} exited with code {process.exitcode}, "
+                f"with {remaining} tasks unfinished"
+            )
+
+
+def _task_prefixes(loader: Any, pool: Any, processes: List[Any], tasks: List[TASK]) -> List:
+    # SHACL prefixes declared in each path and the paths before it, in order
+    paths = list(dict.fromkeys((path, mime_type) for path, mime_type, _ in tasks))
+    result = pool.map_async(_scan_task, paths)
+    while True:
+        try:
+            scans = result.get(timeout=POLL_SECONDS)
+            break
+        except multiprocessing.TimeoutError:
+            _check_workers(result, processes, len(paths))
+    declared = []
+    path_prefixes = {}
+    for (path, _), prefixes in zip(paths, scans):
+        declared += prefixes
+        path_prefixes[path] = tuple(declared)
+    # the calling process ends up with the same prefix map as a serial load
+    loader.add_prefixes(declared)
+    return [path_prefixes[path] for path, _, _ in tasks]
+
+
+def parallel_batches(
+    loader: Any, tasks: Iterable[TASK], workers: int
+) -> Iterator[Tuple[str, Optional[List]]]:
+    """
+    Parse and contract tasks in a process pool, yielding batches of rows.
+
+    Yields ``(path, rows)`` tuples as batches become available, and ``(path, None)``
+    once all rows for a task have been yielded. Batches from different tasks may
+    be interleaved.
+
+    :param loader: loader used as a template for the workers (its connection is not copied)
+    :param tasks: ``(path, mime_type, byte_range)`` tuples, see :meth:`BulkLoader.parallel_tasks`
+    :param workers: number of worker processes
+    :return:
+    """
+    tasks = list(tasks)
+    worker_loader = loader.worker_copy()
+    # declarations are collected up front, rather than by each task
+    worker_loader.use_shacl_namespaces = False
+    ctx = multiprocessing.get_context()
+    queue = ctx.Queue(maxsize=2 * workers)
+    children = set(multiprocessing.active_children())
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(worker_loader, queue)) as pool:
+        # pool workers only exit when the pool is closed
+        processes = [p for p in multiprocessing.active_children() if p not in children]
+        if loader.use_shacl_namespaces:
+            prefixes = _task_prefixes(loader, pool, processes, tasks)
+        else:
+            prefixes = [()] * len(tasks)
+        result = pool.map_async(_run_task, list(zip(tasks, prefixes)))
+        remaining = len(tasks)
+        while remaining:
+            try:
+                path, batch = queue.get(timeout=POLL_SECONDS)
+            except Empty:
+                _check_workers(result, processes, remaining)
+                continue
+            if isinstance(batch, Exception):
+                raise batch
+            if batch is None:
+                remaining -= 1
+            yield path, batch
@@ -0,0 +1,130 @@
+"""Bulk export of statement tables to Parquet, without a database."""
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from rdf_sql_bulkloader.loaders.arrow_batches import (
+    statement_columns,
+    statement_schema,
+    to_record_batch,
+)
+from rdf_sql_bulkloader.loaders.bulkloader import BulkLoader
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMNS = ["predicate", "source"]
+DICTIONARY_COLUMNS = ["stanza", "subject", "predicate", "datatype", "source"]
+# pyarrow's default limit on the partitions that one batch is written into
+DEFAULT_MAX_PARTITIONS = 1024
+
+
+@dataclass
+class ParquetBulkloader(BulkLoader):
+    """
+    Writes statement rows to a directory of Parquet files.
+
+    :attr:`database_path` is the output directory. Rows are streamed in row groups of
+    at most :attr:`batch_size` rows, so memory use does not depend on input size. The
+    prefix map is written to ``prefix.parquet``, and statements under ``statements/``
+    (or ``statement/``, following :meth:`statement_table`).
+
+    A batch can be written into as many partitions as it has rows, so any number of
+    predicates or files can be partitioned by. Up to 1024 partition files are kept
+    open at once (pyarrow's ``max_open_files``); beyond that, files are closed and
+    new ones opened, so partitions are split into more, smaller files.
+    """
+
+    partition_by: Optional[str] = None
+    """Partition statements by ``predicate``, or by ``source`` file."""
+
+    _num_rows: int = 0
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.partition_by is not None and self.partition_by not in PARTITION_COLUMNS:
+            raise ValueError(
+                f"Cannot partition by {self.partition_by}; use one of {PARTITION_COLUMNS}"
+            )
+        if self.intern_terms:
+            raise ValueError(
+                "intern_terms is not supported for Parquet, which uses dictionary encoding"
+            )
+
+    def columns(self) -> List[str]:
+        """Return the columns written for each statement."""
+        names = statement_columns(self.rdftab_compatibility)
+        if self.partition_by == "source":
+            names = names + ["source"]
+        return names
+
+    def _record_batches(self, paths: List[str], mime_type=None) -> Iterator[pa.RecordBatch]:
+        names = self.columns()
+        row_columns = self.row_columns()
+        for path, rows in self.row_batches(paths, mime_type):
+            if rows is None:
+                logger.info(f"Finished {path}")
+                continue
+            with self.stats.stage("record_batch", exclude="parse"):
+                batch = to_record_batch(rows, names, {"source": path}, row_columns)
+            self.stats.add_rows(path, batch.num_rows)
+            self._num_rows += batch.num_rows
+            yield batch
+
+    def write_prefixes(self, output_dir: Path):
+        """Write the prefix map to ``prefix.parquet``."""
+        prefixes = pa.table(
+            {
+                "prefix": pa.array(list(self.prefix_map.keys()), type=pa.string()),
+                "base": pa.array(list(self.prefix_map.values()), type=pa.string()),
+            }
+        )
+        pq.write_table(prefixes, str(output_dir / "prefix.parquet"))
+
+    def bulkload(self, paths: Union[str, List[str]], mime_type=None, create_tables=True):
+        """
+        Writes statements from one or more paths to Parquet.
+
+        :param paths:
+        :param mime_type:
+        :param create_tables: also write the prefix table
+        :return:
+        """
+        output_dir = Path(self.database_path)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        if not isinstance(paths, list):
+            paths = [paths]
+        if create_tables:
+            self.write_prefixes(output_dir)
+        stats = self.start_stats()
+        start_time = time.perf_counter()
+        self._num_rows = 0
+        names = self.columns()
+        dictionary_columns = [col for col in DICTIONARY_COLUMNS if col in names]
+        file_format = ds.ParquetFileFormat()
+        # batches are produced as the dataset is written, so this includes record_batch
+        with stats.stage("write", exclude="parse"):
+            ds.write_dataset(
+                self._record_batches([str(p) for p in paths], mime_type),
+                str(output_dir / self.statement_table()),
+                schema=statement_schema(names),
+                format=file_format,
+                file_options=file_format.make_write_options(use_dictionary=dictionary_columns),
+                partitioning=[self.partition_by] if self.partition_by else None,
+                partitioning_flavor="hive" if self.partition_by else None,
+                max_partitions=max(DEFAULT_MAX_PARTITIONS, self.batch_size),
+                max_rows_per_group=self.batch_size,
+                # unique file names, so that appending to an existing directory adds files
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        elapsed = time.perf_counter() - start_time
+        rate = self._num_rows / elapsed if elapsed else 0
+        logger.info(f"Wrote {self._num_rows} rows in {elapsed:.2f}s ({rate:.0f} rows/s)")
+        stats.finish()
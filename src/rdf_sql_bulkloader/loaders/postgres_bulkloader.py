@@ -0,0 +1,203 @@
+"""Bulk loader for PostgreSQL databases, using COPY FROM STDIN."""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Union
+
+import psycopg
+
+from rdf_sql_bulkloader.loaders.bulkloader import STATEMENT, BulkLoader
+
+logger = logging.getLogger(__name__)
+
+# escapes for the COPY text format
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+COPY_NULL = "\\N"
+COPY_BUFFER_SIZE = 1 << 20
+
+
+def copy_text_blocks(
+    rows: Iterable[STATEMENT], rdftab_compatibility=True, buffer_size=COPY_BUFFER_SIZE
+) -> Iterator[str]:
+    """
+    Encode statement rows in the PostgreSQL COPY text format.
+
+    Fields are written in the order of the row, preceded by the subject again as
+    the stanza in rdftab compatibility mode. Lines are joined into blocks of roughly
+    buffer_size characters, to keep the number of writes to the server low.
+
+    :param rows:
+    :param rdftab_compatibility:
+    :param buffer_size:
+    :return:
+    """
+    lines = []
+    size = 0
+    for row in rows:
+        fields = [COPY_NULL if v is None else v.translate(COPY_ESCAPES) for v in row]
+        if rdftab_compatibility:
+            fields.insert(0, fields[0])
+        line = "\t".join(fields)
+        lines.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            lines.append("")
+            yield "\n".join(lines)
+            lines = []
+            size = 0
+    if lines:
+        lines.append("")
+        yield "\n".join(lines)
+
+
+@dataclass
+class PostgresBulkloader(BulkLoader):
+    """
+    Implements BulkLoader for PostgreSQL databases.
+
+    :attr:`database_path` is a libpq connection string. Rows are streamed to the
+    server with ``COPY ... FROM STDIN``.
+    """
+
+    connection: Any = None
+
+    use_staging_table: bool = False
+    """Load into an UNLOGGED staging table, which replaces (or is appended to) the
+    statement table once loading is complete."""
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.intern_terms:
+            raise ValueError("intern_terms is not supported for PostgreSQL")
+
+    def create_ddl(self):
+        """
+        Create tables, and populate the prefix table.
+
+        :return:
+        """
+        with self.connection.cursor() as cur:
+            for ddl_stmt in self.ddl_statements():
+                cur.execute(ddl_stmt)
+            cur.executemany(
+                "insert into prefix (prefix,base) values (%s,%s)", list(self.prefix_map.items())
+            )
+
+    def drop_tables(self):
+        """
+        Drop the statement and prefix tables, if they exist.
+
+        :return:
+        """
+        with psycopg.connect(self.database_path) as con:
+            for table in [self.statement_table(), "prefix"]:
+                con.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def worker_copy(self) -> "PostgresBulkloader":
+        worker = super().worker_copy()
+        worker.connection = None
+        return worker
+
+    def copy_sql(self, table: str) -> str:
+        """Return the COPY statement used for statement rows."""
+        cols = self.row_columns()
+        if self.rdftab_compatibility:
+            cols = ["stanza"] + cols
+        return f"COPY {table} ({','.join(cols)}) FROM STDIN"
+
+    def _insert(self, table: str, rows: Iterable[STATEMENT]) -> int:
+        num_rows = 0
+
+        def counted(it):
+            nonlocal num_rows
+            for row in it:
+                num_rows += 1
+                yield row
+
+        with self.connection.cursor() as cur:
+            with cur.copy(self.copy_sql(table)) as copy:
+                for block in copy_text_blocks(counted(rows), self.rdftab_compatibility):
+                    copy.write(block)
+        logger.info(f"Inserted {num_rows} rows")
+        return num_rows
+
+    def create_indexes(self):
+        """
+        Create indexes on the statement table, once data is loaded.
+
+        If :attr:`workers` is greater than one, indexes are built concurrently,
+        each on its own connection.
+
+        :return:
+        """
+        start_time = time.perf_counter()
+        stmts = self.index_ddl_statements()
+
+        def create_index(stmt: str):
+            logger.info(f"Indexing: {stmt}")
+            with psycopg.connect(self.database_path, autocommit=True) as con:
+                con.execute(stmt)
+
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(create_index, stmts))
+        else:
+            for stmt in stmts:
+                create_index(stmt)
+        logger.info(f"Built indexes in {time.perf_counter() - start_time:.2f}s")
+
+    def bulkload(self, paths: Union[str, List[str]], mime_type=None, create_tables=True):
+        """
+        Bulkloads from one or more paths.
+
+        If :attr:`use_staging_table` is set, rows are copied into an UNLOGGED table,
+        which then replaces the statement table (or, if appending, is inserted into it).
+
+        :param paths:
+        :param mime_type:
+        :param create_tables:
+        :return:
+        """
+        con = psycopg.connect(self.database_path)
+        self.connection = con
+        stats = self.start_stats()
+        start_time = time.perf_counter()
+        num_rows = 0
+        table = self.statement_table()
+        if create_tables:
+            self.create_ddl()
+        target = table
+        if self.use_staging_table:
+            target = f"{table}_staging"
+            con.execute(f"CREATE UNLOGGED TABLE {target} (LIKE {table})")
+        con.commit()
+        if not isinstance(paths, list):
+            paths = [paths]
+        for path, rows in self.row_batches(paths, mime_type):
+            if rows is None:
+                logger.info(f"Finished {path}")
+                with stats.stage("commit"):
+                    con.commit()
+            else:
+                with stats.stage("insert", exclude="parse"):
+                    inserted = self._insert(target, rows)
+                stats.add_rows(path, inserted)
+                num_rows += inserted
+        with stats.stage("commit"):
+            if self.use_staging_table:
+                if create_tables:
+                    con.execute(f"ALTER TABLE {target} SET LOGGED")
+                    con.execute(f"DROP TABLE {table}")
+                    con.execute(f"ALTER TABLE {target} RENAME TO {table}")
+                else:
+                    con.execute(f"INSERT INTO {table} SELECT * FROM {target}")
+                    con.execute(f"DROP TABLE {target}")
+            con.commit()
+        elapsed = time.perf_counter() - start_time
+        rate = num_rows / elapsed if elapsed else 0
+        logger.info(f"Loaded {num_rows} rows in {elapsed:.2f}s ({rate:.0f} rows/s)")
+        if self.index_statements:
+            with stats.stage("index"):
+                self.create_indexes()
+        stats.finish()
@@ -1,12 +1,28 @@
 """Bulk loader for SQLite3 databases."""
 import itertools
 import logging
+import os
 import sqlite3
-from dataclasses import dataclass
-from typing import Any, Iterable, List, Union
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from rdf_sql_bulkloader.loaders.bulkloader import DEFAULT_CHUNK, BulkLoader
+from pyoxigraph import NamedNode
 
+from rdf_sql_bulkloader.loaders.bulkloader import (  # noqa: F401
+    INTERNED_RDFTAB_STATEMENT_DDL,
+    LINE_BASED_MIME_TYPES,
+    PREFIX_DDL,
+    STATEMENT,
+    TERM_DDL,
+    BulkLoader,
+    chunk,
+    file_digest,
+    is_plain_file,
+    line_ranges,
+)
+from rdf_sql_bulkloader.loaders.streaming import budget_bytes
 
 logger = logging.getLogger(__name__)
 
@@ -25,21 +41,264 @@ SELECT
 FROM statement
 """
 
+# post-load stanza resolution for rdftab compatibility mode:
+# each blank node is assigned the named subject that it hangs off, following
+# chains of blank nodes, or the annotated source for reified axioms; blank nodes
+# under an anonymous root are assigned that root.
+# {subject_is_bnode} and {object_is_bnode} test whether a column holds a blank node
+STANZA_RESOLUTION_SQL = [
+    """
+    CREATE TEMP TABLE bnode_edge AS
+    SELECT subject, object FROM {table} WHERE {object_is_bnode};
+    """,
+    "CREATE INDEX temp.bnode_edge_subject ON bnode_edge(subject);",
+    """
+    CREATE TEMP TABLE bnode_stanza AS
+    WITH RECURSIVE reachable(node, stanza) AS (
+        SELECT object, subject FROM bnode_edge WHERE NOT ({subject_is_bnode})
+        UNION
+        SELECT subject, object FROM {table}
+         WHERE predicate = :annotated_source AND {subject_is_bnode} AND NOT ({object_is_bnode})
+        UNION
+        SELECT object, subject FROM bnode_edge
+         WHERE {subject_is_bnode}
+           AND subject NOT IN (SELECT object FROM bnode_edge)
+           AND subject NOT IN (SELECT subject FROM {table} WHERE predicate = :annotated_source)
+        UNION
+        SELECT e.object, r.stanza FROM reachable AS r JOIN bnode_edge AS e ON e.subject = r.node
+    )
+    SELECT node, MIN(stanza) AS stanza FROM reachable GROUP BY node;
+    """,
+    "CREATE UNIQUE INDEX temp.bnode_stanza_node ON bnode_stanza(node);",
+    """
+    UPDATE {table}
+       SET stanza = (SELECT b.stanza FROM bnode_stanza AS b WHERE b.node = {table}.subject)
+     WHERE {subject_is_bnode} AND subject IN (SELECT node FROM bnode_stanza);
+    """,
+    "DROP TABLE temp.bnode_stanza;",
+    "DROP TABLE temp.bnode_edge;",
+]
+
+# compact rdftab layout, used when compact_stanzas is set: the stanza column is
+# NULL where it is the subject, which it is for every statement about a named
+# subject; the statements view fills it in
+COMPACT_STANZA_SQL = "coalesce(stanza, subject)"
+
+COMPACT_RDFTAB_STATEMENT_DDL = """
+CREATE TABLE compact_statements (
+    stanza TEXT,
+    subject TEXT,
+    predicate TEXT,
+    object TEXT,
+    value TEXT,
+    datatype TEXT,
+    language TEXT
+);
+"""
+
+COMPACT_RDFTAB_STATEMENT_VIEW_DDL = f"""
+CREATE VIEW statements AS
+SELECT
+ {COMPACT_STANZA_SQL} AS stanza,
+ subject,
+ predicate,
+ object,
+ value,
+ datatype,
+ language
+FROM compact_statements;
+"""
+
+COMPACT_INTERNED_RDFTAB_STATEMENT_VIEW_DDL = """
+CREATE VIEW statements AS
+SELECT
+ z.value AS stanza,
+ s.value AS subject,
+ p.value AS predicate,
+ o.value AS object,
+ x.value,
+ d.value AS datatype,
+ x.language
+FROM interned_statements AS x
+ JOIN term AS s ON s.id = x.subject
+ JOIN term AS p ON p.id = x.predicate
+ JOIN term AS z ON z.id = coalesce(x.stanza, x.subject)
+ LEFT JOIN term AS o ON o.id = x.object
+ LEFT JOIN term AS d ON d.id = x.datatype;
+"""
+
+OWL_ANNOTATED_SOURCE = NamedNode("http://www.w3.org/2002/07/owl#annotatedSource")
+RDFS_SUBCLASS_OF = NamedNode("http://www.w3.org/2000/01/rdf-schema#subClassOf")
+OWL_ON_PROPERTY = NamedNode("http://www.w3.org/2002/07/owl#onProperty")
+OWL_SOME_VALUES_FROM = NamedNode("http://www.w3.org/2002/07/owl#someValuesFrom")
+# part of
+DEFAULT_ENTAILED_EDGE_PREDICATES = ["http://purl.obolibrary.org/obo/BFO_0000050"]
+
+# post-load materialization of the entailed_edge table: the transitive closure of
+# subClassOf edges between named classes, and of existential restrictions
+# (C subClassOf P some D) over the chosen properties, which are taken to be transitive.
+# Edges compose as sub.sub -> sub, sub.P -> P, P.sub -> P and P.P -> P.
+# {view} is the statement table or view, {properties} the list of property parameters
+ENTAILED_EDGE_DDL = [
+    "DROP TABLE IF EXISTS entailed_edge;",
+    """
+    CREATE TABLE entailed_edge (
+        subject TEXT,
+        predicate TEXT,
+        object TEXT,
+        PRIMARY KEY (subject, predicate, object)
+    ) WITHOUT ROWID;
+    """,
+]
+ENTAILED_EDGE_SEED_SQL = [
+    """
+    CREATE TEMP TABLE direct_edge AS
+    SELECT subject, predicate, object FROM {view}
+     WHERE predicate = :subclass_of
+       AND substr(subject, 1, 2) != '_:' AND substr(object, 1, 2) != '_:'
+    UNION
+    SELECT sc.subject, p.object, svf.object
+      FROM {view} AS sc
+      JOIN {view} AS p ON p.subject = sc.object AND p.predicate = :on_property
+      JOIN {view} AS svf ON svf.subject = sc.object AND svf.predicate = :some_values_from
+     WHERE sc.predicate = :subclass_of
+       AND substr(sc.subject, 1, 2) != '_:' AND substr(sc.object, 1, 2) = '_:'
+       AND p.object IN ({properties}) AND substr(svf.object, 1, 2) != '_:';
+    """,
+    "CREATE INDEX temp.direct_edge_subject ON direct_edge(subject);",
+    "INSERT INTO entailed_edge SELECT subject, predicate, object FROM temp.direct_edge;",
+    "CREATE TEMP TABLE entailed_delta AS SELECT * FROM temp.direct_edge;",
+]
+# one semi-naive step: extend only the edges found in the previous step
+ENTAILED_EDGE_STEP_SQL = [
+    """
+    CREATE TEMP TABLE entailed_next AS
+    SELECT DISTINCT subject, predicate, object FROM (
+        SELECT d.subject,
+               CASE WHEN d.predicate = :subclass_of THEN e.predicate
+                    WHEN e.predicate IN (:subclass_of, d.predicate) THEN d.predicate
+               END AS predicate,
+               e.object
+          FROM temp.entailed_delta AS d
+          JOIN temp.direct_edge AS e ON e.subject = d.object
+    ) AS c
+     WHERE predicate IS NOT NULL
+       AND NOT EXISTS (
+           SELECT 1 FROM entailed_edge AS x
+            WHERE x.subject = c.subject AND x.predicate = c.predicate AND x.object = c.object
+       );
+    """,
+    "INSERT INTO entailed_edge SELECT subject, predicate, object FROM temp.entailed_next;",
+    "DROP TABLE temp.entailed_delta;",
+    "ALTER TABLE temp.entailed_next RENAME TO entailed_delta;",
+]
+ENTAILED_EDGE_CLEANUP_SQL = [
+    "DROP TABLE temp.entailed_delta;",
+    "DROP TABLE temp.direct_edge;",
+    "CREATE INDEX entailed_edge_object ON entailed_edge(object, predicate, subject);",
+]
+
+# used with fast=True; durability is traded for speed while the database is being built
+FAST_PRAGMAS = {
+    "page_size": 65536,
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "cache_size": -1024 * 1024,
+    "locking_mode": "EXCLUSIVE",
+    "temp_store": "MEMORY",
+}
+
+# restored after a fast load completes
+SAFE_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "cache_size": -2000,
+    "locking_mode": "NORMAL",
+    "temp_store": "DEFAULT",
+}
 
-def chunk(iterable: Iterable, size=DEFAULT_CHUNK) -> Iterable[List]:
+# per-file load metadata, used to skip unchanged files when appending;
+# load_segment records the rowid ranges of the statement table inserted from each file,
+# with a NULL path for rows of other inputs, which are kept when appending
+LOAD_MANIFEST_DDL = [
     """
-    Get first N results of iterable
+    CREATE TABLE IF NOT EXISTS load_manifest (
+        path TEXT PRIMARY KEY,
+        size INTEGER,
+        mtime REAL,
+        hash TEXT,
+        row_count INTEGER
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS load_segment (
+        path TEXT,
+        first_rowid INTEGER,
+        last_rowid INTEGER
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS load_segment_path ON load_segment(path);",
+    # position up to which rows of each file are committed, see LoadCheckpoint
+    """
+    CREATE TABLE IF NOT EXISTS load_checkpoint (
+        path TEXT PRIMARY KEY,
+        size INTEGER,
+        mtime REAL,
+        row_offset INTEGER,
+        byte_offset INTEGER,
+        range_rows INTEGER,
+        complete INTEGER
+    );
+    """,
+]
+
+# full-text search over literal values: one FTS5 table per tokenizer, each holding
+# the values in the languages mapped to it; values in any other language, or with
+# no language, go in the default table. Tables use the statement table as external
+# content, so values are not stored twice.
+FTS_TOKENIZERS = {
+    "default": "unicode61 remove_diacritics 2",
+    "en": "porter unicode61 remove_diacritics 2",
+    # no word boundaries to split on; trigram requires SQLite 3.34
+    "cjk": "trigram" if sqlite3.sqlite_version_info >= (3, 34) else "unicode61",
+}
+FTS_LANGUAGES = {"en": ["en"], "cjk": ["zh", "ja", "ko"]}
 
-    https://stackoverflow.com/questions/8991506/iterate-an-iterator-by-chunks-of-n-in-python
+OBO_IN_OWL = "http://www.geneontology.org/formats/oboInOwl#"
+DEFAULT_FTS_PREDICATES = [
+    "http://www.w3.org/2000/01/rdf-schema#label",
+    "http://purl.obolibrary.org/obo/IAO_0000115",
+    f"{OBO_IN_OWL}hasExactSynonym",
+    f"{OBO_IN_OWL}hasRelatedSynonym",
+    f"{OBO_IN_OWL}hasNarrowSynonym",
+    f"{OBO_IN_OWL}hasBroadSynonym",
+]
+
+
+@dataclass
+class LoadCheckpoint:
     """
-    it = iter(iterable)
-    while True:
-        chunk_it = itertools.islice(it, size)
-        try:
-            first_el = next(chunk_it)
-        except StopIteration:
-            return
-        yield itertools.chain((first_el,), chunk_it)
+    Position in a file up to which rows have been committed.
+
+    Line-based files are read in newline-aligned byte ranges, so that a resumed load
+    starts parsing at the range it stopped in; other files are parsed again from the
+    start, and the rows that were committed are skipped.
+    """
+
+    row_offset: int = 0
+    """Rows committed from the file."""
+
+    byte_offset: Optional[int] = None
+    """Start of the byte range being loaded, for line-based files."""
+
+    range_rows: int = 0
+    """Rows committed from the byte range at byte_offset."""
+
+    complete: bool = False
+
+    def advance(self, num_rows: int):
+        self.row_offset += num_rows
+        self.range_rows += num_rows
 
 
 @dataclass
@@ -47,6 +306,47 @@ class SqliteBulkloader(BulkLoader):
     """Implements BulkLoader for SQLite3 databases"""
 
     connection: Any = None
+    fast: bool = False
+    """Load using FAST_PRAGMAS in a single transaction."""
+
+    resolve_stanzas: bool = True
+    """In rdftab compatibility mode, set the stanza of blank nodes to their named root."""
+
+    incremental: bool = False
+    """When appending, skip files recorded as unchanged in the load manifest, and
+    replace the rows of files that have changed."""
+
+    entailed_edges: bool = False
+    """Materialize the entailed_edge table once data is loaded."""
+
+    entailed_edge_predicates: Optional[List[str]] = None
+    """IRIs or CURIEs of the (transitive) properties of existential restrictions
+    included in entailed_edge; defaults to :data:`DEFAULT_ENTAILED_EDGE_PREDICATES`."""
+
+    full_text_search: bool = False
+    """Build FTS5 full-text indexes over literal values once data is loaded."""
+
+    fts_predicates: Optional[List[str]] = None
+    """IRIs or CURIEs of the predicates whose values are indexed for full-text search;
+    defaults to :data:`DEFAULT_FTS_PREDICATES`."""
+
+    compact_stanzas: bool = False
+    """In rdftab compatibility mode, store the stanza only where it differs from the
+    subject, and provide the statements table as a view."""
+
+    checkpoint_batches: Optional[int] = None
+    """Commit, and record a checkpoint in load_checkpoint, after every this many batches,
+    rather than once per file."""
+
+    resume: bool = False
+    """Continue the loads of files from their last checkpoint, and skip files whose load
+    was completed; implies :attr:`checkpoint_batches`."""
+
+    _next_rowid: int = 1
+    _checkpoints: Dict[str, LoadCheckpoint] = field(default_factory=dict)
+    _segments: List[Tuple[str, int, int]] = field(default_factory=list)
+    _manifest_keys: Dict[str, Optional[str]] = field(default_factory=dict)
+    _digests: Dict[str, str] = field(default_factory=dict)
 
     def create_ddl(self):
         """
@@ -55,7 +355,7 @@ class SqliteBulkloader(BulkLoader):
         :return:
         """
         con = self.connection
-        for ddl_stmt in self.ddl_statements():
+        for ddl_stmt in self.ddl_statements() + LOAD_MANIFEST_DDL:
             con.execute(ddl_stmt)
         con.executemany(f"insert into prefix (prefix,base) values (?,?)", self.prefix_map.items())
 
@@ -63,38 +363,678 @@ class SqliteBulkloader(BulkLoader):
         con = self.connection
         raise NotImplementedError
 
+    def uses_compact_stanzas(self) -> bool:
+        """Return True if stanzas are stored only where they differ from subjects."""
+        return self.compact_stanzas and self.rdftab_compatibility
+
+    def ddl_statements(self) -> List[str]:
+        """Return CREATE TABLE statements, for the compact layout if it is used."""
+        if not self.uses_compact_stanzas():
+            return super().ddl_statements()
+        if self.intern_terms:
+            return [
+                TERM_DDL,
+                INTERNED_RDFTAB_STATEMENT_DDL,
+                COMPACT_INTERNED_RDFTAB_STATEMENT_VIEW_DDL,
+                PREFIX_DDL,
+            ]
+        return [COMPACT_RDFTAB_STATEMENT_DDL, COMPACT_RDFTAB_STATEMENT_VIEW_DDL, PREFIX_DDL]
+
+    def statement_table(self) -> str:
+        if self.uses_compact_stanzas() and not self.intern_terms:
+            return "compact_statements"
+        return super().statement_table()
+
+    def index_expression(self, column: str) -> str:
+        # an index on the expression of the view serves lookups by stanza
+        if column == "stanza" and self.uses_compact_stanzas():
+            return COMPACT_STANZA_SQL
+        return column
+
+    def set_pragmas(self, pragmas: Dict[str, Any]):
+        """
+        Set PRAGMAs on the current connection.
+
+        :param pragmas: mapping between pragma names and values
+        :return:
+        """
+        for k, v in pragmas.items():
+            self.connection.execute(f"PRAGMA {k}={v}")
+
+    def _end_fast_load(self):
+        # pragmas such as synchronous cannot be changed inside a transaction; with no
+        # journal a rollback may corrupt the database, so whatever was loaded is kept
+        if self.connection.in_transaction:
+            self.connection.commit()
+        self.set_pragmas(SAFE_PRAGMAS)
+
+    def _commit(self):
+        # in fast mode everything is loaded in one transaction
+        if not self.fast:
+            self.connection.commit()
+
+    def create_indexes(self):
+        """
+        Create indexes on the statement table, once data is loaded.
+
+        Index build time is logged separately from load time. SQLite builds
+        indexes one at a time, as there is a single writer per database.
+
+        :return:
+        """
+        con = self.connection
+        start_time = time.perf_counter()
+        for stmt in self.index_ddl_statements():
+            logger.info(f"Indexing: {stmt}")
+            con.execute(stmt)
+        con.commit()
+        logger.info(f"Built indexes in {time.perf_counter() - start_time:.2f}s")
+
+    def create_entailed_edges(self) -> int:
+        """
+        Materialize the transitive closure of subClassOf and existential restrictions.
+
+        Direct edges are taken from ``rdfs:subClassOf`` statements between named classes,
+        and from ``C rdfs:subClassOf [owl:onProperty P; owl:someValuesFrom D]`` for the
+        properties in :attr:`entailed_edge_predicates`. The closure is computed with
+        semi-naive evaluation, joining only the edges that are new in each step to the
+        direct edges, until no new edges are found. The table is indexed by subject and
+        by object, for ancestor and descendant lookups.
+
+        :return: number of entailed edges
+        """
+        con = self.connection
+        start_time = time.perf_counter()
+        properties = self.entailed_edge_predicates or DEFAULT_ENTAILED_EDGE_PREDICATES
+        params = {f"property{i}": self._contract_term(p) for i, p in enumerate(properties)}
+        params.update(
+            subclass_of=self.contract_uri(RDFS_SUBCLASS_OF),
+            on_property=self.contract_uri(OWL_ON_PROPERTY),
+            some_values_from=self.contract_uri(OWL_SOME_VALUES_FROM),
+        )
+        fmt = {
+            "view": "statements" if self.rdftab_compatibility else "statement",
+            "properties": ",".join(f":property{i}" for i in range(len(properties))),
+        }
+        for stmt in ENTAILED_EDGE_DDL + ENTAILED_EDGE_SEED_SQL:
+            con.execute(stmt.format(**fmt), params)
+        steps = 0
+        while True:
+            (num_new,) = con.execute("SELECT count(*) FROM temp.entailed_delta").fetchone()
+            if not num_new:
+                break
+            steps += 1
+            for stmt in ENTAILED_EDGE_STEP_SQL:
+                con.execute(stmt, params)
+        for stmt in ENTAILED_EDGE_CLEANUP_SQL:
+            con.execute(stmt)
+        con.commit()
+        (num_edges,) = con.execute("SELECT count(*) FROM entailed_edge").fetchone()
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"Entailed {num_edges} edges in {steps} steps ({elapsed:.2f}s)")
+        return num_edges
+
+    def fts_table(self, group: str) -> str:
+        """Return the name of the full-text index for a group of :data:`FTS_TOKENIZERS`."""
+        return f"{self.statement_table()}_fts_{group}"
+
+    @staticmethod
+    def _fts_language_sql(group: str) -> str:
+        def matches(languages: List[str]) -> str:
+            return " OR ".join(
+                f"lower(language) = '{lang}' OR lower(language) LIKE '{lang}-%'"
+                for lang in languages
+            )
+
+        if group in FTS_LANGUAGES:
+            return matches(FTS_LANGUAGES[group])
+        others = [lang for languages in FTS_LANGUAGES.values() for lang in languages]
+        return f"language IS NULL OR NOT ({matches(others)})"
+
+    def create_fts_indexes(self):
+        """
+        Fill the full-text indexes with the values of :attr:`fts_predicates`.
+
+        There is one FTS5 table per entry of :data:`FTS_TOKENIZERS`, with the statement
+        table as external content; the rowid of each match is the rowid of its statement.
+        Indexes are rebuilt in bulk, so they also reflect rows deleted when appending.
+
+        :return:
+        """
+        con = self.connection
+        start_time = time.perf_counter()
+        table = self.statement_table()
+        predicates = self.fts_predicates or DEFAULT_FTS_PREDICATES
+        predicates = [self._contract_term(p) for p in predicates]
+        qs = ",".join("?" for _ in predicates)
+        if self.intern_terms:
+            predicate_sql = f"predicate IN (SELECT id FROM term WHERE value IN ({qs}))"
+        else:
+            predicate_sql = f"predicate IN ({qs})"
+        for group, tokenizer in FTS_TOKENIZERS.items():
+            fts = self.fts_table(group)
+            con.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"value, language UNINDEXED, content='{table}', content_rowid='rowid', "
+                f"tokenize='{tokenizer}')"
+            )
+            con.execute(f"INSERT INTO {fts}({fts}) VALUES('delete-all')")
+            con.execute(
+                f"INSERT INTO {fts}(rowid, value, language) "
+                f"SELECT rowid, value, language FROM {table} "
+                f"WHERE value IS NOT NULL AND {predicate_sql} "
+                f"AND ({self._fts_language_sql(group)})",
+                predicates,
+            )
+            con.execute(f"INSERT INTO {fts}({fts}) VALUES('optimize')")
+        con.commit()
+        logger.info(f"Built full-text indexes in {time.perf_counter() - start_time:.2f}s")
+
+    def _is_bnode_sql(self, column: str) -> str:
+        if self.intern_terms:
+            return f"{column} IN (SELECT id FROM temp.bnode_term)"
+        else:
+            return f"substr({column}, 1, 2) = '_:'"
+
+    def resolve_blank_node_stanzas(self):
+        """
+        Set the stanza of each blank node statement to the named subject it belongs to.
+
+        The stanza of a blank node is the named subject that refers to it, directly
+        or through a chain of other blank nodes; for reified axioms it is the
+        ``owl:annotatedSource``. Blank nodes that are not reachable from a named subject
+        are assigned their top-level blank node. Where several subjects refer to the
+        same blank node, the lowest is used. This is done in SQL over the loaded table.
+
+        :return:
+        """
+        if not self.rdftab_compatibility:
+            raise ValueError("Stanzas are only used in rdftab compatibility mode")
+        con = self.connection
+        start_time = time.perf_counter()
+        annotated_source = self.contract_uri(OWL_ANNOTATED_SOURCE)
+        if self.intern_terms:
+            con.execute(
+                "CREATE TEMP TABLE bnode_term AS "
+                "SELECT id FROM term WHERE substr(value, 1, 2) = '_:'"
+            )
+            annotated_source = self._term_ids.get(annotated_source)
+        params = {
+            "table": self.statement_table(),
+            "subject_is_bnode": self._is_bnode_sql("subject"),
+            "object_is_bnode": self._is_bnode_sql("object"),
+        }
+        for stmt in STANZA_RESOLUTION_SQL:
+            con.execute(stmt.format(**params), {"annotated_source": annotated_source})
+        if self.intern_terms:
+            con.execute("DROP TABLE temp.bnode_term")
+        con.commit()
+        logger.info(f"Resolved blank node stanzas in {time.perf_counter() - start_time:.2f}s")
+
+    def worker_copy(self) -> "SqliteBulkloader":
+        worker = super().worker_copy()
+        worker.connection = None
+        return worker
+
+    def _load_term_ids(self):
+        for term_id, term in self.connection.execute("select id, value from term"):
+            self._term_ids[term] = term_id
+
+    def insert_sql(self) -> str:
+        """
+        Return the INSERT statement used for statement rows.
+
+        In rdftab compatibility mode the subject parameter is bound to both the stanza
+        and subject columns, so rows can be inserted as they come from :meth:`statements`;
+        with :attr:`compact_stanzas`, the stanza is left NULL instead.
+        """
+        table = self.statement_table()
+        cols = self.row_columns()
+        colstr = ",".join(cols)
+        if self.rdftab_compatibility and not self.compact_stanzas:
+            qs = ",".join([f"?{i + 1}" for i in range(len(cols))])
+            return f"insert into {table}(stanza,{colstr}) values (?1,{qs})"
+        else:
+            qs = ",".join(["?" for _ in cols])
+            return f"insert into {table}({colstr}) values ({qs})"
+
+    def _insert(self, rows: Iterable[STATEMENT]) -> int:
+        con = self.connection
+        if self.intern_terms:
+            rows = self.intern_statements(rows)
+        num_rows = con.executemany(self.insert_sql(), rows).rowcount
+        if self.intern_terms:
+            con.executemany("insert into term (id,value) values (?,?)", self.pop_new_terms())
+        logger.info(f"Inserted {num_rows} rows")
+        return num_rows
+
+    def _manifest_key(self, path) -> Optional[str]:
+        # files are recorded by absolute path; other inputs are not tracked
+        if path not in self._manifest_keys:
+            is_file = path is not None and os.path.isfile(path)
+            self._manifest_keys[path] = str(Path(path).resolve()) if is_file else None
+        return self._manifest_keys[path]
+
+    def _digest(self, path: str) -> str:
+        if path not in self._digests:
+            self._digests[path] = file_digest(path)
+        return self._digests[path]
+
+    def changed_paths(self, paths: List[str]) -> List[str]:
+        """
+        Return the paths whose contents differ from those recorded in the load manifest.
+
+        Files with the same size and mtime are assumed to be unchanged; otherwise
+        content hashes are compared, so files that were only touched are skipped too.
+
+        :param paths:
+        :return:
+        """
+        con = self.connection
+        changed = []
+        for path in paths:
+            key = self._manifest_key(path)
+            if key is None:
+                changed.append(path)
+                continue
+            row = con.execute(
+                "select size, mtime, hash from load_manifest where path=?", (key,)
+            ).fetchone()
+            stat = os.stat(path)
+            if row is not None:
+                size, mtime, digest = row
+                if (size, mtime) == (stat.st_size, stat.st_mtime):
+                    logger.info(f"Skipping unchanged {path}")
+                    continue
+                if size == stat.st_size and digest == self._digest(path):
+                    logger.info(f"Skipping unchanged {path} (touched)")
+                    con.execute(
+                        "update load_manifest set mtime=? where path=?", (stat.st_mtime, key)
+                    )
+                    continue
+            changed.append(path)
+        return changed
+
+    def adopt_untracked_rows(self) -> int:
+        """
+        Record rows loaded before load_segment existed as segments of no file.
+
+        Such rows are kept as they are when appending; only files loaded from now on
+        can be detected as unchanged, or replaced.
+
+        :return: number of rows adopted
+        """
+        con = self.connection
+        table = self.statement_table()
+        (has_segments,) = con.execute("select exists(select 1 from load_segment)").fetchone()
+        (num_rows,) = con.execute(f"select count(*) from {table}").fetchone()
+        if has_segments or not num_rows:
+            return 0
+        logger.warning(
+            f"{num_rows} rows of {table} were loaded by an older version, without a load "
+            f"manifest; they are kept, and their files are not recognized when appending"
+        )
+        # one segment for each run of consecutive rowids
+        con.execute(
+            "insert into load_segment (path,first_rowid,last_rowid) "
+            "select NULL, min(rowid), max(rowid) from "
+            f"(select rowid, rowid - row_number() over (order by rowid) as run from {table}) "
+            "group by run"
+        )
+        return num_rows
+
+    def check_segments(self):
+        """
+        Check that load_segment accounts for every row of the statement table.
+
+        Rowids may be renumbered by VACUUM, after which segments cannot be used to
+        delete the rows of a file.
+
+        :return:
+        """
+        table = self.statement_table()
+        num_rows, max_rowid = self.connection.execute(
+            f"select count(*), max(rowid) from {table}"
+        ).fetchone()
+        segment_rows, max_segment_rowid = self.connection.execute(
+            "select sum(last_rowid - first_rowid + 1), max(last_rowid) from load_segment"
+        ).fetchone()
+        if (num_rows, max_rowid) != (segment_rows or 0, max_segment_rowid):
+            raise ValueError(
+                f"Rows of {table} do not match load_segment (the database may have been "
+                f"vacuumed, or loaded by an older version); reload without appending"
+            )
+
+    def delete_file_rows(self, path: str) -> int:
+        """
+        Delete the rows loaded from a file, and its manifest entry.
+
+        :param path:
+        :return: number of rows deleted
+        """
+        con = self.connection
+        key = self._manifest_key(path)
+        segments = con.execute(
+            "select first_rowid, last_rowid from load_segment where path=?", (key,)
+        ).fetchall()
+        num_rows = con.executemany(
+            f"delete from {self.statement_table()} where rowid between ? and ?", segments
+        ).rowcount
+        con.execute("delete from load_segment where path=?", (key,))
+        con.execute("delete from load_manifest where path=?", (key,))
+        if num_rows > 0:
+            logger.info(f"Deleted {num_rows} rows previously loaded from {path}")
+        return num_rows
+
+    def _add_segment(self, path, num_rows: int):
+        # rows are inserted with consecutive rowids, following the largest rowid
+        first_rowid = self._next_rowid
+        self._next_rowid += num_rows
+        # rows of stdin and other inputs that are not files have a segment of no file
+        key = self._manifest_key(path)
+        if num_rows == 0:
+            return
+        if self._segments and self._segments[-1][0] == key:
+            last = self._segments[-1]
+            if last[2] + 1 == first_rowid:
+                self._segments[-1] = (key, last[1], self._next_rowid - 1)
+                return
+        self._segments.append((key, first_rowid, self._next_rowid - 1))
+
+    def _flush_segments(self):
+        self.connection.executemany(
+            "insert into load_segment (path,first_rowid,last_rowid) values (?,?,?)",
+            self._segments,
+        )
+        self._segments = []
+
+    def record_manifest(self, paths: List[str]):
+        """
+        Record the size, mtime, content hash and row count of each loaded file.
+
+        :param paths:
+        :return:
+        """
+        con = self.connection
+        for path in paths:
+            key = self._manifest_key(path)
+            if key is None:
+                continue
+            stat = os.stat(path)
+            (row_count,) = con.execute(
+                "select coalesce(sum(last_rowid - first_rowid + 1), 0) from load_segment "
+                "where path=?",
+                (key,),
+            ).fetchone()
+            con.execute(
+                "insert or replace into load_manifest (path,size,mtime,hash,row_count) "
+                "values (?,?,?,?,?)",
+                (key, stat.st_size, stat.st_mtime, self._digest(path), row_count),
+            )
+
+    def load_checkpoints(self, paths: List[str]):
+        """
+        Read the checkpoints of files whose loads can be resumed.
+
+        Rows loaded from files that have changed since their checkpoint are deleted,
+        and those files are loaded again from the start.
+
+        :param paths:
+        :return:
+        """
+        con = self.connection
+        for path in paths:
+            key = self._manifest_key(path)
+            if key is None:
+                continue
+            row = con.execute(
+                "select size, mtime, row_offset, byte_offset, range_rows, complete "
+                "from load_checkpoint where path=?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                continue
+            size, mtime, row_offset, byte_offset, range_rows, complete = row
+            stat = os.stat(path)
+            if (size, mtime) == (stat.st_size, stat.st_mtime):
+                self._checkpoints[str(path)] = LoadCheckpoint(
+                    row_offset, byte_offset, range_rows, bool(complete)
+                )
+            else:
+                logger.warning(f"{path} has changed since its checkpoint; loading it again")
+                self.delete_file_rows(path)
+                con.execute("delete from load_checkpoint where path=?", (key,))
+
+    def write_checkpoint(self, path: str):
+        """
+        Record the checkpoint of a file, to be committed with its rows.
+
+        :param path:
+        :return:
+        """
+        key = self._manifest_key(path)
+        if key is None:
+            # stdin cannot be read again
+            return
+        checkpoint = self._checkpoints[path]
+        stat = os.stat(path)
+        self.connection.execute(
+            "insert or replace into load_checkpoint "
+            "(path,size,mtime,row_offset,byte_offset,range_rows,complete) values (?,?,?,?,?,?,?)",
+            (
+                key,
+                stat.st_size,
+                stat.st_mtime,
+                checkpoint.row_offset,
+                checkpoint.byte_offset,
+                checkpoint.range_rows,
+                checkpoint.complete,
+            ),
+        )
+
+    def _checkpointed_rows(
+        self, path: str, mime_type: str, checkpoint: LoadCheckpoint
+    ) -> Iterator[Iterable[Tuple]]:
+        stats = self.stats
+        if mime_type in LINE_BASED_MIME_TYPES and is_plain_file(path):
+            if self.use_shacl_namespaces:
+                self._scan_shacl_prefixes(path, mime_type)
+            for byte_range in line_ranges(path, self.chunk_bytes, checkpoint.byte_offset or 0):
+                if byte_range[0] != checkpoint.byte_offset:
+                    checkpoint.byte_offset = byte_range[0]
+                    checkpoint.range_rows = 0
+                rows = self.task_statements(path, mime_type, byte_range)
+                rows = itertools.islice(rows, checkpoint.range_rows, None)
+                yield from chunk(stats.timed_rows(rows), self.batch_size)
+        else:
+            if self.memory_budget_mb:
+                logger.warning(
+                    f"Blank node labels of {path} are held in memory, outside the memory budget"
+                )
+            rows = self.task_statements(path, mime_type, stable_blank_nodes=True)
+            if checkpoint.row_offset:
+                logger.info(f"Skipping {checkpoint.row_offset} rows committed from {path}")
+                rows = itertools.islice(rows, checkpoint.row_offset, None)
+            yield from chunk(stats.timed_rows(rows), self.batch_size)
+
+    def checkpointed_row_batches(
+        self, paths: List[str], mime_type=None
+    ) -> Iterator[Tuple[str, Optional[Iterable[STATEMENT]]]]:
+        """
+        Yields batches of rows from paths like :meth:`row_batches`, from their checkpoints.
+
+        The checkpoint of each path is in :attr:`_checkpoints`, and is advanced by the
+        writer as rows are inserted. Files are loaded one at a time in this process.
+
+        :param paths:
+        :param mime_type:
+        :return:
+        """
+        for path in paths:
+            path = str(path)
+            checkpoint = self._checkpoints.setdefault(path, LoadCheckpoint())
+            if checkpoint.complete:
+                logger.info(f"Skipping {path}, loaded before the last checkpoint")
+                continue
+            if not self.progress:
+                print(path)
+            self.stats.current_path = path
+            path_mime_type = self.input_mime_type(path, mime_type)
+            logger.info(f"Loading {path} into {self.database_path} from {checkpoint}...")
+            for rows in self._checkpointed_rows(path, path_mime_type, checkpoint):
+                yield path, rows
+            checkpoint.complete = True
+            yield path, None
+
     def bulkload(self, paths: Union[str, List[str]], mime_type=None, create_tables=True):
         """
         Bulkloads from a path.
 
+        If :attr:`workers` is greater than one, each path (or each byte range of a
+        large N-Triples/N-Quads file) is parsed and contracted in a separate worker
+        process, and this process writes the resulting batches.
+
+        If :attr:`intern_terms` is set, terms are stored once in a term table and
+        referenced by id; the usual statement table is provided as a view.
+
+        In rdftab compatibility mode, blank node stanzas are resolved once all rows
+        are loaded, unless :attr:`resolve_stanzas` is unset. If :attr:`compact_stanzas`
+        is set, stanzas are only stored for the blank nodes that they are resolved for;
+        the statements view, and the stanza index, use the subject for all other rows.
+
+        If :attr:`entailed_edges` is set, the entailed_edge table is materialized after
+        all data is loaded, see :meth:`create_entailed_edges`.
+
+        If :attr:`full_text_search` is set, FTS5 indexes over literal values are built
+        after all data is loaded, see :meth:`create_fts_indexes`.
+
+        If :attr:`index_statements` is set, indexes are created after all data is loaded.
+
+        If :attr:`fast` is set, the database is loaded using :data:`FAST_PRAGMAS`
+        in a single transaction, and :data:`SAFE_PRAGMAS` are set afterwards.
+
+        If :attr:`memory_budget_mb` is set, the page cache is limited to its share of
+        the budget. Term ids are always held in memory with :attr:`intern_terms`.
+
+        Timings and counters for each stage are collected in :attr:`stats`.
+
+        Each file is recorded in the load_manifest table. When appending with
+        :attr:`incremental` set, unchanged files are skipped, and rows previously
+        loaded from changed files are deleted before they are reloaded.
+
+        If :attr:`checkpoint_batches` is set, rows are committed every so many batches
+        along with a :class:`LoadCheckpoint` for the file in the load_checkpoint table,
+        and each file is recorded in the manifest as soon as it is loaded. With
+        :attr:`resume` set, an interrupted load continues from its checkpoints: line-based
+        files are parsed from the byte range the load stopped in, while other files are
+        parsed again and their committed rows skipped. Blank nodes of other files are
+        then numbered in order, so that they are labelled the same on every parse; this
+        holds the labels of all blank nodes of the file in memory, see
+        :func:`relabel_blank_nodes`. Blank node labels are prefixed by file, see
+        :func:`blank_node_prefix`.
+        Checkpoints cannot be used with :attr:`fast`, which loads in one transaction.
+
         :param path:
         :param mime_type:
         :return:
         """
         con = sqlite3.connect(self.database_path)
         self.connection = con
-        if create_tables:
-            self.create_ddl()
+        if self.fast:
+            self.set_pragmas(FAST_PRAGMAS)
+        if self.memory_budget_mb:
+            cache_kb = budget_bytes(self.memory_budget_mb, "database_cache") // 1024
+            self.set_pragmas({"cache_size": -cache_kb})
+        stats = self.start_stats()
+        start_time = time.perf_counter()
+        num_rows = 0
         if not isinstance(paths, list):
             paths = [paths]
-        for path in paths:
-            print(path)
-            logger.info(f"Loading {path} into {self.database_path} as {mime_type}...")
-            colstr = ",".join(COLS)
-            qs = ",".join(["?" for _ in COLS])
-            for chunk_it in chunk(self.statements(path, mime_type), self.batch_size):
-                tuples = []
-                for t in chunk_it:
-                    if self.rdftab_compatibility:
-                        tuples.append(t+(t[0],))
-                    else:
-                        tuples.append(t)
-                logging.info(f"Loaded {len(tuples)} loaded; {tuples[0]}")
-                if self.rdftab_compatibility:
-                    con.executemany(f"insert into statements({colstr},stanza) values ({qs},?)", tuples)
+        checkpoint_batches = self.checkpoint_batches or (1 if self.resume else None)
+        if checkpoint_batches:
+            if self.fast:
+                raise ValueError("Checkpoints cannot be used with fast, a single transaction")
+            if self.workers > 1 or self.memory_budget_mb:
+                logger.warning("Loading files one at a time in this process, to checkpoint them")
+        try:
+            if create_tables:
+                self.create_ddl()
+            else:
+                for ddl_stmt in LOAD_MANIFEST_DDL:
+                    con.execute(ddl_stmt)
+                if self.intern_terms:
+                    self._load_term_ids()
+                if self.resume:
+                    self.load_checkpoints(paths)
+                if self.incremental:
+                    self.adopt_untracked_rows()
+                    self.check_segments()
+                    paths = self.changed_paths(paths)
+                    for path in paths:
+                        # partially loaded files are continued
+                        if str(path) not in self._checkpoints:
+                            self.delete_file_rows(path)
+            table = self.statement_table()
+            (max_rowid,) = con.execute(f"select max(rowid) from {table}").fetchone()
+            self._next_rowid = (max_rowid or 0) + 1
+            if checkpoint_batches:
+                batches = self.checkpointed_row_batches(paths, mime_type)
+            else:
+                batches = self.row_batches(paths, mime_type)
+            num_batches = 0
+            for path, rows in batches:
+                if rows is None:
+                    logger.info(f"Finished {path}")
+                    with stats.stage("commit"):
+                        self._flush_segments()
+                        if checkpoint_batches:
+                            self.record_manifest([path])
+                            self.write_checkpoint(path)
+                        self._commit()
                 else:
-                    con.executemany(f"insert into statement({colstr}) values ({qs})", tuples)
-            con.commit()
+                    with stats.stage("insert", exclude="parse"):
+                        inserted = self._insert(rows)
+                    self._add_segment(path, inserted)
+                    stats.add_rows(path, inserted)
+                    num_rows += inserted
+                    if checkpoint_batches:
+                        self._checkpoints[path].advance(inserted)
+                        num_batches += 1
+                        if num_batches % checkpoint_batches == 0:
+                            with stats.stage("commit"):
+                                self._flush_segments()
+                                self.write_checkpoint(path)
+                                self._commit()
+            with stats.stage("commit"):
+                self._flush_segments()
+                self.record_manifest(paths)
+                con.commit()
+            elapsed = time.perf_counter() - start_time
+            rate = num_rows / elapsed if elapsed else 0
+            logger.info(f"Loaded {num_rows} rows in {elapsed:.2f}s ({rate:.0f} rows/s)")
+            logger.info(f"Contraction cache: {self.contraction_cache_info()}")
+            if self.rdftab_compatibility and self.resolve_stanzas and num_rows:
+                with stats.stage("stanza_resolution"):
+                    self.resolve_blank_node_stanzas()
+            if self.entailed_edges:
+                with stats.stage("entailment"):
+                    self.create_entailed_edges()
+            if self.full_text_search:
+                with stats.stage("fts"):
+                    self.create_fts_indexes()
+            if self.index_statements:
+                with stats.stage("index"):
+                    self.create_indexes()
+            stats.finish()
+        except BaseException:
+            if self.fast:
+                # the original error is raised, even if the pragmas cannot be restored
+                try:
+                    self._end_fast_load()
+                except sqlite3.Error as e:
+                    logger.error(f"Could not restore pragmas after a failed fast load: {e}")
+            raise
+        if self.fast:
+            self._end_fast_load()
         #if self.rdftab_compatibility:
         #    con.execute(RDFTAB_INSERT)
-
@@ -0,0 +1,161 @@
+"""
+Timing and counters collected while loading.
+
+Stages are timed by wall clock, and some are nested: ``parse`` is the time spent
+waiting for rows (parsing and contraction, or waiting on worker processes), and
+includes ``shacl_prepass`` and ``contraction`` (CURIE contraction of IRIs that
+were not in the cache). ``prefix_map`` is the time spent rebuilding the prefix
+map after SHACL prefixes are found.
+
+Stages timed with ``exclude`` do not count time spent in the excluded stage, e.g.
+``insert`` does not include producing the rows it consumes.
+"""
+import itertools
+import json
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# rows are timed in blocks, to keep the overhead per row low
+TIMING_BLOCK = 1000
+PROGRESS_INTERVAL = 0.5
+
+
+def peak_rss_mb(who: str = "self") -> Optional[float]:
+    """
+    Return the peak resident set size of this process (or of its children) in MB.
+
+    :param who: ``self`` or ``children``
+    :return: None where the resource module is unavailable
+    """
+    if resource is None:
+        return None
+    rusage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    # ru_maxrss is in bytes on macOS, and in kilobytes elsewhere
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return rusage.ru_maxrss / scale
+
+
+@dataclass
+class LoadStats:
+    """Per-stage timings and counters for one call to ``bulkload``."""
+
+    progress: bool = False
+    """Write a progress line to stderr while loading."""
+
+    stages: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    rows_per_file: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    rows: int = 0
+    rows_parsed: int = 0
+    current_path: Optional[str] = None
+    start_time: float = field(default_factory=time.perf_counter)
+    end_time: Optional[float] = None
+    _last_progress: float = 0.0
+
+    def add_time(self, stage: str, seconds: float):
+        self.stages[stage] += seconds
+
+    @contextmanager
+    def stage(self, name: str, exclude: Optional[str] = None):
+        """
+        Time a block of code as a stage.
+
+        :param name:
+        :param exclude: a stage whose time within the block is not counted
+        :return:
+        """
+        excluded_before = self.stages[exclude] if exclude else 0.0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if exclude:
+                elapsed -= self.stages[exclude] - excluded_before
+            self.add_time(name, elapsed)
+
+    def timed_rows(self, rows: Iterable, stage: str = "parse") -> Iterator:
+        """
+        Yields rows, timing how long it takes to produce them.
+
+        :param rows:
+        :param stage:
+        :return:
+        """
+        it = iter(rows)
+        while True:
+            start = time.perf_counter()
+            block = list(itertools.islice(it, TIMING_BLOCK))
+            self.add_time(stage, time.perf_counter() - start)
+            if not block:
+                return
+            self.rows_parsed += len(block)
+            if self.progress:
+                self.report_progress()
+            yield from block
+
+    def add_rows(self, path: Optional[str], num_rows: int):
+        """Count rows written from a path."""
+        self.rows += num_rows
+        if path is not None:
+            self.rows_per_file[str(path)] += num_rows
+
+    def elapsed(self) -> float:
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        return end_time - self.start_time
+
+    def finish(self):
+        """Stop the clock, and end the progress line."""
+        self.end_time = time.perf_counter()
+        if self.progress:
+            self.report_progress(force=True)
+            sys.stderr.write("\n")
+
+    def report_progress(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        elapsed = self.elapsed()
+        rate = self.rows_parsed / elapsed if elapsed else 0
+        path = f" {self.current_path}" if self.current_path else ""
+        sys.stderr.write(f"\r{self.rows_parsed} rows in {elapsed:.1f}s ({rate:.0f} rows/s){path}")
+        sys.stderr.flush()
+
+    def as_dict(self, contraction_cache_info: Any = None) -> Dict[str, Any]:
+        """
+        Return the statistics as a JSON-serializable dictionary.
+
+        :param contraction_cache_info: a ``CacheInfo`` from the loader, if any
+        :return:
+        """
+        elapsed = self.elapsed()
+        report = {
+            "elapsed_seconds": elapsed,
+            "rows": self.rows,
+            "rows_per_second": self.rows / elapsed if elapsed else 0,
+            "stages": dict(self.stages),
+            "rows_per_file": dict(self.rows_per_file),
+            "peak_rss_mb": peak_rss_mb("self"),
+            "peak_rss_children_mb": peak_rss_mb("children"),
+        }
+        if contraction_cache_info is not None:
+            lookups = contraction_cache_info.hits + contraction_cache_info.misses
+            report["contraction_cache"] = {
+                **contraction_cache_info._asdict(),
+                "hit_rate": contraction_cache_info.hits / lookups if lookups else None,
+            }
+        return report
+
+    def write_json(self, path: str, contraction_cache_info: Any = None):
+        """Write the statistics to a JSON file."""
+        with open(path, "w") as stream:
+            json.dump(self.as_dict(contraction_cache_info), stream, indent=2)
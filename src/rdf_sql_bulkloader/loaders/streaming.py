@@ -0,0 +1,159 @@
+"""
+Bounded-memory streaming, with backpressure between the parser and the writer.
+
+Rows are parsed and contracted in a producer thread, and handed to the writer in
+blocks through a queue that is bounded by the estimated size of the queued rows:
+when the writer falls behind, the parser waits. The size of rows is sampled as
+they are produced, and the writer sizes its batches from it, so that the rows held
+in memory stay within a share of the memory budget whatever their size.
+
+The budget is split between the queue, the batch being written, the contraction
+cache and the database's own page cache, see :data:`BUDGET_SHARES`.
+"""
+import itertools
+import sys
+import threading
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, Optional
+
+BUDGET_SHARES = {
+    "queue": 0.1,
+    "batch": 0.3,
+    "contraction_cache": 0.2,
+    "database_cache": 0.2,
+}
+# the rest is left for the parser, the interpreter and the database driver
+
+# rows per block on the queue
+STREAM_BLOCK = 1000
+# rows of each block whose size is measured
+SAMPLE_ROWS = 16
+MIN_BATCH_ROWS = 1000
+# approximate size of an IRI and its CURIE in the contraction cache
+CONTRACTION_CACHE_ENTRY_BYTES = 400
+
+
+def budget_bytes(memory_budget_mb: float, part: str) -> int:
+    """Return the bytes of a memory budget allotted to one of :data:`BUDGET_SHARES`."""
+    return int(memory_budget_mb * 1024 * 1024 * BUDGET_SHARES[part])
+
+
+def row_bytes(row: tuple) -> int:
+    """Estimate the memory held by a row; strings shared with other rows are counted each time."""
+    return sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row if v is not None)
+
+
+class RowStream:
+    """
+    Rows produced by a background thread, with at most ``max_bytes`` of rows queued.
+
+    A single block may exceed ``max_bytes``, so that the stream always makes progress.
+    """
+
+    def __init__(self, rows: Iterable, max_bytes: int, block_rows: int = STREAM_BLOCK):
+        self.max_bytes = max_bytes
+        self.block_rows = block_rows
+        self.mean_row_bytes: Optional[float] = None
+        self.max_queued_bytes = 0
+        self._rows = rows
+        self._blocks = deque()
+        self._queued_bytes = 0
+        self._done = False
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._produce, name="rdf-parser", daemon=True)
+
+    def _measure(self, block: List) -> int:
+        sample = block[:SAMPLE_ROWS]
+        mean = sum(row_bytes(row) for row in sample) / len(sample)
+        if self.mean_row_bytes is None:
+            self.mean_row_bytes = mean
+        else:
+            self.mean_row_bytes = 0.9 * self.mean_row_bytes + 0.1 * mean
+        return int(mean * len(block))
+
+    def _produce(self):
+        condition = self._condition
+        try:
+            it = iter(self._rows)
+            while True:
+                block = list(itertools.islice(it, self.block_rows))
+                if not block:
+                    break
+                num_bytes = self._measure(block)
+                with condition:
+                    while (
+                        self._queued_bytes
+                        and self._queued_bytes + num_bytes > self.max_bytes
+                        and not self._closed
+                    ):
+                        condition.wait()
+                    if self._closed:
+                        return
+                    self._blocks.append((block, num_bytes))
+                    self._queued_bytes += num_bytes
+                    self.max_queued_bytes = max(self.max_queued_bytes, self._queued_bytes)
+                    condition.notify_all()
+        except BaseException as e:
+            self._error = e
+        finally:
+            with condition:
+                self._done = True
+                condition.notify_all()
+
+    def blocks(self) -> Iterator[List]:
+        """
+        Yields blocks of rows in order, starting the producer thread.
+
+        Errors raised by the producer are raised here, once the blocks before them
+        have been yielded.
+        """
+        condition = self._condition
+        self._thread.start()
+        try:
+            while True:
+                with condition:
+                    while not self._blocks and not self._done:
+                        condition.wait()
+                    if not self._blocks:
+                        if self._error is not None:
+                            raise self._error
+                        return
+                    block, num_bytes = self._blocks.popleft()
+                    self._queued_bytes -= num_bytes
+                    condition.notify_all()
+                yield block
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop the producer, e.g. if the writer fails."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def batch_rows(self, max_bytes: int, max_rows: int) -> int:
+        """Return the number of rows that fit in max_bytes, at the mean size of rows so far."""
+        if not self.mean_row_bytes:
+            return min(MIN_BATCH_ROWS, max_rows)
+        return max(MIN_BATCH_ROWS, min(max_rows, int(max_bytes / self.mean_row_bytes)))
+
+
+def adaptive_chunks(iterable: Iterable, size: Callable[[], int]) -> Iterator[Iterator]:
+    """
+    Like :func:`chunk`, but the size of each chunk is computed when the chunk starts.
+
+    The size is computed after the first element of the chunk is read.
+
+    :param iterable:
+    :param size: returns the number of elements in the next chunk
+    :return:
+    """
+    it = iter(iterable)
+    while True:
+        try:
+            first_el = next(it)
+        except StopIteration:
+            return
+        yield itertools.chain((first_el,), itertools.islice(it, size() - 1))
@@ -0,0 +1,101 @@
+"""
+On-disk cache of named prefix maps.
+
+Resolving named prefix maps with prefixmaps, and compiling the result into a
+:class:`PrefixIndex`, is repeated by every loader. Both depend only on the names
+and on the prefixmaps version, so they are cached as JSON in
+``$RDF_SQL_BULKLOADER_CACHE_DIR``, or else in ``rdf-sql-bulkloader`` under
+``$XDG_CACHE_HOME`` (``~/.cache`` by default).
+"""
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from rdf_sql_bulkloader.prefix_index import PrefixIndex
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "RDF_SQL_BULKLOADER_CACHE_DIR"
+# bump when the layout of cache files changes
+CACHE_FORMAT = 1
+
+
+def cache_dir() -> Path:
+    """Return the directory that cached prefix maps are written to."""
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "rdf-sql-bulkloader"
+
+
+def _cache_key(names: List[str]) -> Dict:
+    return {
+        "format": CACHE_FORMAT,
+        "prefixmaps": metadata.version("prefixmaps"),
+        "names": list(names),
+    }
+
+
+def cache_path(names: List[str]) -> Path:
+    """Return the path of the cache file for a list of named prefix maps."""
+    key = json.dumps(_cache_key(names), sort_keys=True)
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    return cache_dir() / f"prefixmap-{digest}.json"
+
+
+def _read_cache(path: Path, key: Dict) -> Optional[Tuple[Dict[str, str], PrefixIndex]]:
+    try:
+        with open(path) as stream:
+            data = json.load(stream)
+        if data["key"] != key:
+            return None
+        return data["prefix_map"], PrefixIndex(**data["index"])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable prefix map cache {path}: {e}")
+        return None
+
+
+def _write_cache(path: Path, key: Dict, prefix_map: Dict[str, str], index: PrefixIndex):
+    data = {"key": key, "prefix_map": prefix_map, "index": dataclasses.asdict(index)}
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w") as stream:
+            json.dump(data, stream)
+        # atomic, so concurrent loaders never see a partial file
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write prefix map cache {path}: {e}")
+
+
+def load_named_prefix_maps(
+    names: List[str], use_cache: bool = True
+) -> Tuple[Dict[str, str], PrefixIndex]:
+    """
+    Resolve named prefix maps, and compile them into an index.
+
+    :param names: names of prefixmaps contexts, e.g. ``["merged"]``
+    :param use_cache: read and write the on-disk cache
+    :return: the merged prefix map, and its PrefixIndex
+    """
+    key = _cache_key(names) if use_cache else None
+    path = cache_path(names) if use_cache else None
+    if use_cache:
+        cached = _read_cache(path, key)
+        if cached is not None:
+            return cached
+    # imported here, as it is only needed when the cache is cold
+    from prefixmaps.io.parser import load_multi_context
+
+    prefix_map = load_multi_context(names).as_dict()
+    index = PrefixIndex.from_prefix_map(prefix_map)
+    if use_cache:
+        _write_cache(path, key, prefix_map, index)
+    return prefix_map, index
@@ -0,0 +1,90 @@
+"""
+Longest-prefix-match CURIE contraction, specialized for bulk loading.
+
+Gives the same results as :meth:`curies.Converter.compress` for a simple prefix map,
+without the per-call overhead of the general purpose converter.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, List, Mapping, Optional
+
+
+@dataclass
+class PrefixIndex:
+    """
+    Index over the namespaces of a prefix map.
+
+    Namespaces are kept in a sorted list, and each one points to the longest other
+    namespace that is a prefix of it. To contract an IRI, bisection finds the greatest
+    namespace that sorts at or before the IRI; any namespace that the IRI starts with
+    is either that namespace or one of its ancestors, so the parent pointers are
+    followed until a match is found.
+    """
+
+    namespaces: List[str]
+    prefixes: List[str]
+    parents: List[int]
+
+    @classmethod
+    def from_prefix_map(cls, prefix_map: Mapping[str, str]) -> "PrefixIndex":
+        """
+        Build an index from a prefix map.
+
+        If two prefixes share a namespace, the first one is used.
+
+        :param prefix_map: mapping between prefixes and namespaces
+        :return:
+        """
+        namespace_map = {}
+        for prefix, namespace in prefix_map.items():
+            if namespace and namespace not in namespace_map:
+                namespace_map[namespace] = prefix
+        namespaces = sorted(namespace_map)
+        parents = []
+        # indexes of the namespaces that are prefixes of the current one
+        stack = []
+        for i, namespace in enumerate(namespaces):
+            while stack and not namespace.startswith(namespaces[stack[-1]]):
+                stack.pop()
+            parents.append(stack[-1] if stack else -1)
+            stack.append(i)
+        return cls(namespaces, [namespace_map[ns] for ns in namespaces], parents)
+
+    def compress(self, iri: str) -> Optional[str]:
+        """
+        Contract an IRI to a CURIE using the longest matching namespace.
+
+        :param iri:
+        :return: CURIE, or None if no namespace matches
+        """
+        namespaces = self.namespaces
+        parents = self.parents
+        i = bisect_right(namespaces, iri) - 1
+        while i >= 0:
+            namespace = namespaces[i]
+            if iri.startswith(namespace):
+                return f"{self.prefixes[i]}:{iri[len(namespace):]}"
+            i = parents[i]
+        return None
+
+    def compress_all(self, iris: Iterable[str]) -> List[str]:
+        """
+        Contract a batch of IRIs, passing through any that do not match a namespace.
+
+        :param iris:
+        :return: list of CURIEs or IRIs, in the same order as the input
+        """
+        namespaces = self.namespaces
+        prefixes = self.prefixes
+        parents = self.parents
+        results = []
+        for iri in iris:
+            i = bisect_right(namespaces, iri) - 1
+            while i >= 0:
+                namespace = namespaces[i]
+                if iri.startswith(namespace):
+                    iri = f"{prefixes[i]}:{iri[len(namespace):]}"
+                    break
+                i = parents[i]
+            results.append(iri)
+        return results
@@ -0,0 +1,87 @@
+"""DuckDB loader tests."""
+
+import tempfile
+import unittest
+from importlib.util import find_spec
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from rdf_sql_bulkloader.cli import main
+from tests import (
+    ENDOMEMBRANE_SYSTEM,
+    NUCLEAR_ENVELOPE,
+    NUCLEUS,
+    TEST_INPUT_OWL,
+    TEST_PREFIX_MAP,
+)
+from tests.test_sqlite3_bulkloader import OWL_PREFIX_MAP, SUB_SVF_QUERY
+
+HAS_DUCKDB = find_spec("duckdb") is not None and find_spec("pyarrow") is not None
+
+
+@unittest.skipUnless(HAS_DUCKDB, "duckdb and pyarrow are not installed")
+class TestDuckDBBulkLoader(unittest.TestCase):
+    """Test duckdb."""
+
+    def setUp(self) -> None:
+        from rdf_sql_bulkloader.loaders.duckdb_bulkloader import DuckDBBulkloader
+
+        self.loader = DuckDBBulkloader(
+            database_path=":memory:",
+            named_prefix_maps=[],
+            prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+            batch_size=1000,
+        )
+
+    def test_bulkload_compat(self):
+        loader = self.loader
+        loader.index_statements = True
+        loader.bulkload(TEST_INPUT_OWL)
+        con = loader.connection
+        stmts = con.execute(
+            "select * from statements WHERE subject=$subject", {"subject": NUCLEUS}
+        ).fetchall()
+        self.assertIn((NUCLEUS, NUCLEUS, "rdf:type", "owl:Class", None, None, None), stmts)
+        stmts = con.execute(
+            SUB_SVF_QUERY.replace(":subject", "$subject"), {"subject": NUCLEAR_ENVELOPE}
+        ).fetchall()
+        self.assertCountEqual([(NUCLEUS,), (ENDOMEMBRANE_SYSTEM,)], stmts)
+        self.assertGreater(con.execute("select count(*) from prefix").fetchone()[0], 1)
+
+    def test_bulkload(self):
+        loader = self.loader
+        loader.rdftab_compatibility = False
+        loader.bulkload(TEST_INPUT_OWL)
+        stmts = loader.connection.execute(
+            "select * from statement WHERE subject=$subject", {"subject": NUCLEUS}
+        ).fetchall()
+        self.assertIn((None, NUCLEUS, "rdf:type", "owl:Class", None, None, None, None), stmts)
+
+    def test_graph_names(self):
+        loader = self.loader
+        loader.rdftab_compatibility = False
+        loader.include_graph_name = True
+        loader.include_statement_id = True
+        loader.bulkload(TEST_INPUT_OWL)
+        rows = loader.connection.execute(
+            "select graph, count(*), count(distinct id) from statement group by graph"
+        ).fetchall()
+        [(graph, n, num_ids)] = rows
+        self.assertEqual(Path(TEST_INPUT_OWL).resolve().as_uri(), graph)
+        self.assertEqual(n, num_ids)
+
+    def test_cli_append(self):
+        import duckdb
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = str(Path(tmpdir) / "appended.duckdb")
+            counts = []
+            for append in [[], ["--append"], ["--append"]]:
+                result = CliRunner().invoke(
+                    main, ["load-duckdb", "-o", db_path, *append, str(TEST_INPUT_OWL)]
+                )
+                self.assertEqual(0, result.exit_code, result.output)
+                with duckdb.connect(db_path) as con:
+                    counts.append(con.execute("select count(*) from statements").fetchone()[0])
+            self.assertEqual([counts[0], 2 * counts[0], 3 * counts[0]], counts)
@@ -0,0 +1,162 @@
+"""Tests for compressed and stdin inputs, and format inference."""
+
+import bz2
+import gzip
+import io
+import shutil
+import sys
+import tempfile
+import unittest
+from importlib.util import find_spec
+from pathlib import Path
+from unittest.mock import patch
+
+from pyoxigraph import parse, serialize
+
+from rdf_sql_bulkloader import SqliteBulkloader
+from rdf_sql_bulkloader.loaders.inputs import (
+    STDIN,
+    compression_format,
+    guess_mime_type,
+    is_plain_file,
+    open_input,
+    sniff_mime_type,
+)
+from tests import INPUT_DIR, TEST_INPUT_OWL
+from tests.test_sqlite3_bulkloader import NT_MIME_TYPE, OWL_PREFIX_MAP
+
+HAS_ZSTANDARD = find_spec("zstandard") is not None
+TEST_INPUT_TTL = INPUT_DIR / "go-nucleus.owl.ttl"
+
+
+class TestInputs(unittest.TestCase):
+    """Test opening and loading compressed inputs."""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp()
+        self.data = Path(TEST_INPUT_OWL).read_bytes()
+        self.paths = {
+            "gzip": self._write("go-nucleus.owl.gz", gzip.compress(self.data)),
+            "bz2": self._write("go-nucleus.owl.bz2", bz2.compress(self.data)),
+            # no extension; detected from the content
+            "sniffed": self._write("go-nucleus-gz.owl", gzip.compress(self.data)),
+        }
+        if HAS_ZSTANDARD:
+            import zstandard
+
+            self.paths["zstd"] = self._write(
+                "go-nucleus.owl.zst", zstandard.ZstdCompressor().compress(self.data)
+            )
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name: str, data: bytes) -> str:
+        path = Path(self.tmpdir) / name
+        path.write_bytes(data)
+        return str(path)
+
+    def _count_rows(self, path) -> int:
+        loader = SqliteBulkloader(
+            database_path=":memory:", named_prefix_maps=[], prefix_map=OWL_PREFIX_MAP
+        )
+        loader.bulkload(path)
+        return loader.connection.execute("select count(*) from statements").fetchone()[0]
+
+    def test_compression_format(self):
+        self.assertIsNone(compression_format(TEST_INPUT_OWL))
+        self.assertTrue(is_plain_file(TEST_INPUT_OWL))
+        self.assertFalse(is_plain_file(STDIN))
+        for compression, path in self.paths.items():
+            expected = "gzip" if compression == "sniffed" else compression
+            self.assertEqual(expected, compression_format(path))
+            with open_input(path) as stream:
+                self.assertEqual(self.data, stream.read())
+
+    def test_bulkload_compressed(self):
+        num_rows = self._count_rows(TEST_INPUT_OWL)
+        for path in self.paths.values():
+            self.assertEqual(num_rows, self._count_rows(path))
+
+    def test_bulkload_stdin(self):
+        num_rows = self._count_rows(TEST_INPUT_OWL)
+        for data in [self.data, gzip.compress(self.data)]:
+            with patch.object(sys, "stdin", io.TextIOWrapper(io.BytesIO(data))):
+                self.assertEqual(num_rows, self._count_rows(STDIN))
+
+    def test_append_after_stdin(self):
+        db_path = str(Path(self.tmpdir) / "stdin.db")
+        go_path = shutil.copy(TEST_INPUT_OWL, self.tmpdir)
+
+        def load(paths, create_tables: bool):
+            loader = SqliteBulkloader(
+                database_path=db_path,
+                named_prefix_maps=[],
+                prefix_map=OWL_PREFIX_MAP,
+                incremental=True,
+            )
+            with patch.object(sys, "stdin", io.TextIOWrapper(io.BytesIO(self.data))):
+                loader.bulkload(paths, create_tables=create_tables)
+            return loader.connection.execute("select count(*) from statements").fetchone()
+
+        (num_rows,) = load([go_path, STDIN], True)
+        # the rows read from stdin are kept, and the unchanged file is skipped
+        self.assertEqual((num_rows,), load([go_path], False))
+        self.assertEqual((num_rows + num_rows // 2,), load([STDIN], False))
+
+    def test_format_inference(self):
+        nt_path = Path(self.tmpdir) / "go-nucleus.nt"
+        serialize(parse(str(TEST_INPUT_OWL), "application/rdf+xml"), str(nt_path), NT_MIME_TYPE)
+        # no extension; detected from the content
+        sniffed_path = Path(self.tmpdir) / "go-nucleus-nt.txt"
+        shutil.copy(nt_path, sniffed_path)
+        self.assertEqual("text/turtle", guess_mime_type(TEST_INPUT_TTL))
+        self.assertEqual(NT_MIME_TYPE, guess_mime_type(nt_path))
+        self.assertEqual(NT_MIME_TYPE, guess_mime_type(sniffed_path))
+        self.assertEqual("application/rdf+xml", guess_mime_type(self.paths["sniffed"]))
+        num_rows = self._count_rows(TEST_INPUT_OWL)
+        self.assertEqual(num_rows, self._count_rows(str(nt_path)))
+        self.assertEqual(num_rows, self._count_rows(str(sniffed_path)))
+        ttl_rows = self._count_rows(TEST_INPUT_TTL)
+        self.assertEqual(
+            ttl_rows + 2 * num_rows, self._count_rows([TEST_INPUT_TTL, nt_path, self.paths["gzip"]])
+        )
+
+    def test_sniff_turtle_without_prefixes(self):
+        # a first statement with predicate lists looks like neither N-Triples nor directives
+        ttl = (
+            b"<http://x.org/a> a <http://x.org/C> ;\n"
+            b'    <http://x.org/label> "a" .\n'
+            b"<urn:x:b> a <http://x.org/C> .\n"
+        )
+        ttl_path = Path(self.tmpdir) / "no-prefixes.txt"
+        ttl_path.write_bytes(ttl)
+        self.assertEqual("text/turtle", guess_mime_type(ttl_path))
+        self.assertEqual(3, self._count_rows(str(ttl_path)))
+        self.assertEqual("text/turtle", sniff_mime_type(b"<urn:x:b> a <http://x.org/C> .\n"))
+        for xml in [
+            b'<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">\n',
+            b"<!DOCTYPE rdf:RDF [\n]>\n",
+            b'<Ontology xmlns="http://www.w3.org/2002/07/owl#"\n',
+        ]:
+            self.assertEqual("application/rdf+xml", sniff_mime_type(xml))
+
+    def test_line_based_fast_path(self):
+        nt_path = Path(self.tmpdir) / "go-nucleus.nt"
+        serialize(parse(str(TEST_INPUT_OWL), "application/rdf+xml"), str(nt_path), NT_MIME_TYPE)
+
+        def named_rows(fast: bool):
+            loader = SqliteBulkloader(
+                database_path=":memory:", named_prefix_maps=[], prefix_map=OWL_PREFIX_MAP
+            )
+            if fast:
+                rows = list(loader.statements(nt_path))
+            else:
+                rows = list(loader._statements_single_pass(nt_path, NT_MIME_TYPE))
+            self.assertIn("GO", loader.prefix_map)
+            return [row for row in rows if not any(v and v.startswith("_:") for v in row)]
+
+        fast_rows = named_rows(True)
+        spooled_rows = named_rows(False)
+        self.assertGreater(len(fast_rows), 1000)
+        self.assertCountEqual(spooled_rows, fast_rows)
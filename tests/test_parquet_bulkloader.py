@@ -0,0 +1,84 @@
+"""Parquet export tests."""
+
+import shutil
+import unittest
+from importlib.util import find_spec
+from pathlib import Path
+
+from tests import NUCLEUS, TEST_INPUT_OWL, TEST_LANG_INPUT_OWL, TEST_PREFIX_MAP, output_path
+from tests.test_sqlite3_bulkloader import OWL_PREFIX_MAP
+
+HAS_PYARROW = find_spec("pyarrow") is not None
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestParquetBulkLoader(unittest.TestCase):
+    """Test parquet export."""
+
+    def _load(self, name: str, paths, **kwargs):
+        import pyarrow.dataset as ds
+
+        from rdf_sql_bulkloader.loaders.parquet_bulkloader import ParquetBulkloader
+
+        out_dir = Path(output_path(name))
+        if out_dir.exists():
+            shutil.rmtree(out_dir)
+        loader = ParquetBulkloader(
+            database_path=str(out_dir),
+            named_prefix_maps=[],
+            prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+            **{"batch_size": 1000, **kwargs},
+        )
+        loader.bulkload(paths)
+        partitioning = "hive" if loader.partition_by else None
+        dataset = ds.dataset(str(out_dir / loader.statement_table()), partitioning=partitioning)
+        return out_dir, dataset.to_table()
+
+    def test_export(self):
+        out_dir, table = self._load("parquet-export", TEST_INPUT_OWL)
+        self.assertEqual(
+            ["stanza", "subject", "predicate", "object", "value", "datatype", "language"],
+            table.column_names,
+        )
+        rows = table.to_pylist()
+        self.assertIn(
+            {
+                "stanza": NUCLEUS,
+                "subject": NUCLEUS,
+                "predicate": "rdf:type",
+                "object": "owl:Class",
+                "value": None,
+                "datatype": None,
+                "language": None,
+            },
+            rows,
+        )
+        self.assertTrue((out_dir / "prefix.parquet").exists())
+
+    def test_partition_by_predicate(self):
+        out_dir, table = self._load("parquet-predicate", TEST_INPUT_OWL, partition_by="predicate")
+        self.assertGreater(len(list((out_dir / "statements").iterdir())), 10)
+        self.assertIn("owl:someValuesFrom", table.column("predicate").to_pylist())
+
+    def test_partition_by_many_predicates(self):
+        nt_path = Path(output_path("many-predicates.nt"))
+        nt_path.parent.mkdir(exist_ok=True, parents=True)
+        with open(nt_path, "w") as stream:
+            for i in range(1100):
+                stream.write(
+                    f"<http://example.org/s> <http://example.org/p{i}> <http://example.org/o> .\n"
+                )
+        out_dir, table = self._load(
+            "parquet-many-predicates", str(nt_path), partition_by="predicate", batch_size=5000
+        )
+        self.assertEqual(1100, len(list((out_dir / "statements").iterdir())))
+        self.assertEqual(1100, table.num_rows)
+
+    def test_partition_by_source(self):
+        _, table = self._load(
+            "parquet-source", [TEST_INPUT_OWL, TEST_LANG_INPUT_OWL], partition_by="source"
+        )
+        self.assertCountEqual(
+            [str(TEST_INPUT_OWL), str(TEST_LANG_INPUT_OWL)],
+            set(table.column("source").to_pylist()),
+        )
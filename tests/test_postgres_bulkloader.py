@@ -0,0 +1,112 @@
+"""PostgreSQL loader tests."""
+
+import shutil
+import subprocess
+import tempfile
+import unittest
+from importlib.util import find_spec
+from pathlib import Path
+
+from tests import NUCLEAR_ENVELOPE, NUCLEUS, TEST_INPUT_OWL, TEST_PREFIX_MAP
+from tests.test_sqlite3_bulkloader import OWL_PREFIX_MAP, SUB_SVF_QUERY
+
+HAS_PSYCOPG = find_spec("psycopg") is not None
+HAS_POSTGRES = shutil.which("initdb") is not None and shutil.which("pg_ctl") is not None
+
+
+@unittest.skipUnless(HAS_PSYCOPG, "psycopg is not installed")
+class TestCopyEncoding(unittest.TestCase):
+    """Test the COPY text encoder."""
+
+    def test_copy_text_blocks(self):
+        from rdf_sql_bulkloader.loaders.postgres_bulkloader import copy_text_blocks
+
+        rows = [
+            ("X:1", "rdfs:label", None, "a\tb\nc\\d\r", "xsd:string", None),
+            ("X:2", "rdf:type", "owl:Class", None, None, None),
+        ]
+        blocks = list(copy_text_blocks(rows, rdftab_compatibility=False))
+        self.assertEqual(
+            [
+                "X:1\trdfs:label\t\\N\ta\\tb\\nc\\\\d\\r\txsd:string\t\\N\n"
+                "X:2\trdf:type\towl:Class\t\\N\t\\N\t\\N\n"
+            ],
+            blocks,
+        )
+        blocks = list(copy_text_blocks(rows, buffer_size=1))
+        self.assertEqual(2, len(blocks))
+        self.assertTrue(blocks[1].startswith("X:2\tX:2\t"))
+
+
+@unittest.skipUnless(HAS_PSYCOPG and HAS_POSTGRES, "psycopg or a local PostgreSQL is missing")
+class TestPostgresBulkLoader(unittest.TestCase):
+    """Test loading into a throwaway PostgreSQL cluster."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.tmpdir = tempfile.mkdtemp()
+        data_dir = Path(cls.tmpdir) / "data"
+        subprocess.run(
+            ["initdb", "-D", str(data_dir), "-U", "postgres", "--auth=trust"],
+            check=True,
+            capture_output=True,
+        )
+        # listen only on a unix socket in the temp dir, to avoid port clashes
+        options = f"-c listen_addresses='' -c unix_socket_directories='{cls.tmpdir}'"
+        subprocess.run(
+            ["pg_ctl", "-D", str(data_dir), "-o", options, "-w", "start"],
+            check=True,
+            capture_output=True,
+        )
+        cls.data_dir = data_dir
+        cls.conninfo = f"host={cls.tmpdir} user=postgres dbname=postgres"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        subprocess.run(
+            ["pg_ctl", "-D", str(cls.data_dir), "-m", "immediate", "stop"], capture_output=True
+        )
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def setUp(self) -> None:
+        from rdf_sql_bulkloader.loaders.postgres_bulkloader import PostgresBulkloader
+
+        self.loader = PostgresBulkloader(
+            database_path=self.conninfo,
+            named_prefix_maps=[],
+            prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+            batch_size=1000,
+        )
+        self.loader.drop_tables()
+
+    def _query(self, sql, params=None):
+        import psycopg
+
+        with psycopg.connect(self.conninfo) as con:
+            return con.execute(sql, params).fetchall()
+
+    def test_bulkload_compat(self):
+        loader = self.loader
+        loader.index_statements = True
+        loader.bulkload(TEST_INPUT_OWL)
+        stmts = self._query("select * from statements WHERE subject=%s", [NUCLEUS])
+        self.assertIn((NUCLEUS, NUCLEUS, "rdf:type", "owl:Class", None, None, None), stmts)
+        stmts = self._query(
+            SUB_SVF_QUERY.replace(":subject", "%(subject)s"), {"subject": NUCLEAR_ENVELOPE}
+        )
+        self.assertIn((NUCLEUS,), stmts)
+
+    def test_staging_table(self):
+        loader = self.loader
+        loader.use_staging_table = True
+        loader.bulkload(TEST_INPUT_OWL)
+        [(n,)] = self._query("select count(*) from statements")
+        self.assertGreater(n, 0)
+        [(persistence,)] = self._query(
+            "select relpersistence from pg_class where relname='statements'"
+        )
+        self.assertEqual("p", persistence)
+        # appending inserts the staged rows into the existing table
+        loader.bulkload(TEST_INPUT_OWL, create_tables=False)
+        self.assertEqual([(2 * n,)], self._query("select count(*) from statements"))
+        self.assertEqual([], self._query("select * from pg_class where relname like '%staging'"))
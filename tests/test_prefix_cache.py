@@ -0,0 +1,81 @@
+"""Tests for the on-disk cache of named prefix maps."""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from prefixmaps.io.parser import load_multi_context
+from pyoxigraph import NamedNode
+
+from rdf_sql_bulkloader import SqliteBulkloader
+from rdf_sql_bulkloader.prefix_cache import CACHE_DIR_ENV, cache_path, load_named_prefix_maps
+from rdf_sql_bulkloader.prefix_index import PrefixIndex
+from tests import TEST_PREFIX_MAP
+
+GO_NUCLEUS_IRI = TEST_PREFIX_MAP["GO"] + "0005634"
+
+
+class TestPrefixCache(unittest.TestCase):
+    """Test caching of resolved prefix maps."""
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {CACHE_DIR_ENV: self.tmpdir})
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def test_cache(self):
+        names = ["obo", "bioregistry.upper"]
+        expected = load_multi_context(names).as_dict()
+        path = cache_path(names)
+        self.assertFalse(path.exists())
+        prefix_map, index = load_named_prefix_maps(names)
+        self.assertTrue(path.exists())
+        self.assertEqual(expected, prefix_map)
+        self.assertEqual(list(expected), list(prefix_map))
+        self.assertEqual(PrefixIndex.from_prefix_map(expected), index)
+        self.assertNotEqual(path, cache_path(["obo"]))
+        # a warm cache does not resolve the prefix maps again
+        with patch("prefixmaps.io.parser.load_multi_context", side_effect=AssertionError):
+            self.assertEqual((prefix_map, index), load_named_prefix_maps(names))
+        # corrupt cache files are ignored, and rewritten
+        path.write_text("{")
+        self.assertEqual((prefix_map, index), load_named_prefix_maps(names))
+        self.assertEqual((prefix_map, index), load_named_prefix_maps(names, use_cache=False))
+
+    def test_loader(self):
+        loader = SqliteBulkloader(database_path=":memory:", named_prefix_maps=["obo"])
+        self.assertIsNone(loader.converter)
+        self.assertEqual("GO:0005634", loader.contract_uri(NamedNode(GO_NUCLEUS_IRI)))
+        self.assertTrue(cache_path(["obo"]).exists())
+        cached = SqliteBulkloader(database_path=":memory:", named_prefix_maps=["obo"])
+        self.assertEqual(loader.prefix_map, cached.prefix_map)
+        self.assertEqual(loader.prefix_index, cached.prefix_index)
+        # explicit prefixes are added to the cached prefix map
+        extended = SqliteBulkloader(
+            database_path=":memory:",
+            named_prefix_maps=["obo"],
+            prefix_map={"ex": "http://example.org/"},
+        )
+        self.assertEqual("ex:a", extended.contract_uri(NamedNode("http://example.org/a")))
+        self.assertEqual("GO:0005634", extended.contract_uri(NamedNode(GO_NUCLEUS_IRI)))
+        self.assertIsNone(extended.converter)
+        self.assertEqual("GO:0005634", extended.get_converter().compress(GO_NUCLEUS_IRI))
+
+    def test_lazy_cli_imports(self):
+        # a fresh interpreter, as loaders are already imported by the tests
+        code = (
+            "import sys, rdf_sql_bulkloader.cli; "
+            "print(sorted(m for m in sys.modules if m.startswith('rdf_sql_bulkloader.loaders.')))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual("[]", result.stdout.strip())
@@ -0,0 +1,60 @@
+"""Tests for longest-prefix-match CURIE contraction."""
+
+import unittest
+
+from curies import Converter
+from prefixmaps.io.parser import load_multi_context
+from pyoxigraph import NamedNode, parse
+
+from rdf_sql_bulkloader.prefix_index import PrefixIndex
+from tests import TEST_INPUT_OWL
+
+OVERLAPPING_PREFIX_MAP = {
+    "OBO": "http://purl.obolibrary.org/obo/",
+    "GO": "http://purl.obolibrary.org/obo/GO_",
+    "GOREL": "http://purl.obolibrary.org/obo/GOREL_",
+    "obo_go": "http://purl.obolibrary.org/obo/go#",
+    "oboInOwl": "http://www.geneontology.org/formats/oboInOwl#",
+    "ex": "http://example.org/",
+    "exa": "http://example.org/a/",
+    "exab": "http://example.org/a/b/",
+}
+
+
+def _iris():
+    iris = set()
+    for triple in parse(str(TEST_INPUT_OWL), "application/rdf+xml"):
+        for node in triple:
+            if isinstance(node, NamedNode):
+                iris.add(node.value)
+    return sorted(iris) + [
+        "http://example.org/a/b/c",
+        "http://example.org/a/c",
+        "http://example.org/ab",
+        "http://example.org/",
+        "http://example.org",
+        "",
+    ]
+
+
+class TestPrefixIndex(unittest.TestCase):
+    """Test PrefixIndex against curies.Converter."""
+
+    def test_same_as_converter(self):
+        iris = _iris()
+        obo_prefix_map = load_multi_context(["obo"]).as_dict()
+        for prefix_map in [OVERLAPPING_PREFIX_MAP, {**obo_prefix_map, **OVERLAPPING_PREFIX_MAP}]:
+            converter = Converter.from_prefix_map(prefix_map)
+            index = PrefixIndex.from_prefix_map(prefix_map)
+            expected = [converter.compress(iri) for iri in iris]
+            self.assertEqual(expected, [index.compress(iri) for iri in iris])
+            self.assertEqual(
+                [curie or iri for curie, iri in zip(expected, iris)], index.compress_all(iris)
+            )
+        self.assertEqual("GO:0005634", index.compress("http://purl.obolibrary.org/obo/GO_0005634"))
+        self.assertEqual("exab:c", index.compress("http://example.org/a/b/c"))
+        self.assertIsNone(index.compress("urn:x"))
+
+    def test_shared_namespace(self):
+        index = PrefixIndex.from_prefix_map({"A": "http://x/", "B": "http://x/"})
+        self.assertEqual("A:1", index.compress("http://x/1"))
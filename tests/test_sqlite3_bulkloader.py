@@ -1,20 +1,39 @@
 """Demo version test."""
 
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
 import unittest
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
 
-from pyoxigraph import NamedNode
+from pyoxigraph import NamedNode, Quad, parse, serialize
 
 from rdf_sql_bulkloader import SqliteBulkloader
+from rdf_sql_bulkloader.loaders.bulkloader import statement_id
+from rdf_sql_bulkloader.loaders.sqlite3_bulkloader import FAST_PRAGMAS, OBO_IN_OWL
+from rdf_sql_bulkloader.loaders.streaming import CONTRACTION_CACHE_ENTRY_BYTES, budget_bytes
 from tests import (
+    CELLULAR_COMPONENT,
     ENDOMEMBRANE_SYSTEM,
     FAKE_GO_PREFIX,
+    IMBO,
     NUCLEAR_ENVELOPE,
     NUCLEUS,
+    TEST_BASE,
     TEST_INPUT_OWL,
     TEST_LANG_INPUT_OWL,
     TEST_LANG_INPUT_TTL,
+    TEST_PREFIX_MAP,
+    output_path,
 )
 
+NT_MIME_TYPE = "application/n-triples"
+NQ_MIME_TYPE = "application/n-quads"
+
 SUB_SVF_QUERY = """
         select svf.object from 
         statements AS subc,
@@ -25,6 +44,12 @@ SUB_SVF_QUERY = """
         svf.predicate='owl:someValuesFrom'
         """
 
+OWL_PREFIX_MAP = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+}
+
 DEFN = (
     "A membrane-bounded organelle of eukaryotic cells in which chromosomes "
     + "are housed and replicated. In most cells, the nucleus contains all of the cell's "
@@ -95,6 +120,38 @@ LANG_CASES = [
 ]
 
 
+def write_restrictions(directory: str, extension: str, graph: str = "") -> List[str]:
+    """
+    Write two files of 400 existential restrictions, with the same blank node labels.
+
+    ``ex:A{n}`` and ``ex:B{n}`` are subclasses of ``someValuesFrom ex:D0``
+    and ``ex:D1`` respectively.
+    """
+    paths = []
+    for i, name in enumerate(["A", "B"]):
+        path = Path(directory) / f"{name}.{extension}"
+        with open(path, "w") as stream:
+            for n in range(400):
+                stream.write(
+                    f"<http://example.org/{name}{n}> <{OWL_PREFIX_MAP['rdfs']}subClassOf> "
+                    f"_:b{n}{graph} .\n"
+                    f"_:b{n} <{OWL_PREFIX_MAP['owl']}someValuesFrom> "
+                    f"<http://example.org/D{i}>{graph} .\n"
+                )
+        paths.append(str(path))
+    return paths
+
+
+@dataclass
+class ExitingBulkloader(SqliteBulkloader):
+    """Exits abruptly when parsing the lang example, as a worker killed for lack of memory."""
+
+    def task_statements(self, path, mime_type=None, byte_range=None, **kwargs):
+        if Path(path).name == TEST_LANG_INPUT_OWL.name:
+            os._exit(9)
+        return super().task_statements(path, mime_type, byte_range, **kwargs)
+
+
 class TestSqlite3BulkLoader(unittest.TestCase):
     """Test sqlite3."""
 
@@ -198,3 +255,764 @@ class TestSqlite3BulkLoader(unittest.TestCase):
         cur.execute("select * from statement")
         stmts = list(cur.fetchall())
         self.assertCountEqual(LANG_CASES, stmts)
+
+    def test_single_pass_shacl(self):
+        """Tests that single-pass SHACL prefix discovery matches the two-pass mode."""
+
+        def named_rows(single_pass: bool):
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map={"owl": "http://www.w3.org/2002/07/owl#"},
+                single_pass=single_pass,
+            )
+            rows = [
+                row
+                for row in loader.statements(TEST_INPUT_OWL)
+                if not any(isinstance(v, str) and v.startswith("_:") for v in row)
+            ]
+            self.assertIn("GO", loader.prefix_map)
+            return rows
+
+        rows = named_rows(True)
+        rdf_type = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+        self.assertIn((NUCLEUS, rdf_type, "owl:Class", None, None, None), rows)
+        self.assertCountEqual(named_rows(False), rows)
+
+    def test_parallel_bulkload(self):
+        """Tests loading multiple files using a pool of worker processes."""
+
+        def load(workers: int):
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+            )
+            loader.workers = workers
+            loader.bulkload([str(TEST_INPUT_OWL), str(TEST_LANG_INPUT_OWL)])
+            cur = loader.connection.cursor()
+            cur.execute(SUB_SVF_QUERY, {"subject": NUCLEAR_ENVELOPE})
+            self.assertCountEqual([(NUCLEUS,), (ENDOMEMBRANE_SYSTEM,)], cur.fetchall())
+            cur.execute(
+                "select subject, predicate, object, value from statements "
+                "where substr(subject, 1, 2) != '_:' "
+                "and (object is null or substr(object, 1, 2) != '_:')"
+            )
+            return cur.fetchall()
+
+        self.assertCountEqual(load(1), load(2))
+
+    def test_parallel_shacl_prefixes(self):
+        """Tests that prefixes declared in one file contract the files after it, as serially."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            uses_path = Path(tmpdir) / "uses.ttl"
+            uses_path.write_text(
+                "<http://example.org/ex/1> <http://example.org/ex/p> <http://example.org/ex/2> .\n"
+            )
+            declares_path = Path(tmpdir) / "declares.nt"
+            declares_path.write_text(
+                '_:d <http://www.w3.org/ns/shacl#prefix> "EX" .\n'
+                '_:d <http://www.w3.org/ns/shacl#namespace> "http://example.org/ex/" .\n'
+                "<http://example.org/ex/3> <http://example.org/ex/p> <http://example.org/ex/4> .\n"
+            )
+
+            def load(paths: List[Path], workers: int):
+                loader = SqliteBulkloader(
+                    database_path=":memory:",
+                    named_prefix_maps=[],
+                    # SHACL prefixes are added to the map
+                    prefix_map=dict(OWL_PREFIX_MAP),
+                    workers=workers,
+                )
+                loader.bulkload([str(path) for path in paths])
+                self.assertIn("EX", loader.prefix_map)
+                cur = loader.connection.execute(
+                    "select subject, predicate, object from statements where object is not null"
+                )
+                return sorted(cur.fetchall())
+
+            for paths in [[uses_path, declares_path], [declares_path, uses_path]]:
+                rows = load(paths, 1)
+                self.assertEqual(rows, load(paths, 2))
+                self.assertIn(("EX:3", "EX:p", "EX:4"), rows)
+            # a declaration applies to the files after it, not to those before
+            self.assertIn(("EX:1", "EX:p", "EX:2"), load([declares_path, uses_path], 2))
+            self.assertIn(
+                ("http://example.org/ex/1", "http://example.org/ex/p", "http://example.org/ex/2"),
+                load([uses_path, declares_path], 2),
+            )
+
+    def test_parallel_worker_exit(self):
+        """Tests that a load fails, rather than waits forever, if a worker process dies."""
+        loader = ExitingBulkloader(
+            database_path=":memory:", named_prefix_maps=[], prefix_map=OWL_PREFIX_MAP, workers=2
+        )
+        with self.assertRaisesRegex(RuntimeError, "exited with code 9"):
+            loader.bulkload([str(TEST_INPUT_OWL), str(TEST_LANG_INPUT_OWL)])
+
+    def test_parallel_ntriples(self):
+        """Tests loading byte ranges of an N-Triples file in separate worker processes."""
+        nt_path = Path(output_path(f"{TEST_BASE}.nt"))
+        nt_path.parent.mkdir(exist_ok=True, parents=True)
+        serialize(
+            parse(str(TEST_INPUT_OWL), "application/rdf+xml"), str(nt_path), "application/n-triples"
+        )
+
+        def load(workers: int):
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map=OWL_PREFIX_MAP,
+                chunk_bytes=20000,
+            )
+            loader.rdftab_compatibility = False
+            loader.workers = workers
+            if workers > 1:
+                self.assertGreater(len(loader.parallel_tasks([nt_path], NT_MIME_TYPE)), 10)
+            loader.bulkload(str(nt_path), NT_MIME_TYPE)
+            cur = loader.connection.cursor()
+            cur.execute(
+                SUB_SVF_QUERY.replace("statements", "statement"), {"subject": NUCLEAR_ENVELOPE}
+            )
+            self.assertCountEqual([(NUCLEUS,), (ENDOMEMBRANE_SYSTEM,)], cur.fetchall())
+            cur.execute("select count(*), count(distinct object) from statement")
+            return cur.fetchall()
+
+        self.assertEqual(load(1), load(2))
+
+    def test_parallel_blank_nodes(self):
+        """Tests that blank nodes of split files keep apart, when files reuse labels."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = write_restrictions(tmpdir, "nq", " _:g")
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map={**OWL_PREFIX_MAP, "ex": "http://example.org/"},
+                include_graph_name=True,
+                chunk_bytes=5000,
+                workers=2,
+            )
+            loader.rdftab_compatibility = False
+            self.assertGreater(len(loader.parallel_tasks(paths, NQ_MIME_TYPE)), 10)
+            loader.bulkload(paths, NQ_MIME_TYPE)
+            cur = loader.connection.cursor()
+            cur.execute(
+                "select count(distinct subject) from statement where predicate='owl:someValuesFrom'"
+            )
+            self.assertEqual((800,), cur.fetchone())
+            cur.execute(SUB_SVF_QUERY.replace("statements", "statement"), {"subject": "ex:A0"})
+            self.assertEqual([("ex:D0",)], cur.fetchall())
+            # one graph per file, across all of its ranges
+            cur.execute("select count(distinct graph) from statement")
+            self.assertEqual((2,), cur.fetchone())
+
+    def test_graph_names(self):
+        """Tests graph names and statement ids, from N-Quads and from the ontology IRI."""
+        graph = "http://example.org/graph"
+        nq_path = Path(output_path(f"{TEST_BASE}.nq"))
+        nq_path.parent.mkdir(exist_ok=True, parents=True)
+        quads = [
+            Quad(t.subject, t.predicate, t.object, NamedNode(graph))
+            for t in parse(str(TEST_INPUT_OWL), "application/rdf+xml")
+        ]
+        quads += [Quad(*t) for t in parse(str(TEST_LANG_INPUT_OWL), "application/rdf+xml")]
+        serialize(quads, str(nq_path), NQ_MIME_TYPE)
+        db_path = Path(output_path("graphs.db"))
+        if db_path.exists():
+            db_path.unlink()
+        loader = SqliteBulkloader(
+            database_path=str(db_path),
+            named_prefix_maps=[],
+            prefix_map=OWL_PREFIX_MAP,
+            include_graph_name=True,
+            graph_name_from_ontology=True,
+            include_statement_id=True,
+            index_statements=True,
+        )
+        with self.assertRaises(ValueError):
+            loader.bulkload(TEST_INPUT_OWL)
+        loader.rdftab_compatibility = False
+        loader.bulkload(TEST_INPUT_OWL)
+        loader.bulkload(str(nq_path), NQ_MIME_TYPE, create_tables=False)
+        cur = loader.connection.cursor()
+        cur.execute("select graph, count(*), count(distinct id) from statement group by graph")
+        counts = {g: (n, num_ids) for g, n, num_ids in cur.fetchall()}
+        go_graph = "http://purl.obolibrary.org/obo/go.owl"
+        # triples in the default graph of the N-Quads file take its ontology IRI
+        self.assertCountEqual([go_graph, graph], counts.keys())
+        self.assertEqual(counts[go_graph][0], counts[graph][0] + len(LANG_CASES))
+        for n, num_ids in counts.values():
+            self.assertEqual(n, num_ids)
+        cur.execute("select * from statement where subject=? and predicate='rdf:type'", (NUCLEUS,))
+        for row in cur.fetchall():
+            self.assertEqual(statement_id(row[1:]), row[0])
+        cur.execute("select name from sqlite_master where type='index' and tbl_name='statement'")
+        self.assertIn(("statement_graph",), cur.fetchall())
+        loader = SqliteBulkloader(
+            database_path=":memory:", named_prefix_maps=[], prefix_map=OWL_PREFIX_MAP
+        )
+        self.assertEqual(
+            Path(TEST_INPUT_OWL).resolve().as_uri(),
+            loader.default_graph_name(TEST_INPUT_OWL, "application/rdf+xml"),
+        )
+
+    def test_statement_ids_reload(self):
+        """Tests that statement ids, including those of blank node statements, survive a reload."""
+        nt_path = Path(output_path(f"{TEST_BASE}.nt"))
+        nt_path.parent.mkdir(exist_ok=True, parents=True)
+        serialize(parse(str(TEST_INPUT_OWL), "application/rdf+xml"), str(nt_path), NT_MIME_TYPE)
+
+        def load_ids(workers: int) -> List[str]:
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map=OWL_PREFIX_MAP,
+                rdftab_compatibility=False,
+                include_statement_id=True,
+                workers=workers,
+                chunk_bytes=20000,
+            )
+            loader.bulkload([str(TEST_INPUT_OWL), str(nt_path)])
+            cur = loader.connection.execute("select id from statement order by id")
+            return [row[0] for row in cur.fetchall()]
+
+        for workers in [1, 2]:
+            self.assertEqual(load_ids(workers), load_ids(workers))
+
+    def test_fast_bulkload(self):
+        """Tests loading with the fast ingest profile."""
+        db_path = Path(output_path("fast.db"))
+        db_path.parent.mkdir(exist_ok=True, parents=True)
+        if db_path.exists():
+            db_path.unlink()
+        loader = SqliteBulkloader(
+            database_path=str(db_path), named_prefix_maps=[], prefix_map=OWL_PREFIX_MAP, fast=True
+        )
+        loader.bulkload(TEST_INPUT_OWL)
+        cur = loader.connection.cursor()
+        self.assertEqual([(FAST_PRAGMAS["page_size"],)], cur.execute("pragma page_size").fetchall())
+        self.assertEqual([("delete",)], cur.execute("pragma journal_mode").fetchall())
+        self.assertEqual([(2,)], cur.execute("pragma synchronous").fetchall())
+        cur.execute(SUB_SVF_QUERY, {"subject": NUCLEAR_ENVELOPE})
+        self.assertCountEqual([(NUCLEUS,), (ENDOMEMBRANE_SYSTEM,)], cur.fetchall())
+        # a failed load raises its own error, and safe pragmas are restored
+        db_path.unlink()
+        loader = SqliteBulkloader(
+            database_path=str(db_path), named_prefix_maps=[], prefix_map=OWL_PREFIX_MAP, fast=True
+        )
+
+        def failing_insert(rows):
+            raise RuntimeError("insert failed")
+
+        loader._insert = failing_insert
+        with self.assertRaisesRegex(RuntimeError, "insert failed"):
+            loader.bulkload(TEST_INPUT_OWL)
+        cur = loader.connection.cursor()
+        self.assertEqual([("delete",)], cur.execute("pragma journal_mode").fetchall())
+        self.assertEqual([(2,)], cur.execute("pragma synchronous").fetchall())
+
+    def test_incremental_append(self):
+        """Tests that appending only reloads files that have changed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            go_path = shutil.copy(TEST_INPUT_OWL, tmpdir)
+            lang_path = shutil.copy(TEST_LANG_INPUT_OWL, tmpdir)
+            db_path = str(Path(tmpdir) / "incremental.db")
+
+            def load(create_tables: bool):
+                loader = SqliteBulkloader(
+                    database_path=db_path,
+                    named_prefix_maps=[],
+                    prefix_map=OWL_PREFIX_MAP,
+                    incremental=True,
+                )
+                loader.bulkload([go_path, lang_path], create_tables=create_tables)
+                con = loader.connection
+                counts = dict(con.execute("select path, row_count from load_manifest"))
+                (num_rows,) = con.execute("select count(*) from statements").fetchone()
+                return counts, num_rows
+
+            counts, num_rows = load(True)
+            go_rows = counts[str(Path(go_path).resolve())]
+            self.assertEqual(sum(counts.values()), num_rows)
+            # unchanged, or only touched: nothing is reloaded
+            self.assertEqual((counts, num_rows), load(False))
+            os.utime(lang_path)
+            self.assertEqual((counts, num_rows), load(False))
+            # changed: the rows from the old contents are replaced
+            shutil.copy(TEST_INPUT_OWL, lang_path)
+            counts, num_rows = load(False)
+            self.assertEqual([go_rows, go_rows], list(counts.values()))
+            self.assertEqual(2 * go_rows, num_rows)
+
+    def test_incremental_append_untracked(self):
+        """Tests appending to a database loaded before the load manifest existed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = str(Path(tmpdir) / "old.db")
+            loader = SqliteBulkloader(
+                database_path=db_path, named_prefix_maps=[], prefix_map=OWL_PREFIX_MAP
+            )
+            loader.bulkload(TEST_INPUT_OWL)
+            con = loader.connection
+            # as loaded by an older version, with a gap in rowids
+            for table in ["load_manifest", "load_segment", "load_checkpoint"]:
+                con.execute(f"drop table {table}")
+            con.execute("delete from statements where rowid between 100 and 199")
+            con.commit()
+            (old_rows,) = con.execute("select count(*) from statements").fetchone()
+            lang_path = shutil.copy(TEST_LANG_INPUT_OWL, tmpdir)
+
+            def append():
+                loader = SqliteBulkloader(
+                    database_path=db_path,
+                    named_prefix_maps=[],
+                    prefix_map=OWL_PREFIX_MAP,
+                    incremental=True,
+                )
+                loader.bulkload([lang_path], create_tables=False)
+                return loader.connection.execute("select count(*) from statements").fetchone()
+
+            (num_rows,) = append()
+            self.assertLess(old_rows, num_rows)
+            # the appended file is tracked; the older rows are kept
+            self.assertEqual((num_rows,), append())
+            shutil.copy(TEST_INPUT_OWL, lang_path)
+            self.assertEqual((2 * old_rows + 100,), append())
+
+    def test_index_statements(self):
+        """Tests creation of indexes after loading."""
+        loader = SqliteBulkloader(
+            database_path=":memory:",
+            named_prefix_maps=[],
+            prefix_map=OWL_PREFIX_MAP,
+            index_statements=True,
+        )
+        loader.bulkload(TEST_INPUT_OWL)
+        cur = loader.connection.cursor()
+        cur.execute("select name from sqlite_master where type='index' and tbl_name='statements'")
+        self.assertCountEqual(
+            [
+                ("statements_subject",),
+                ("statements_predicate_object",),
+                ("statements_predicate_value",),
+                ("statements_stanza",),
+            ],
+            cur.fetchall(),
+        )
+        plan = cur.execute(f"explain query plan {SUB_SVF_QUERY}", {"subject": NUCLEAR_ENVELOPE})
+        self.assertNotIn("SCAN", " ".join(row[-1] for row in plan.fetchall()))
+        cur.execute(SUB_SVF_QUERY, {"subject": NUCLEAR_ENVELOPE})
+        self.assertCountEqual([(NUCLEUS,), (ENDOMEMBRANE_SYSTEM,)], cur.fetchall())
+        loader.rdftab_compatibility = False
+        loader.indexes = ["subject"]
+        self.assertEqual(
+            ["CREATE INDEX IF NOT EXISTS statement_subject ON statement(subject,predicate);"],
+            loader.index_ddl_statements(),
+        )
+
+    def test_intern_terms(self):
+        """Tests the dictionary-encoded layout, queried through the compatibility view."""
+        for rdftab_compatibility in [True, False]:
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+                intern_terms=True,
+                index_statements=True,
+            )
+            loader.rdftab_compatibility = rdftab_compatibility
+            loader.bulkload(TEST_INPUT_OWL)
+            cur = loader.connection.cursor()
+            table = "statements" if rdftab_compatibility else "statement"
+            cur.execute(SUB_SVF_QUERY.replace("statements", table), {"subject": NUCLEAR_ENVELOPE})
+            self.assertCountEqual([(NUCLEUS,), (ENDOMEMBRANE_SYSTEM,)], cur.fetchall())
+            cur.execute(f"select * from {table} where subject=:subject", {"subject": NUCLEUS})
+            stmts = cur.fetchall()
+            rdf_type = (NUCLEUS, "rdf:type", "owl:Class", None, None, None)
+            if rdftab_compatibility:
+                self.assertIn((NUCLEUS,) + rdf_type, stmts)
+            else:
+                self.assertIn((None,) + rdf_type + (None,), stmts)
+            cur.execute("select count(*), count(distinct value) from term")
+            num_terms, num_distinct_terms = cur.fetchone()
+            self.assertEqual(num_terms, num_distinct_terms)
+
+    def test_contraction_cache(self):
+        """Tests the bounded contraction cache."""
+        loader = SqliteBulkloader(
+            database_path=":memory:",
+            named_prefix_maps=[],
+            prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+            contraction_cache_size=100,
+        )
+
+        def named_rows():
+            return [
+                row
+                for row in loader.statements(TEST_INPUT_OWL)
+                if not any(isinstance(v, str) and v.startswith("_:") for v in row)
+            ]
+
+        rows = named_rows()
+        info = loader.contraction_cache_info()
+        self.assertEqual(100, info.currsize)
+        self.assertGreater(info.hits, info.misses)
+        loader.contraction_cache_size = 0
+        loader._set_converter()
+        self.assertCountEqual(rows, named_rows())
+        self.assertEqual(0, loader.contraction_cache_info().hits)
+
+    def test_resolve_stanzas(self):
+        """Tests that blank nodes are assigned the stanza of the named subject they hang off."""
+        for intern_terms in [False, True]:
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+                intern_terms=intern_terms,
+            )
+            loader.bulkload(TEST_INPUT_OWL)
+            cur = loader.connection.cursor()
+            cur.execute(
+                "select count(*) from statements where predicate='owl:someValuesFrom' "
+                "and substr(stanza, 1, 2) = '_:'"
+            )
+            self.assertEqual([(0,)], cur.fetchall())
+            cur.execute(
+                "select svf.object from statements AS svf "
+                "where svf.stanza=:stanza and svf.predicate='owl:someValuesFrom'",
+                {"stanza": NUCLEAR_ENVELOPE},
+            )
+            self.assertCountEqual([(NUCLEUS,), (ENDOMEMBRANE_SYSTEM,)], cur.fetchall())
+            cur.execute(
+                "select count(*) from statements AS x where x.predicate='owl:annotatedSource' "
+                "and x.stanza != x.object"
+            )
+            self.assertEqual([(0,)], cur.fetchall())
+
+    def test_compact_stanzas(self):
+        """Tests that the compact layout only stores stanzas that differ from subjects."""
+        named_rows_sql = (
+            "select * from statements where substr(subject, 1, 2) != '_:' "
+            "and (object is null or substr(object, 1, 2) != '_:')"
+        )
+        for intern_terms in [False, True]:
+
+            def load(compact_stanzas: bool) -> SqliteBulkloader:
+                loader = SqliteBulkloader(
+                    database_path=":memory:",
+                    named_prefix_maps=[],
+                    prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+                    intern_terms=intern_terms,
+                    index_statements=True,
+                    compact_stanzas=compact_stanzas,
+                )
+                loader.bulkload(TEST_INPUT_OWL)
+                return loader
+
+            expected = load(False).connection.execute(named_rows_sql).fetchall()
+            loader = load(True)
+            cur = loader.connection.cursor()
+            self.assertCountEqual(expected, cur.execute(named_rows_sql).fetchall())
+            cur.execute(
+                "select svf.object from statements AS svf "
+                "where svf.stanza=:stanza and svf.predicate='owl:someValuesFrom'",
+                {"stanza": NUCLEAR_ENVELOPE},
+            )
+            self.assertCountEqual([(NUCLEUS,), (ENDOMEMBRANE_SYSTEM,)], cur.fetchall())
+            table = loader.statement_table()
+            cur.execute(f"select count(*), count(stanza) from {table}")
+            num_rows, num_stanzas = cur.fetchone()
+            self.assertLess(0, num_stanzas)
+            self.assertLess(num_stanzas, num_rows / 2)
+            cur.execute(
+                f"select count(*) from {table} where stanza is not null and stanza = subject"
+            )
+            self.assertEqual((0,), cur.fetchone())
+            if not intern_terms:
+                plan = cur.execute(
+                    "explain query plan select * from statements where stanza = ?", (NUCLEUS,)
+                ).fetchall()
+                self.assertIn("compact_statements_stanza", str(plan))
+
+    def test_load_stats(self):
+        """Tests that per-stage timings and row counts are collected."""
+        loader = SqliteBulkloader(
+            database_path=":memory:",
+            named_prefix_maps=[],
+            prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+            index_statements=True,
+        )
+        loader.bulkload(TEST_INPUT_OWL)
+        num_rows = loader.connection.execute("select count(*) from statements").fetchone()[0]
+        stats = loader.stats.as_dict(loader.contraction_cache_info())
+        self.assertEqual(num_rows, stats["rows"])
+        self.assertEqual({str(TEST_INPUT_OWL): num_rows}, stats["rows_per_file"])
+        for stage in ["parse", "shacl_prepass", "contraction", "insert", "commit", "index"]:
+            self.assertIn(stage, stats["stages"])
+            self.assertGreaterEqual(stats["stages"][stage], 0)
+        self.assertLessEqual(stats["stages"]["contraction"], stats["stages"]["parse"])
+        self.assertLessEqual(
+            stats["stages"]["parse"] + stats["stages"]["insert"], stats["elapsed_seconds"]
+        )
+        self.assertGreater(stats["contraction_cache"]["hit_rate"], 0.5)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "stats.json"
+            loader.stats.write_json(str(path), loader.contraction_cache_info())
+            self.assertEqual(num_rows, json.loads(path.read_text())["rows"])
+
+    def test_full_text_search(self):
+        """Tests full-text indexes over literal values, tokenized by language."""
+        for intern_terms in [False, True]:
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+                intern_terms=intern_terms,
+                full_text_search=True,
+            )
+            loader.bulkload(TEST_INPUT_OWL)
+            cur = loader.connection.cursor()
+            # matches have the rowid of the statement table, which holds term ids if interned
+            fts = loader.fts_table("default")
+            if intern_terms:
+                sql = (
+                    f"select s.value, p.value from {fts} AS f "
+                    f"join {loader.statement_table()} AS x on x.rowid = f.rowid "
+                    "join term AS s on s.id = x.subject join term AS p on p.id = x.predicate "
+                    "where f.value match ?"
+                )
+            else:
+                sql = (
+                    f"select x.subject, x.predicate from {fts} AS f "
+                    "join statements AS x on x.rowid = f.rowid where f.value match ?"
+                )
+
+            def search(query: str):
+                return cur.execute(sql, (query,)).fetchall()
+
+            matches = search("nuclear envelope")
+            self.assertIn((NUCLEAR_ENVELOPE, "rdfs:label"), matches)
+            # xrefs such as Wikipedia:Nuclear_envelope are not indexed
+            self.assertEqual({"rdfs:label", "IAO:0000115"}, {p for _, p in matches})
+            self.assertIn(f"{OBO_IN_OWL}hasExactSynonym", {p for _, p in search("nucleus")})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "labels.ttl"
+            path.write_text(
+                TEST_LANG_INPUT_TTL.read_text()
+                + '<http://example.org/nucleus> dc:title "細胞核"@ja .\n'
+            )
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map={"dc": "http://purl.org/dc/elements/1.1/"},
+                full_text_search=True,
+                fts_predicates=["dc:title"],
+            )
+            loader.bulkload(str(path))
+            cur = loader.connection.cursor()
+
+            def search_group(group: str, query: str):
+                cur.execute(
+                    f"select s.value, s.language from {loader.fts_table(group)} AS f "
+                    f"join statements AS s on s.rowid = f.rowid where f.value match ?",
+                    (query,),
+                )
+                return cur.fetchall()
+
+            # english values are stemmed
+            self.assertEqual([("The Tree", "en")], search_group("en", "trees"))
+            self.assertCountEqual(
+                [("RDF 1.1 XML Syntax", "en"), ("RDF 1.1 XML Syntax", "en-us")],
+                search_group("en", "syntax"),
+            )
+            self.assertEqual([("Der Baum", "de")], search_group("default", "baum"))
+            self.assertEqual([], search_group("en", "baum"))
+            self.assertEqual([("細胞核", "ja")], search_group("cjk", '"細胞核"'))
+            # only the chosen predicates are indexed
+            self.assertEqual([], search_group("default", "buch"))
+
+    def test_entailed_edges(self):
+        """Tests the materialized closure of subClassOf and part-of restrictions."""
+        part_of = NamedNode("http://purl.obolibrary.org/obo/BFO_0000050")
+        for intern_terms in [False, True]:
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+                intern_terms=intern_terms,
+                entailed_edges=True,
+            )
+            loader.bulkload(TEST_INPUT_OWL)
+            cur = loader.connection.cursor()
+            part_of_curie = loader.contract_uri(part_of)
+            cur.execute("select subject, predicate, object from entailed_edge")
+            edges = set(cur.fetchall())
+            for edge in [
+                (NUCLEAR_ENVELOPE, "rdfs:subClassOf", CELLULAR_COMPONENT),
+                (NUCLEAR_ENVELOPE, part_of_curie, NUCLEUS),
+                (NUCLEAR_ENVELOPE, part_of_curie, IMBO),
+                (NUCLEUS, "rdfs:subClassOf", IMBO),
+            ]:
+                self.assertIn(edge, edges)
+            # same as a naive fixpoint over the direct edges
+            cur.execute(
+                "select subject, 'rdfs:subClassOf', object from statements "
+                "where predicate = 'rdfs:subClassOf' "
+                "and substr(subject, 1, 2) != '_:' and substr(object, 1, 2) != '_:'"
+            )
+            direct = set(cur.fetchall())
+            cur.execute(
+                "select sc.subject, svf.object from statements AS sc "
+                "join statements AS p on p.subject = sc.object and p.predicate = 'owl:onProperty' "
+                "join statements AS svf on svf.subject = sc.object "
+                "and svf.predicate = 'owl:someValuesFrom' "
+                "where sc.predicate = 'rdfs:subClassOf' and p.object = ?",
+                (part_of_curie,),
+            )
+            direct |= {(s, part_of_curie, o) for s, o in cur.fetchall()}
+            closure = set(direct)
+            while True:
+                new = {
+                    (s, p1 if p2 == "rdfs:subClassOf" else p2, o)
+                    for s, p1, m in closure
+                    for m2, p2, o in direct
+                    if m == m2 and (p1 == p2 or "rdfs:subClassOf" in (p1, p2))
+                } - closure
+                if not new:
+                    break
+                closure |= new
+            self.assertEqual(closure, edges)
+            cur.execute(
+                "explain query plan select subject from entailed_edge "
+                "where object = ? and predicate = ?",
+                (NUCLEUS, part_of_curie),
+            )
+            self.assertIn("entailed_edge_object", str(cur.fetchall()))
+
+    def test_memory_budget(self):
+        """Tests that streaming with a memory budget loads the same rows, in small batches."""
+
+        def load(**kwargs):
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map={**TEST_PREFIX_MAP, **OWL_PREFIX_MAP},
+                **kwargs,
+            )
+            batches = []
+            row_batches = loader.row_batches
+
+            def counted_batches(*args):
+                for path, rows in row_batches(*args):
+                    if rows is not None:
+                        rows = list(rows)
+                        batches.append(len(rows))
+                    yield path, rows
+
+            loader.row_batches = counted_batches
+            loader.bulkload(TEST_INPUT_OWL)
+            cur = loader.connection.cursor()
+            cur.execute(
+                "select * from statements where substr(subject, 1, 2) != '_:' "
+                "and (object is null or substr(object, 1, 2) != '_:')"
+            )
+            return loader, batches, cur.fetchall()
+
+        _, batches, rows = load()
+        self.assertEqual(1, len(batches))
+        loader, streamed_batches, streamed_rows = load(memory_budget_mb=1, workers=2)
+        self.assertCountEqual(rows, streamed_rows)
+        self.assertEqual(sum(batches), sum(streamed_batches))
+        self.assertGreater(len(streamed_batches), 1)
+        # 1MB: 0.2MB for the contraction cache, and 0.2MB for the page cache
+        self.assertEqual(
+            budget_bytes(1, "contraction_cache") // CONTRACTION_CACHE_ENTRY_BYTES,
+            loader.contraction_cache_info().maxsize,
+        )
+        self.assertEqual(-204, loader.connection.execute("pragma cache_size").fetchone()[0])
+
+    def test_resume(self):
+        """Tests that a load interrupted after a checkpoint is continued where it stopped."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            owl_path = shutil.copy(TEST_INPUT_OWL, tmpdir)
+            nt_path = str(Path(tmpdir) / f"{TEST_BASE}.nt")
+            serialize(parse(owl_path, "application/rdf+xml"), nt_path, NT_MIME_TYPE)
+            paths = [owl_path, nt_path]
+
+            def new_loader(db_path: str, **kwargs) -> SqliteBulkloader:
+                return SqliteBulkloader(
+                    database_path=db_path,
+                    named_prefix_maps=[],
+                    prefix_map=OWL_PREFIX_MAP,
+                    batch_size=500,
+                    chunk_bytes=20000,
+                    checkpoint_batches=2,
+                    **kwargs,
+                )
+
+            def statements(loader: SqliteBulkloader):
+                return loader.connection.execute("select * from statements").fetchall()
+
+            loader = new_loader(str(Path(tmpdir) / "full.db"))
+            loader.bulkload(paths)
+            expected = statements(loader)
+            (owl_rows,) = loader.connection.execute(
+                "select row_offset from load_checkpoint where complete and path=?",
+                (str(Path(owl_path).resolve()),),
+            ).fetchone()
+            # in the RDF/XML file, and in the N-Triples file
+            for num_batches in [5, owl_rows // 500 + 6]:
+                db_path = str(Path(tmpdir) / f"resume-{num_batches}.db")
+                loader = new_loader(db_path)
+                insert = loader._insert
+                inserted = []
+
+                def failing_insert(rows):
+                    if len(inserted) == num_batches:
+                        raise RuntimeError("interrupted")
+                    inserted.append(insert(rows))
+                    return inserted[-1]
+
+                loader._insert = failing_insert
+                with self.assertRaises(RuntimeError):
+                    loader.bulkload(paths)
+                # uncommitted rows are rolled back
+                loader.connection.close()
+                (committed,) = (
+                    sqlite3.connect(db_path)
+                    .execute("select sum(row_offset) from load_checkpoint")
+                    .fetchone()
+                )
+                self.assertLess(sum(inserted) - 2 * 500, committed)
+                loader = new_loader(db_path, resume=True, incremental=True)
+                loader.bulkload(paths, create_tables=False)
+                self.assertCountEqual(expected, statements(loader))
+                self.assertEqual(len(expected) - committed, loader.stats.rows)
+                checkpoints = loader.connection.execute(
+                    "select complete, byte_offset is not null from load_checkpoint order by path"
+                ).fetchall()
+                self.assertEqual([(1, 1), (1, 0)], checkpoints)
+                (manifest_rows,) = loader.connection.execute(
+                    "select sum(row_count) from load_manifest"
+                ).fetchone()
+                self.assertEqual(len(expected), manifest_rows)
+
+    def test_checkpointed_blank_nodes(self):
+        """Tests that checkpointed loads keep apart the blank nodes of files that share labels."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            loader = SqliteBulkloader(
+                database_path=":memory:",
+                named_prefix_maps=[],
+                prefix_map={**OWL_PREFIX_MAP, "ex": "http://example.org/"},
+                chunk_bytes=5000,
+                checkpoint_batches=1,
+            )
+            loader.bulkload(write_restrictions(tmpdir, "nt"))
+            cur = loader.connection.cursor()
+            cur.execute(
+                "select count(distinct subject) from statements "
+                "where predicate='owl:someValuesFrom'"
+            )
+            self.assertEqual((800,), cur.fetchone())
+            cur.execute(SUB_SVF_QUERY, {"subject": "ex:A0"})
+            self.assertEqual([("ex:D0",)], cur.fetchall())
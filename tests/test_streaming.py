@@ -0,0 +1,65 @@
+"""Tests for bounded-memory streaming between the parser and the writer."""
+
+import time
+import unittest
+
+from rdf_sql_bulkloader.loaders.streaming import RowStream, adaptive_chunks, row_bytes
+
+ROWS = [(f"GO:{i:07d}", "rdfs:label", None, f"label {i}", None, None) for i in range(10000)]
+
+
+class TestStreaming(unittest.TestCase):
+    """Test the producer thread, its queue, and adaptive chunking."""
+
+    def test_order_and_bound(self):
+        block_bytes = sum(row_bytes(row) for row in ROWS[:100])
+        stream = RowStream(ROWS, max_bytes=3 * block_bytes, block_rows=100)
+        rows = []
+        for block in stream.blocks():
+            # a slow writer
+            time.sleep(0.001)
+            rows.extend(block)
+        self.assertEqual(ROWS, rows)
+        self.assertGreater(stream.max_queued_bytes, 0)
+        self.assertLessEqual(stream.max_queued_bytes, 1.1 * 3 * block_bytes)
+        self.assertAlmostEqual(block_bytes / 100, stream.mean_row_bytes, delta=block_bytes / 1000)
+
+    def test_error(self):
+        def rows():
+            yield from ROWS[:250]
+            raise ValueError("bad input")
+
+        stream = RowStream(rows(), max_bytes=1 << 20, block_rows=100)
+        received = []
+        with self.assertRaises(ValueError):
+            for block in stream.blocks():
+                received.extend(block)
+        self.assertEqual(ROWS[:200], received)
+
+    def test_close(self):
+        produced = []
+
+        def rows():
+            for row in ROWS:
+                produced.append(row)
+                yield row
+
+        stream = RowStream(rows(), max_bytes=1, block_rows=10)
+        blocks = stream.blocks()
+        next(blocks)
+        blocks.close()
+        stream._thread.join(timeout=5)
+        self.assertFalse(stream._thread.is_alive())
+        self.assertLess(len(produced), len(ROWS))
+
+    def test_adaptive_chunks(self):
+        sizes = iter([2, 3, 100])
+        chunks = [list(c) for c in adaptive_chunks(range(10), lambda: next(sizes))]
+        self.assertEqual([[0, 1], [2, 3, 4], [5, 6, 7, 8, 9]], chunks)
+        stream = RowStream(ROWS, max_bytes=1 << 20)
+        self.assertEqual(1000, stream.batch_rows(1 << 20, 5000))
+        list(stream.blocks())
+        self.assertEqual(5000, stream.batch_rows(1 << 30, 5000))
+        self.assertEqual(1000, stream.batch_rows(1, 5000))
+        expected = int((1 << 22) / stream.mean_row_bytes)
+        self.assertEqual(expected, stream.batch_rows(1 << 22, 100000))